@@ -1,82 +1,173 @@
-
+import re
 from django.contrib import admin
+from django.db.models import Count
+from django.utils import timezone
 from .models import (
-    Category, Item, MenuList, TimeSlot, CustomerProfile, 
-    Subscription, DeliverySchedule, Notification, Payment, 
+    Category, Item, MenuList, TimeSlot, CustomerProfile,
+    Subscription, DeliverySchedule, Notification, Payment,
     Invoice, Report
 )
+from .pagination import EstimatedCountPaginator
+
+PHONE_TERM = re.compile(r'\+?[\d\s().-]{7,}')
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelists that render in a fixed number of queries at any table size.
+
+    Related objects shown in ``list_display`` must be covered by
+    ``list_select_related``; counting goes through EstimatedCountPaginator and
+    the second, unfiltered COUNT(*) is skipped. A search term that looks like
+    a phone number is matched against ``phone_search_field`` (a path to
+    CustomerProfile.normalized_phone, which is uniquely indexed); other
+    terms use ``search_fields``, which should only hold exact lookups on
+    indexed columns or ``__startswith`` on columns with a pattern index.
+    PostgreSQL serves those prefix searches from the index; SQLite compiles
+    them to ``LIKE ... ESCAPE``, which it never answers from an index, so
+    there they scan the table.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    phone_search_field = None
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if self.phone_search_field and PHONE_TERM.fullmatch(search_term):
+            digits = ''.join(character for character in search_term if character.isdigit())
+            return queryset.filter(**{f'{self.phone_search_field}__in': [digits, f'+{digits}']}), False
+        return super().get_search_results(request, queryset, search_term)
+
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(LargeTableAdmin):
     list_display = ('name', 'is_active', 'created_at')
     list_filter = ('is_active',)
-    search_fields = ('name',)
+    search_fields = ('^name',)
     ordering = ('name',)
 
 @admin.register(Item)
-class ItemAdmin(admin.ModelAdmin):
+class ItemAdmin(LargeTableAdmin):
     list_display = ('name', 'category', 'price', 'is_active')
     list_filter = ('category', 'is_active')
-    search_fields = ('name', 'description')
+    list_select_related = ('category',)
+    search_fields = ('^name',)
+    autocomplete_fields = ('category',)
     ordering = ('category', 'name')
 
 @admin.register(MenuList)
-class MenuListAdmin(admin.ModelAdmin):
+class MenuListAdmin(LargeTableAdmin):
     list_display = ('name', 'is_active', 'get_items_count')
     list_filter = ('is_active',)
-    search_fields = ('name',)
-    filter_horizontal = ('items',)
+    search_fields = ('^name',)
+    autocomplete_fields = ('items',)
+    ordering = ('name',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(items_count=Count('items'))
+
+    @admin.display(description='Items Count', ordering='items_count')
     def get_items_count(self, obj):
-        return obj.items.count()
-    get_items_count.short_description = 'Items Count'
+        return obj.items_count
 
 @admin.register(TimeSlot)
-class TimeSlotAdmin(admin.ModelAdmin):
+class TimeSlotAdmin(LargeTableAdmin):
     list_display = ('start_time', 'end_time', 'is_active')
     list_filter = ('is_active',)
     ordering = ('start_time',)
 
 @admin.register(CustomerProfile)
-class CustomerProfileAdmin(admin.ModelAdmin):
+class CustomerProfileAdmin(LargeTableAdmin):
     list_display = ('get_full_name', 'phone_number', 'location')
-    search_fields = ('user__first_name', 'user__last_name', 'phone_number')
-    
+    search_fields = ('last_name__startswith', 'first_name__startswith')
+    search_help_text = 'Phone number, or the start of a first or last name'
+    phone_search_field = 'normalized_phone'
+    ordering = ('last_name', 'first_name', 'id')
+
+    @admin.display(description='Customer Name', ordering='last_name')
     def get_full_name(self, obj):
-        return f"{obj.user.first_name} {obj.user.last_name}"
-    get_full_name.short_description = 'Customer Name'
+        return f"{obj.first_name} {obj.last_name}"
 
 @admin.register(Subscription)
-class SubscriptionAdmin(admin.ModelAdmin):
-    list_display = ('customer', 'menu', 'start_date', 'end_date', 'status')
-    list_filter = ('status', 'start_date', 'end_date')
-    search_fields = ('customer__user__first_name', 'customer__user__last_name')
+class SubscriptionAdmin(LargeTableAdmin):
+    list_display = ('id', 'customer', 'menu_list', 'time_slot', 'start_date', 'end_date', 'is_current')
+    list_filter = ('payment_mode', 'start_date', 'end_date')
+    list_select_related = ('customer', 'menu_list', 'time_slot')
+    search_fields = ('customer__last_name__startswith',)
+    search_help_text = 'Customer phone number or the start of their last name'
+    phone_search_field = 'customer__normalized_phone'
+    autocomplete_fields = ('customer', 'menu_list')
+    ordering = ('-id',)
+
+    @admin.display(boolean=True, description='Current')
+    def is_current(self, obj):
+        return obj.start_date <= timezone.localdate() <= obj.end_date
 
 @admin.register(DeliverySchedule)
-class DeliveryScheduleAdmin(admin.ModelAdmin):
-    list_display = ('subscription', 'delivery_date', 'time_slot', 'status')
+class DeliveryScheduleAdmin(LargeTableAdmin):
+    list_display = ('subscription', 'get_customer', 'delivery_date', 'get_time_slot', 'status')
     list_filter = ('status', 'delivery_date')
-    search_fields = ('subscription__customer__user__first_name',)
+    list_select_related = ('subscription__customer', 'subscription__time_slot')
+    search_fields = ('subscription__customer__last_name__startswith',)
+    search_help_text = 'Customer phone number or the start of their last name'
+    phone_search_field = 'subscription__customer__normalized_phone'
+    autocomplete_fields = ('subscription',)
+    ordering = ('delivery_date', 'created_at', 'id')
+
+    @admin.display(description='Customer')
+    def get_customer(self, obj):
+        return obj.subscription.customer
+
+    @admin.display(description='Time slot')
+    def get_time_slot(self, obj):
+        return obj.subscription.time_slot
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
-    list_display = ('customer', 'title', 'created_at', 'is_read')
-    list_filter = ('is_read', 'created_at')
-    search_fields = ('customer__user__first_name', 'title')
+class NotificationAdmin(LargeTableAdmin):
+    list_display = ('customer', 'title', 'type', 'created_at', 'is_read')
+    list_filter = ('is_read', 'type', 'created_at')
+    list_select_related = ('customer',)
+    search_fields = ('customer__last_name__startswith',)
+    search_help_text = 'Customer phone number or the start of their last name'
+    phone_search_field = 'customer__normalized_phone'
+    autocomplete_fields = ('customer',)
+    ordering = ('-created_at', '-id')
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
-    list_display = ('subscription', 'amount', 'payment_date', 'status')
+class PaymentAdmin(LargeTableAdmin):
+    list_display = ('transaction_id', 'subscription', 'amount', 'payment_method', 'payment_date', 'status')
     list_filter = ('status', 'payment_date')
-    search_fields = ('subscription__customer__user__first_name',)
+    list_select_related = ('subscription',)
+    search_fields = ('transaction_id__exact',)
+    search_help_text = 'Exact transaction id or customer phone number'
+    phone_search_field = 'subscription__customer__normalized_phone'
+    autocomplete_fields = ('subscription',)
+    ordering = ('-payment_date', '-id')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Numeric transaction ids look like phone numbers; an exact id wins
+        search_term = search_term.strip()
+        if search_term:
+            matches = queryset.filter(transaction_id=search_term)
+            if matches.exists():
+                return matches, False
+        return super().get_search_results(request, queryset, search_term)
 
 @admin.register(Invoice)
-class InvoiceAdmin(admin.ModelAdmin):
-    list_display = ('subscription', 'amount', 'generated_at', 'is_paid')
-    list_filter = ('is_paid', 'generated_at')
-    search_fields = ('subscription__customer__user__first_name',)
+class InvoiceAdmin(LargeTableAdmin):
+    list_display = ('invoice_number', 'payment', 'get_amount', 'generated_date', 'due_date', 'is_paid')
+    list_filter = ('is_paid', 'due_date')
+    list_select_related = ('payment',)
+    search_fields = ('invoice_number__exact', 'payment__transaction_id__exact')
+    search_help_text = 'Exact invoice number or transaction id'
+    autocomplete_fields = ('payment',)
+    ordering = ('-id',)
+
+    @admin.display(description='Amount', ordering='payment__amount')
+    def get_amount(self, obj):
+        return obj.payment.amount
 
 @admin.register(Report)
-class ReportAdmin(admin.ModelAdmin):
-    list_display = ('type', 'date_from', 'date_to', 'total_revenue')
+class ReportAdmin(LargeTableAdmin):
+    list_display = ('type', 'date_from', 'date_to', 'total_revenue', 'generated_at')
     list_filter = ('type', 'date_from', 'date_to')
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import Q
+from django.http import Http404
+from django.utils import timezone
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
+from .fieldsets import sparse_fieldsets_requested
+from .models import ArchivedDeliverySchedule, ArchivedInvoice, ArchivedNotification, ArchivedPayment, Invoice
+from .rollups import payment_day, refresh_rollups
+
+DEFAULT_BATCH_SIZE = 2000
+
+# Archive model, age field and the condition a live row must meet before it
+# can move. Rows only move once they are settled; a payment's invoice moves
+# with it, so an invoice still awaiting payment keeps its payment live.
+ARCHIVE_POLICIES = {
+    'deliveries': (ArchivedDeliverySchedule, 'delivery_date', Q(status__in=['DELIVERED', 'CANCELLED'])),
+    'notifications': (ArchivedNotification, 'created_at', Q(is_read=True)),
+    'payments': (ArchivedPayment, 'payment_date', ~Q(status='PENDING') & ~Q(invoice__is_paid=False)),
+}
+
+
+def archive_cutoff(name, days=None):
+    """Rows whose age field is before the returned date/datetime are old enough to archive."""
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS[name]
+    archive_model, field, _ = ARCHIVE_POLICIES[name]
+    if isinstance(archive_model._meta.get_field(field), models.DateTimeField):
+        return timezone.now() - timedelta(days=days)
+    return timezone.localdate() - timedelta(days=days)
+
+
+def archivable(name, cutoff):
+    archive_model, field, condition = ARCHIVE_POLICIES[name]
+    return archive_model.archive_of.objects.filter(condition, **{f'{field}__lt': cutoff})
+
+
+def move_batch(archive_model, queryset):
+    """
+    Copy the rows of ``queryset`` into ``archive_model`` and delete them.
+
+    Both sides commit together when the archive shares the primary database.
+    With a separate archive database the copy commits first and ignores rows
+    already there, so a batch interrupted between the two commits is simply
+    finished by the next run. Payments take their invoices along.
+    """
+    live_model = archive_model.archive_of
+    with transaction.atomic(using=router.db_for_write(live_model)), \
+            transaction.atomic(using=router.db_for_write(archive_model)):
+        return len(_move_rows(archive_model, queryset))
+
+
+def _move_rows(archive_model, queryset):
+    live_model = archive_model.archive_of
+    fields = [field.attname for field in archive_model._meta.concrete_fields if field.name != 'archived_at']
+    rows = list(queryset.select_for_update(of=('self',)).values(*fields))
+    archive_model.objects.bulk_create([archive_model(**row) for row in rows], ignore_conflicts=True)
+    if archive_model is ArchivedPayment:
+        # The raw delete below does not cascade to the invoices
+        _move_rows(ArchivedInvoice, Invoice.objects.filter(payment_id__in=[row['id'] for row in rows]))
+    # A raw delete skips the per-row post_delete signals. Rollups count
+    # archived payments too, so the totals do not change, but the days are
+    # refreshed anyway rather than relying on that.
+    deleted = live_model.objects.filter(pk__in=[row['id'] for row in rows])
+    deleted._raw_delete(deleted.db)
+    if archive_model is ArchivedPayment:
+        refresh_rollups(payment_day(row['payment_date']) for row in rows)
+    return rows
+
+
+def archive_rows(name, days=None, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Move the rows of table ``name`` older than the cutoff into its archive,
+    ``batch_size`` rows per transaction, in primary key order.
+
+    Progress is the data itself: an interrupted run leaves the moved batches
+    archived and the rest live, and the next run carries on from there.
+    Returns the number of rows moved (or that would be, with ``dry_run``).
+    """
+    archive_model = ARCHIVE_POLICIES[name][0]
+    eligible = archivable(name, archive_cutoff(name, days))
+    if dry_run:
+        return eligible.count()
+
+    moved, last_id = 0, 0
+    while True:
+        ids = list(eligible.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return moved
+        # The policy is applied again so rows changed since the id scan stay live
+        moved += move_batch(archive_model, eligible.filter(pk__in=ids))
+        last_id = ids[-1]
+
+
+class ArchiveMixin:
+    """
+    Viewset mixin serving ``archive_model`` rows when ``?include_archived=true``.
+
+    Without the parameter only live rows are listed or retrieved. With it,
+    list pages merge live and archived rows under one keyset cursor, exports
+    (StreamingExportMixin) include the archived rows, and GET/HEAD detail
+    requests fall back to the archive. Archived rows are
+    read-only. ``get_queryset`` must accept the model to query.
+    """
+    archive_model = None
+
+    def include_archived(self):
+        return self.request.query_params.get('include_archived') == 'true'
+
+    def list(self, request, *args, **kwargs):
+        if not self.include_archived():
+            return super().list(request, *args, **kwargs)
+        querysets = [self.filter_queryset(self.get_queryset(model))
+            for model in (self.archive_model.archive_of, self.archive_model)]
+        values_serializer_class = getattr(self, 'values_serializer_class', None)
+        if values_serializer_class is not None and not sparse_fieldsets_requested(request):
+            serializer = values_serializer_class()
+            page = self.paginate_queryset([serializer.values(queryset) for queryset in querysets])
+            return self.get_paginated_response(serializer.to_representation(page))
+        page = self.paginate_queryset(querysets)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if not self.include_archived() or self.request.method not in SAFE_METHODS:
+                raise
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = get_object_or_404(self.filter_queryset(self.get_queryset(self.archive_model)),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, obj)
+        return obj
@@ -0,0 +1,104 @@
+import re
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+from django.db import connections
+from django.test import Client
+
+PORTAL_PATHS = ['/', '/menu/', '/subscribe/', '/api/catalog/menus/', '/api/catalog/categories/',
+    '/api/catalog/timeslots/']
+
+
+def endpoint_paths(router):
+    """
+    Every GET route the API router exposes, plus the portal pages.
+
+    Detail routes use the first row of the viewset's queryset; list-level
+    GET actions (exports, manifests, forecasts...) are included as well.
+    """
+    paths = []
+    for prefix, viewset, _ in router.registry:
+        paths.append(f'/api/{prefix}/')
+        for extra in viewset.get_extra_actions():
+            if not extra.detail and 'get' in extra.mapping:
+                paths.append(f'/api/{prefix}/{extra.url_path}/')
+        queryset = getattr(viewset, 'queryset', None)
+        pk = queryset.order_by('pk').values_list('pk', flat=True).first() if queryset is not None else None
+        if pk is not None:
+            paths.append(f'/api/{prefix}/{pk}/')
+    return paths + PORTAL_PATHS
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count, self.seconds = 0, 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def fetch(client, path):
+    response = client.get(path)
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    return response.status_code, len(body)
+
+
+def percentile(cuts, value):
+    return round(cuts[value - 1] * 1000, 2)
+
+
+def measure(client, path, requests):
+    """
+    Time ``requests`` GETs of ``path`` after one warm-up and return a result dict.
+
+    Queries are counted on every database, so reads routed to the replica or
+    the archive show up too.
+    """
+    fetch(client, path)
+    latencies, counter = [], QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        for _ in range(requests):
+            started = time.perf_counter()
+            status, size = fetch(client, path)
+            latencies.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        fetch(client, path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        'path': path,
+        'status': status,
+        'requests': requests,
+        'p50_ms': percentile(cuts, 50),
+        'p95_ms': percentile(cuts, 95),
+        'p99_ms': percentile(cuts, 99),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'queries': counter.count / requests,
+        'query_ms': round(counter.seconds / requests * 1000, 2),
+        'bytes': size,
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(router, user, requests=20, include=None, exclude=None):
+    client = Client()
+    client.force_login(user)
+    results = []
+    for path in endpoint_paths(router):
+        if (include and not re.search(include, path)) or (exclude and re.search(exclude, path)):
+            continue
+        results.append(measure(client, path, requests))
+    return results
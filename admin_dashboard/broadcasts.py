@@ -0,0 +1,82 @@
+import json
+from django.db import transaction
+from django.utils import timezone
+from .models import CustomerProfile, Notification, Subscription
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10000
+
+
+def audience(menu_list=None, time_slot=None, location=None, active_only=False, active_on=None):
+    """
+    Customer ids matching a broadcast audience, ordered by id.
+
+    Subscription filters are applied through a subquery, so a customer with
+    several matching subscriptions is still selected once.
+    """
+    customers = CustomerProfile.objects.all()
+    if location:
+        customers = customers.filter(location__iexact=location)
+
+    subscriptions = Subscription.objects.all()
+    if menu_list:
+        subscriptions = subscriptions.filter(menu_list_id=menu_list)
+    if time_slot:
+        subscriptions = subscriptions.filter(time_slot_id=time_slot)
+    if active_only or active_on:
+        day = active_on or timezone.localdate()
+        subscriptions = subscriptions.filter(start_date__lte=day, end_date__gte=day)
+    if menu_list or time_slot or active_only or active_on:
+        customers = customers.filter(id__in=subscriptions.values('customer_id'))
+
+    return customers.order_by('id').values_list('id', flat=True)
+
+
+def broadcast_progress(customer_ids, notification_type, title, message, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Create one notification per customer id, ``chunk_size`` rows per
+    transaction, yielding the running total after every chunk.
+
+    Ids are streamed with iterator() so memory stays bounded, and each chunk
+    commits on its own so the table is never locked for the whole run.
+    """
+    sent = 0
+    chunk = []
+
+    def flush(chunk):
+        with transaction.atomic():
+            Notification.objects.bulk_create([
+                Notification(customer_id=customer_id, type=notification_type, title=title, message=message)
+                for customer_id in chunk
+            ])
+        return len(chunk)
+
+    for customer_id in customer_ids.iterator(chunk_size=chunk_size):
+        chunk.append(customer_id)
+        if len(chunk) >= chunk_size:
+            sent += flush(chunk)
+            chunk = []
+            yield sent
+    if chunk:
+        sent += flush(chunk)
+        yield sent
+
+
+def send_broadcast(customer_ids, notification_type, title, message, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Run broadcast_progress to the end and return the number of notifications
+    created. ``progress`` is called with the running total after every chunk.
+    """
+    sent = 0
+    for sent in broadcast_progress(customer_ids, notification_type, title, message, chunk_size=chunk_size):
+        if progress:
+            progress(sent)
+    return sent
+
+
+def progress_lines(totals):
+    """NDJSON progress for a streamed broadcast: one line per chunk, then a final ``done`` line."""
+    sent = 0
+    for sent in totals:
+        yield json.dumps({'sent': sent}) + '\n'
+    yield json.dumps({'sent': sent, 'done': True}) + '\n'
@@ -0,0 +1,116 @@
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Prefetch
+from .models import Item, MenuList
+
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_MENUS_KEY = 'catalog:menus:{version}'
+CATALOG_TIMEOUT = 60 * 60
+
+# Hits and misses of this worker. Kept in process so a read costs no extra
+# cache round-trip; every worker reports its own counts.
+lookups = Counter()
+
+
+def get_catalog_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def catalog_version(cache=None):
+    cache = cache or get_catalog_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted version key can never resurrect
+        # menus cached under an older version.
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    cache = get_catalog_cache()
+    catalog_version(cache)
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # Evicted in between; a fresh clock-seeded version is newer anyway
+        catalog_version(cache)
+
+
+def menus_queryset():
+    # Always built from the primary: a lagging replica read right after a
+    # version bump would be cached as the new version until the next change.
+    return MenuList.objects.using(DEFAULT_DB_ALIAS).order_by('id').prefetch_related(
+        Prefetch('items', queryset=Item.objects.select_related('category').order_by('id')))
+
+
+def build_menus():
+    from .serializers import MenuListSerializer
+    return list(MenuListSerializer(menus_queryset(), many=True).data)
+
+
+async def abuild_menus():
+    from .serializers import MenuListSerializer
+    # Iterating asynchronously runs the query and its prefetches off the event
+    # loop; serializing the prefetched objects afterwards touches no database.
+    menus = [menu async for menu in menus_queryset()]
+    return list(MenuListSerializer(menus, many=True).data)
+
+
+def get_menus(active_only=False):
+    """
+    Return every menu with its items and categories as serialized dicts.
+
+    The structure is cached under the current catalog version, which the
+    signals in admin_dashboard.signals bump whenever a category, item or
+    menu changes.
+    """
+    cache = get_catalog_cache()
+    key = CATALOG_MENUS_KEY.format(version=catalog_version(cache))
+    menus = cache.get(key)
+    if menus is None:
+        lookups['misses'] += 1
+        menus = build_menus()
+        cache.set(key, menus, CATALOG_TIMEOUT)
+    else:
+        lookups['hits'] += 1
+    if active_only:
+        return [menu for menu in menus if menu['is_active']]
+    return menus
+
+
+async def acatalog_version(cache=None):
+    cache = cache or get_catalog_cache()
+    version = await cache.aget(CATALOG_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = await cache.aget(CATALOG_VERSION_KEY)
+    return version
+
+
+async def aget_menus(active_only=False):
+    """Async counterpart of get_menus() for async views; shares the same cache entries."""
+    cache = get_catalog_cache()
+    key = CATALOG_MENUS_KEY.format(version=await acatalog_version(cache))
+    menus = await cache.aget(key)
+    if menus is None:
+        lookups['misses'] += 1
+        menus = await abuild_menus()
+        await cache.aset(key, menus, CATALOG_TIMEOUT)
+    else:
+        lookups['hits'] += 1
+    if active_only:
+        return [menu for menu in menus if menu['is_active']]
+    return menus
+
+
+def catalog_stats():
+    """The shared catalog version and this worker's hit and miss counts."""
+    return {
+        'version': catalog_version(),
+        'hits': lookups['hits'],
+        'misses': lookups['misses'],
+    }
@@ -0,0 +1,198 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from django.db import transaction
+from .catalog import bump_catalog_version
+from .models import Category, Item, MenuList, menu_rule_errors
+from .serializers import CategoryImportSerializer, ItemImportSerializer, MenuImportSerializer
+
+SECTIONS = (
+    ('categories', CategoryImportSerializer),
+    ('items', ItemImportSerializer),
+    ('menus', MenuImportSerializer),
+)
+CSV_TYPES = {'category': 'categories', 'item': 'items', 'menu': 'menus'}
+CSV_JSON_COLUMNS = ('customization_options', 'nutritional_info')
+
+
+class CatalogImportError(ValueError):
+    pass
+
+
+def parse_csv(text):
+    """
+    Read a catalog CSV into the JSON import structure.
+
+    Each row has a ``type`` column (category, item or menu); menu item names
+    are separated by semicolons in the ``items`` column.
+    """
+    payload = {section: [] for section, _ in SECTIONS}
+    for line, row in enumerate(csv.DictReader(io.StringIO(text)), 2):
+        section = CSV_TYPES.get((row.pop('type', '') or '').strip().lower())
+        if section is None:
+            raise CatalogImportError(f'Line {line}: type must be one of {", ".join(CSV_TYPES)}')
+        record = {key: value for key, value in row.items() if key and value not in (None, '')}
+        for column in CSV_JSON_COLUMNS:
+            if column in record:
+                try:
+                    record[column] = json.loads(record[column])
+                except ValueError:
+                    raise CatalogImportError(f'Line {line}: {column} is not valid JSON')
+        if 'items' in record:
+            record['items'] = [name.strip() for name in record['items'].split(';') if name.strip()]
+        payload[section].append(record)
+    return payload
+
+
+class CatalogImport:
+    """
+    Upsert categories, items and menus from one payload.
+
+    Every section is validated row by row, cross-row rules are checked in
+    memory against a few set-based lookups, and the valid rows are written
+    with bulk_create(update_conflicts=True). Invalid rows are skipped and
+    reported; the rest of the import still applies.
+    """
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.errors = []
+        self.rows = {}
+
+    def error(self, section, index, name, messages):
+        self.errors.append({'section': section, 'row': index, 'name': name, 'errors': messages})
+
+    def validate_rows(self):
+        for section, serializer_class in SECTIONS:
+            valid, seen = [], {}
+            for index, record in enumerate(self.payload.get(section) or []):
+                serializer = serializer_class(data=record)
+                if serializer.is_valid():
+                    data = serializer.validated_data
+                    key = (data.get('category'), data['name'])
+                    if key in seen:
+                        # Upserting one key twice in a statement is rejected by PostgreSQL
+                        self.error(section, index, data['name'], [f'Duplicate of row {seen[key]}'])
+                        continue
+                    seen[key] = index
+                    valid.append((index, data))
+                else:
+                    self.error(section, index, record.get('name') if isinstance(record, dict) else None,
+                        serializer.errors)
+            self.rows[section] = valid
+
+    def upsert_categories(self):
+        categories = [Category(**data) for _, data in self.rows['categories']]
+        Category.objects.bulk_create(categories, update_conflicts=True, unique_fields=['name'],
+            update_fields=['description', 'image', 'is_active', 'updated_at'])
+        names = {data['category'] for _, data in self.rows['items']}
+        return dict(Category.objects.filter(name__in=names).values_list('name', 'id'))
+
+    def locked_items(self):
+        """(category, item) pairs being deactivated while an active menu outside this import uses them."""
+        deactivated = [(data['category'], data['name']) for _, data in self.rows['items'] if not data['is_active']]
+        if not deactivated:
+            return set()
+        imported_menus = [data['name'] for _, data in self.rows['menus']]
+        links = MenuList.items.through.objects.filter(
+            item__name__in={name for _, name in deactivated},
+            item__category__name__in={category for category, _ in deactivated},
+            menulist__is_active=True,
+        ).exclude(menulist__name__in=imported_menus).values_list('item__category__name', 'item__name')
+        return set(links) & set(deactivated)
+
+    def upsert_items(self, category_ids):
+        locked = self.locked_items()
+        items = []
+        for index, data in self.rows['items']:
+            if data['category'] not in category_ids:
+                self.error('items', index, data['name'], {'category': [f"Unknown category {data['category']!r}"]})
+            elif (data['category'], data['name']) in locked:
+                self.error('items', index, data['name'],
+                    ['Cannot deactivate item while it is part of an active menu'])
+            else:
+                fields = dict(data)
+                category = fields.pop('category')
+                items.append(Item(**fields, category_id=category_ids[category]))
+        Item.objects.bulk_create(items, update_conflicts=True, unique_fields=['category', 'name'],
+            update_fields=['description', 'price', 'is_active', 'image', 'preparation_time',
+                'customization_options', 'updated_at'])
+        return len(items)
+
+    def resolve_menu_items(self):
+        references = {reference for _, data in self.rows['menus'] for reference in data['items']}
+        names = references | {reference.rsplit('/', 1)[-1] for reference in references}
+        by_name = defaultdict(list)
+        by_path = {}
+        for item_id, name, category, is_active in Item.objects.filter(name__in=names) \
+                .values_list('id', 'name', 'category__name', 'is_active'):
+            by_name[name].append((item_id, is_active))
+            by_path[f'{category}/{name}'] = (item_id, is_active)
+
+        def resolve(reference):
+            if len(by_name.get(reference, [])) == 1:
+                return by_name[reference][0], None
+            if reference in by_path:
+                return by_path[reference], None
+            if by_name.get(reference):
+                return None, f"Item name {reference!r} is ambiguous, use 'Category/{reference}'"
+            return None, f'Unknown item {reference!r}'
+        return resolve
+
+    def upsert_menus(self):
+        resolve = self.resolve_menu_items()
+        menus, links = [], {}
+        for index, data in self.rows['menus']:
+            fields = dict(data)
+            item_ids, inactive, messages = set(), 0, []
+            for reference in fields.pop('items'):
+                resolved, message = resolve(reference)
+                if message:
+                    messages.append(message)
+                elif resolved[0] not in item_ids:
+                    item_ids.add(resolved[0])
+                    inactive += not resolved[1]
+            messages += menu_rule_errors(data['is_active'], data['max_items'], len(item_ids), inactive)
+            if messages:
+                self.error('menus', index, data['name'], messages)
+                continue
+            menus.append(MenuList(**fields))
+            links[data['name']] = item_ids
+
+        MenuList.objects.bulk_create(menus, update_conflicts=True, unique_fields=['name'],
+            update_fields=['description', 'price', 'is_active', 'max_items', 'nutritional_info', 'updated_at'])
+        menu_ids = dict(MenuList.objects.filter(name__in=links).values_list('name', 'id'))
+        through = MenuList.items.through
+        through.objects.filter(menulist_id__in=menu_ids.values()).delete()
+        through.objects.bulk_create([
+            through(menulist_id=menu_ids[name], item_id=item_id)
+            for name, item_ids in links.items() for item_id in item_ids
+        ])
+        return len(menus)
+
+    def run(self, dry_run=False):
+        self.validate_rows()
+        with transaction.atomic():
+            category_ids = self.upsert_categories()
+            counts = {
+                'categories': len(self.rows['categories']),
+                'items': self.upsert_items(category_ids),
+                'menus': self.upsert_menus(),
+            }
+            if dry_run:
+                transaction.set_rollback(True)
+            else:
+                # bulk_create skips the signals that normally invalidate the catalog cache
+                transaction.on_commit(bump_catalog_version)
+        return {
+            'dry_run': dry_run,
+            'upserted': counts,
+            'errors': sorted(self.errors, key=lambda error: (error['section'], error['row'])),
+        }
+
+
+def import_catalog(payload, dry_run=False):
+    if not isinstance(payload, dict):
+        raise CatalogImportError('Catalog payload must be an object with categories, items and menus')
+    return CatalogImport(payload).run(dry_run=dry_run)
@@ -0,0 +1,36 @@
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+from .catalog import aget_menus
+from .models import Category, TimeSlot
+
+# Native async views for the public, read-only catalog. DRF viewsets are
+# synchronous, so these bypass it and await the cache and the async ORM
+# directly; under ASGI a worker keeps serving other requests while a query
+# or cache round-trip is in flight.
+
+
+@require_GET
+async def menus(request):
+    return JsonResponse({'results': await aget_menus(active_only=True)})
+
+
+@require_GET
+async def menu_detail(request, pk):
+    for menu in await aget_menus(active_only=True):
+        if menu['id'] == pk:
+            return JsonResponse(menu)
+    raise Http404('No menu matches the given query.')
+
+
+@require_GET
+async def categories(request):
+    queryset = Category.objects.filter(is_active=True).order_by('name') \
+        .values('id', 'name', 'description', 'image')
+    return JsonResponse({'results': [category async for category in queryset]})
+
+
+@require_GET
+async def time_slots(request):
+    queryset = TimeSlot.objects.filter(is_active=True).order_by('start_time') \
+        .values('id', 'start_time', 'end_time')
+    return JsonResponse({'results': [slot async for slot in queryset]})
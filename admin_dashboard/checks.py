@@ -0,0 +1,23 @@
+import os
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+from .catalog import get_catalog_cache
+
+
+@register('caches')
+def check_catalog_cache_is_shared(app_configs, **kwargs):
+    """
+    The catalog version key must be shared by every worker: with a per-process
+    cache, a version bump only reaches the worker that saw the write.
+    """
+    try:
+        workers = int(os.environ.get('WEB_CONCURRENCY') or 1)
+    except ValueError:
+        workers = 1
+    if workers > 1 and isinstance(get_catalog_cache(), LocMemCache):
+        return [Error(
+            f'The catalog cache is a per-process LocMemCache but WEB_CONCURRENCY runs {workers} workers.',
+            hint='Use a shared backend (file, Redis) for the CATALOG_CACHE_ALIAS cache.',
+            id='admin_dashboard.E001',
+        )]
+    return []
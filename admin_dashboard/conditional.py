@@ -0,0 +1,56 @@
+import hashlib
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Answer list and retrieve requests with 304 Not Modified when the
+    client's ``If-None-Match`` / ``If-Modified-Since`` still match.
+
+    The validators come from one aggregate over the filtered queryset:
+    the row count plus ``MAX()`` of each field in ``conditional_fields``.
+    Nothing is serialized when the response is a 304. The ETag also covers
+    the full request path and the negotiated media type, so pages, filters
+    and renderers never share a validator.
+    """
+    conditional_fields = ('updated_at',)
+
+    def resource_state(self, queryset):
+        """Return ``(token, last_modified)`` for the rows ``queryset`` would serialize."""
+        maxima = {f'max_{index}': Max(field) for index, field in enumerate(self.conditional_fields)}
+        state = queryset.order_by().aggregate(count=Count('pk'), **maxima)
+        timestamps = [state[key] for key in maxima if state[key] is not None]
+        token = ':'.join([str(state['count'])] + [value.isoformat() for value in timestamps])
+        return token, max(timestamps) if timestamps else None
+
+    def conditional(self, request, queryset, view, *args, **kwargs):
+        token, last_modified = self.resource_state(queryset)
+        fingerprint = f'{token}|{request.get_full_path()}|{request.accepted_media_type}'
+        etag = quote_etag(hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest())
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional(request, queryset, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.get_queryset().filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            # A lookup value the field cannot hold matches nothing, as in get_object()
+            raise Http404
+        return self.conditional(request, queryset, super().retrieve, *args, **kwargs)
@@ -0,0 +1,105 @@
+from collections import defaultdict
+from django.db import IntegrityError, router, transaction
+from django.db.models import Case, IntegerField, Value, When
+from .models import (
+    ArchivedNotification, CustomerProfile, IdempotencyKey, Notification, Subscription, normalize_phone
+)
+from .rollups import refresh_rollups
+
+MERGE_CHUNK_SIZE = 500
+# Rows owning a customer_id. Payments and deliveries hang off subscriptions
+# and follow them without being rewritten.
+CUSTOMER_REFERENCES = {'subscriptions': Subscription, 'notifications': Notification,
+    'archived_notifications': ArchivedNotification}
+
+
+def resolve_customer(first_name, last_name, phone_number, address, location):
+    """
+    Return the customer owning ``phone_number``, creating it on first contact.
+
+    The portal form is unauthenticated, so a returning customer's stored
+    name and delivery details are never overwritten by a submission; they
+    are changed by staff through the API.
+    """
+    defaults = {'first_name': first_name, 'last_name': last_name, 'phone_number': phone_number,
+        'address': address, 'location': location}
+    customer, _ = CustomerProfile.objects.get_or_create(
+        normalized_phone=normalize_phone(phone_number), defaults=defaults)
+    return customer
+
+
+def claim_idempotency_key(scope, key):
+    """
+    Record ``key`` for ``scope`` and return ``(record, created)``.
+
+    The unique constraint makes the first request win; a retry gets back the
+    existing record so the caller can replay the original result.
+    """
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(scope=scope, key=key), True
+    except IntegrityError:
+        return IdempotencyKey.objects.get(scope=scope, key=key), False
+
+
+def duplicate_groups():
+    """Map each surviving customer id to the ids of its duplicates, oldest row first."""
+    by_phone = defaultdict(list)
+    for customer_id, phone_number in CustomerProfile.objects.order_by('id').values_list('id', 'phone_number'):
+        by_phone[normalize_phone(phone_number)].append(customer_id)
+    return {ids[0]: ids[1:] for phone, ids in by_phone.items() if phone and len(ids) > 1}
+
+
+def _repoint(model, survivors):
+    duplicate_ids = list(survivors)
+    updated = 0
+    for start in range(0, len(duplicate_ids), MERGE_CHUNK_SIZE):
+        chunk = duplicate_ids[start:start + MERGE_CHUNK_SIZE]
+        updated += model.objects.filter(customer_id__in=chunk).update(customer_id=Case(
+            *[When(customer_id=duplicate_id, then=Value(survivors[duplicate_id])) for duplicate_id in chunk],
+            output_field=IntegerField(),
+        ))
+    return updated
+
+
+def _subscription_end_dates(customer_ids):
+    days = set()
+    for start in range(0, len(customer_ids), MERGE_CHUNK_SIZE):
+        days.update(Subscription.objects.filter(customer_id__in=customer_ids[start:start + MERGE_CHUNK_SIZE])
+            .values_list('end_date', flat=True).distinct())
+    return days
+
+
+def merge_duplicate_customers(dry_run=False):
+    """
+    Fold customers sharing a normalized phone number into the oldest row.
+
+    Subscriptions and notifications are repointed with one CASE update per
+    chunk, the duplicates are deleted, and every remaining customer gets its
+    ``normalized_phone`` filled in so the unique index guards new rows.
+    """
+    groups = duplicate_groups()
+    survivors = {duplicate_id: survivor_id for survivor_id, duplicate_ids in groups.items()
+        for duplicate_id in duplicate_ids}
+    summary = {'groups': len(groups), 'merged': len(survivors)}
+    archive_db = router.db_for_write(ArchivedNotification)
+    with transaction.atomic(), transaction.atomic(using=archive_db):
+        duplicate_ids = list(survivors)
+        # The repoint bypasses the Subscription signals that keep the rollups'
+        # customer sets current
+        moved_days = _subscription_end_dates(duplicate_ids)
+        for label, model in CUSTOMER_REFERENCES.items():
+            summary[label] = _repoint(model, survivors)
+        refresh_rollups(moved_days)
+        for start in range(0, len(duplicate_ids), MERGE_CHUNK_SIZE):
+            CustomerProfile.objects.filter(id__in=duplicate_ids[start:start + MERGE_CHUNK_SIZE]).delete()
+
+        customers = list(CustomerProfile.objects.filter(normalized_phone__isnull=True)
+            .only('id', 'phone_number'))
+        for customer in customers:
+            customer.normalized_phone = normalize_phone(customer.phone_number) or None
+        CustomerProfile.objects.bulk_update(customers, ['normalized_phone'], batch_size=MERGE_CHUNK_SIZE)
+        if dry_run:
+            transaction.set_rollback(True)
+            transaction.set_rollback(True, using=archive_db)
+    return summary
@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Set while a request (or block) may read from the replica; None means primary.
+read_alias = ContextVar('read_alias', default=None)
+
+PIN_COOKIE = 'primary_pin'
+
+# Sessions and users are read on every request and must reflect logins,
+# logouts and deactivations immediately, so they never use the replica.
+PRIMARY_ONLY_APPS = {'auth', 'sessions'}
+
+def replica_alias():
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def archive_alias():
+    alias = getattr(settings, 'DATABASE_ARCHIVE_ALIAS', 'archive')
+    return alias if alias in settings.DATABASES else None
+
+
+def is_archive_model(model):
+    # Archive models name the live model they hold rows of (admin_dashboard.archiving)
+    return hasattr(model, 'archive_of')
+
+
+def is_pinned(request):
+    """True while the client is inside the read-your-writes window of its last write."""
+    return PIN_COOKIE in request.COOKIES
+
+
+def pin_to_primary(response):
+    response.set_cookie(PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 10),
+        httponly=True, samesite='Lax')
+
+
+@contextmanager
+def reads_from_replica(request=None):
+    """
+    Route reads in the block to the replica, when one is configured and the
+    client of ``request`` has not written recently.
+    """
+    alias = replica_alias()
+    if alias is None or (request is not None and is_pinned(request)):
+        yield
+        return
+    token = read_alias.set(alias)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica inside reads_from_replica() and everything
+    else to the primary.
+
+    ReplicaMiddleware opens that window for GET/HEAD/OPTIONS API requests.
+    Reads inside a transaction on the primary always stay there, so a
+    request (or management command) sees its own writes.
+
+    When an archive database is configured, the archive models live there
+    and nothing else does.
+    """
+
+    def db_for_read(self, model, **hints):
+        archive = archive_alias()
+        if archive and is_archive_model(model):
+            return archive
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db and instance._state.db != archive:
+            # Relations and prefetches follow the row they start from
+            return instance._state.db
+        alias = read_alias.get()
+        if alias is None or model._meta.app_label in PRIMARY_ONLY_APPS \
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        archive = archive_alias()
+        if archive and is_archive_model(model):
+            return archive
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primary and replica hold the same rows; archived rows only point at
+        # live rows through unconstrained keys
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        archive = archive_alias()
+        model = None
+        if model_name is None and hints.get('model') is not None:
+            model_name = hints['model']._meta.model_name
+        if model_name:
+            # Migrations hint with historical models, which lack archive_of
+            try:
+                model = apps.get_model(app_label, model_name)
+            except LookupError:
+                pass
+        if archive and model is not None and is_archive_model(model):
+            return db == archive
+        # The replica receives its schema from the primary (see sync_replica)
+        return db == DEFAULT_DB_ALIAS
+
+
+def configure_sqlite(connection):
+    """
+    Apply SQLITE_PRAGMAS to a new SQLite connection.
+
+    WAL lets readers proceed while a writer commits, which is most of the
+    contention between portal writes and admin/report reads on a single
+    node. The replica connection is additionally opened query_only, so a
+    stray write fails loudly instead of diverging from the primary.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if connection.alias == replica_alias():
+            cursor.execute('PRAGMA query_only = ON')
@@ -0,0 +1,131 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import DeliverySchedule
+
+
+def allowed_sources(target_status):
+    return [source for source, targets in DeliverySchedule.ALLOWED_TRANSITIONS.items()
+        if target_status in targets]
+
+
+def lock_statuses(queryset):
+    """
+    Map the id of every row in ``queryset`` to its status, locking the rows
+    where supported. Only the delivery rows are locked, not the
+    subscriptions a time_slot filter joins.
+    """
+    return dict(queryset.select_for_update(of=('self',)).order_by().values_list('id', 'status'))
+
+
+def transition_deliveries(queryset, target_status, requested_ids=None):
+    """
+    Move every delivery in ``queryset`` to ``target_status`` where the
+    transition is allowed.
+
+    Current statuses are read and locked in one query and the eligible rows
+    are flipped with a single UPDATE. The UPDATE repeats the allowed source
+    statuses: where select_for_update is a no-op (SQLite) a concurrent
+    request may have moved a row since it was read, and such a row is
+    reported with its new status instead of being overwritten. Returns a
+    per-id outcome mapping; ids in ``requested_ids`` that matched nothing
+    are reported as not_found.
+    """
+    sources = allowed_sources(target_status)
+    outcomes = {}
+    with transaction.atomic():
+        current = lock_statuses(queryset)
+        eligible = [pk for pk, status in current.items() if status in sources]
+        now = timezone.now()
+        updated = 0
+        if eligible:
+            updated = DeliverySchedule.objects.filter(id__in=eligible, status__in=sources).update(
+                status=target_status, updated_at=now)
+        if updated < len(eligible):
+            # Lost a race: the rows this request wrote carry its timestamp
+            after = {pk: (status, updated_at) for pk, status, updated_at in DeliverySchedule.objects
+                .filter(id__in=eligible).values_list('id', 'status', 'updated_at')}
+            for pk in eligible:
+                if pk not in after:
+                    del current[pk]
+                elif after[pk] != (target_status, now):
+                    current[pk] = after[pk][0]
+
+    for pk, status in current.items():
+        if status in sources:
+            outcomes[pk] = {'result': 'updated', 'from': status}
+        else:
+            outcomes[pk] = {'result': 'invalid_transition', 'from': status}
+    for pk in requested_ids or []:
+        outcomes.setdefault(pk, {'result': 'not_found'})
+    return outcomes
+
+
+MANIFEST_FIELDS = {
+    'id': 'id',
+    'status': 'status',
+    'delivery_notes': 'delivery_notes',
+    'subscription_id': 'subscription_id',
+    'menu': 'subscription__menu_list__name',
+    'time_slot_id': 'subscription__time_slot_id',
+    'start_time': 'subscription__time_slot__start_time',
+    'end_time': 'subscription__time_slot__end_time',
+    'customer_id': 'subscription__customer_id',
+    'first_name': 'subscription__customer__first_name',
+    'last_name': 'subscription__customer__last_name',
+    'phone_number': 'subscription__customer__phone_number',
+    'address': 'subscription__customer__address',
+    'location': 'subscription__customer__location',
+}
+DEFAULT_BATCH_SIZE = 20
+
+
+def build_manifest(delivery_date, time_slot=None, batch_size=DEFAULT_BATCH_SIZE,
+                   exclude_statuses=('CANCELLED', 'DELIVERED')):
+    """
+    Group a day's deliveries by time slot and customer location, split into
+    driver-sized batches.
+
+    All joins happen in a single values() query, so the cost is one query
+    regardless of how many deliveries the day has.
+    """
+    deliveries = DeliverySchedule.objects.filter(delivery_date=delivery_date) \
+        .exclude(status__in=exclude_statuses)
+    if time_slot:
+        deliveries = deliveries.filter(subscription__time_slot_id=time_slot)
+    rows = deliveries.order_by(
+        'subscription__time_slot__start_time', 'subscription__time_slot_id',
+        'subscription__customer__location', 'subscription__customer__address', 'id',
+    ).values(
+        *[name for name, lookup in MANIFEST_FIELDS.items() if name == lookup],
+        **{name: F(lookup) for name, lookup in MANIFEST_FIELDS.items() if name != lookup},
+    )
+
+    slots = {}
+    for row in rows:
+        slot = slots.setdefault(row['time_slot_id'], {
+            'time_slot': row['time_slot_id'],
+            'start_time': row['start_time'],
+            'end_time': row['end_time'],
+            'deliveries': 0,
+            'locations': {},
+        })
+        slot['deliveries'] += 1
+        slot['locations'].setdefault(row['location'], []).append({
+            key: row[key] for key in MANIFEST_FIELDS
+            if key not in ('time_slot_id', 'start_time', 'end_time', 'location')
+        })
+
+    manifest = {'date': delivery_date, 'deliveries': 0, 'time_slots': []}
+    for slot in slots.values():
+        batch_number = 0
+        locations = []
+        for location, stops in slot['locations'].items():
+            batches = []
+            for start in range(0, len(stops), batch_size):
+                batch_number += 1
+                batches.append({'batch': batch_number, 'stops': stops[start:start + batch_size]})
+            locations.append({'location': location, 'deliveries': len(stops), 'batches': batches})
+        manifest['deliveries'] += slot['deliveries']
+        manifest['time_slots'].append(dict(slot, locations=locations))
+    return manifest
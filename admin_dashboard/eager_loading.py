@@ -0,0 +1,56 @@
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def relation_graph(serializer, prefix=''):
+    """
+    Derive select_related paths and Prefetch objects from a serializer's
+    readable nested fields.
+
+    Nested single serializers become select_related joins, nested
+    ``many=True`` serializers become Prefetch objects whose querysets carry
+    the child's own graph, so the whole tree loads in a fixed number of
+    queries.
+    """
+    select, prefetch = [], []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        path = prefix + field.source.replace('.', '__')
+        if isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.ModelSerializer):
+            child_select, child_prefetch = relation_graph(field.child)
+            queryset = field.child.Meta.model.objects.select_related(*child_select) \
+                .prefetch_related(*child_prefetch)
+            prefetch.append(Prefetch(path, queryset=queryset))
+        elif isinstance(field, serializers.ModelSerializer):
+            child_select, child_prefetch = relation_graph(field, prefix=path + '__')
+            select += [path] + child_select
+            prefetch += child_prefetch
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetch.append(path)
+    return select, prefetch
+
+
+def apply_eager_loading(queryset, serializer):
+    select, prefetch = relation_graph(serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class EagerLoadingMixin:
+    """
+    Viewset mixin applying the serializer's relation graph to every queryset.
+
+    Hooked into filter_queryset so it also covers viewsets that build their
+    own queryset in get_queryset. ``list_query_budget`` is the number of
+    queries a plain list request issues at any page size; the test suite
+    asserts it against seeded data (see also admin_dashboard.query_budget).
+    """
+    list_query_budget = None
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return apply_eager_loading(queryset, self.get_serializer())
@@ -0,0 +1,109 @@
+from rest_framework import serializers
+from .metrics import timed_serialization
+
+SPARSE_PARAMS = ('fields', 'expand')
+
+
+def parse_paths(value):
+    """
+    Turn ``'id,customer.first_name,customer.phone_number'`` into a tree:
+    ``{'id': {}, 'customer': {'first_name': {}, 'phone_number': {}}}``.
+    """
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, path.strip().split('.')):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def sparse_fieldsets_requested(request):
+    return any(param in request.query_params for param in SPARSE_PARAMS)
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+
+class SparseModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer honouring ``?fields=`` and ``?expand=`` on GET requests.
+
+    ``fields`` lists the fields to render, with dots selecting inside nested
+    serializers (``customer.first_name``). ``expand`` lists the nested
+    serializers to render in full; when given, any nested serializer not
+    listed is rendered as its primary key instead. Without either parameter
+    the output is unchanged. Naming a field the serializer does not have is
+    a validation error.
+
+    Unrequested nested serializers are dropped before the fields are built,
+    so they are never instantiated and relation_graph() never prefetches
+    them.
+
+    Rendering ``.data`` at the top level (single or ``many=True``) counts
+    towards the request's serialization time in /metrics.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        meta = getattr(cls, 'Meta', None)
+        if meta is not None and not hasattr(meta, 'list_serializer_class'):
+            meta.list_serializer_class = TimedListSerializer
+
+    def __init__(self, *args, sparse=None, **kwargs):
+        # ``sparse`` is the (fields, expand) pair handed down by a parent
+        self._sparse = sparse
+        super().__init__(*args, **kwargs)
+
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+    def sparse_trees(self):
+        if self._sparse is not None:
+            return self._sparse
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return None, None
+        fields, expand = (request.query_params.get(param) for param in SPARSE_PARAMS)
+        return (
+            None if fields is None else parse_paths(fields),
+            None if expand is None else parse_paths(expand),
+        )
+
+    def get_fields(self):
+        fields, expand = self.sparse_trees()
+        if fields is None and expand is None:
+            return super().get_fields()
+
+        declared = {}
+        for name, field in self.__class__._declared_fields.items():
+            if fields is not None and name not in fields:
+                continue
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            if not isinstance(nested, serializers.BaseSerializer):
+                declared[name] = field
+            elif expand is None or name in expand or (fields or {}).get(name):
+                sparse = ((fields or {}).get(name) or None, None if expand is None else expand.get(name, {}))
+                declared[name] = nested.__class__(*nested._args, many=many, **dict(nested._kwargs, sparse=sparse))
+            else:
+                declared[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True, many=many, source=field._kwargs.get('source'))
+        self._declared_fields = declared
+        self._sparse_fields = fields
+        return super().get_fields()
+
+    def get_field_names(self, declared_fields, info):
+        names = super().get_field_names(declared_fields, info)
+        fields = getattr(self, '_sparse_fields', None)
+        if fields is None:
+            return names
+        unknown = [name for name in fields if name not in names]
+        if unknown:
+            raise serializers.ValidationError({'fields': [f'Unknown field {name!r}' for name in unknown]})
+        return [name for name in names if name in fields]
@@ -0,0 +1,86 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db.models import Sum
+from django.utils import timezone
+from .models import DailyIngredientUsage, Ingredient
+from .planning import production_plan
+
+DEFAULT_HISTORY_DAYS = 14
+DEFAULT_HORIZON_DAYS = 7
+
+
+def consumption_rates(history_days=DEFAULT_HISTORY_DAYS, today=None):
+    """Average daily consumption per ingredient over the last ``history_days`` days."""
+    today = today or timezone.localdate()
+    totals = DailyIngredientUsage.objects.filter(
+        date__gt=today - timedelta(days=history_days), date__lte=today
+    ).order_by().values_list('ingredient_id').annotate(total=Sum('quantity'))
+    return {ingredient_id: total / history_days for ingredient_id, total in totals}
+
+
+def planned_demand(horizon_days=DEFAULT_HORIZON_DAYS, today=None):
+    """Recipe-based need per (date, ingredient) for the upcoming horizon."""
+    today = today or timezone.localdate()
+    plan = production_plan(today, today + timedelta(days=horizon_days - 1))
+    demand = defaultdict(Decimal)
+    for day in plan['days']:
+        for need in day['ingredients']:
+            demand[(day['date'], need['ingredient'])] += need['quantity']
+    return demand
+
+
+def days_until_stockout(quantity, daily_needs, fallback_rate):
+    """
+    Walk the expected daily consumption until stock runs out.
+
+    ``daily_needs`` covers the horizon day by day; beyond it consumption
+    continues at ``fallback_rate``. Returns None when nothing is consumed.
+    """
+    remaining = quantity
+    if remaining <= 0:
+        return Decimal('0')
+    for elapsed, need in enumerate(daily_needs):
+        if need and remaining <= need:
+            return Decimal(elapsed) + remaining / need
+        remaining -= need
+    if fallback_rate <= 0:
+        return None
+    return Decimal(len(daily_needs)) + remaining / fallback_rate
+
+
+def forecast_stock(history_days=DEFAULT_HISTORY_DAYS, horizon_days=DEFAULT_HORIZON_DAYS, today=None):
+    """
+    Project days until stockout for every ingredient.
+
+    Ingredients that appear in recipes are projected from the planned
+    demand of active subscriptions, topped up to at least their historical
+    rate; others use the rate alone. Reads the DailyIngredientUsage
+    aggregate rather than raw usage rows.
+    """
+    today = today or timezone.localdate()
+    rates = consumption_rates(history_days, today)
+    demand = planned_demand(horizon_days, today)
+    planned = {ingredient_id for _, ingredient_id in demand}
+    days = [today + timedelta(days=offset) for offset in range(horizon_days)]
+
+    forecast = []
+    for ingredient in Ingredient.objects.values('id', 'name', 'unit', 'quantity', 'minimum_stock'):
+        rate = rates.get(ingredient['id'], Decimal('0'))
+        if ingredient['id'] in planned:
+            needs = [max(demand.get((day, ingredient['id']), Decimal('0')), rate) for day in days]
+        else:
+            needs = [rate] * horizon_days
+        # Past the horizon, assume the horizon's average pace continues
+        fallback_rate = max(rate, sum(needs, Decimal('0')) / horizon_days)
+        remaining_days = days_until_stockout(ingredient['quantity'], needs, fallback_rate)
+        forecast.append(dict(
+            ingredient,
+            daily_rate=rate.quantize(Decimal('0.01')),
+            horizon_demand=sum(needs, Decimal('0')).quantize(Decimal('0.01')),
+            below_minimum=ingredient['quantity'] <= ingredient['minimum_stock'],
+            days_until_stockout=None if remaining_days is None else remaining_days.quantize(Decimal('0.1')),
+            stockout_date=None if remaining_days is None else today + timedelta(days=int(remaining_days)),
+        ))
+    forecast.sort(key=lambda entry: (entry['days_until_stockout'] is None, entry['days_until_stockout'] or 0))
+    return forecast
@@ -0,0 +1,60 @@
+from django.db import transaction
+from .models import Invoice, Payment
+from .sequences import allocate
+
+INVOICE_SEQUENCE = 'invoice_number'
+INVOICE_PREFIX = 'INV'
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def format_invoice_number(value):
+    return f'{INVOICE_PREFIX}{str(value).zfill(6)}'
+
+
+def _last_issued_number():
+    # Only consulted once, when the sequence row is first created.
+    last_invoice = Invoice.objects.order_by('-invoice_number').values_list('invoice_number', flat=True).first()
+    return int(last_invoice[len(INVOICE_PREFIX):]) if last_invoice else 0
+
+
+def allocate_invoice_numbers(count):
+    return [format_invoice_number(value) for value in allocate(INVOICE_SEQUENCE, count, _last_issued_number)]
+
+
+def next_invoice_number():
+    return allocate_invoice_numbers(1)[0]
+
+
+def create_invoices(payments, due_date, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Invoice every payment in ``payments`` that does not have an invoice yet.
+
+    Runs in one transaction: the invoice numbers are reserved as a single
+    block and the rows are written with bulk_create. A concurrent run may
+    invoice some of the same payments first; those rows are skipped by the
+    unique payment constraint (leaving gaps in the numbering) and not
+    counted. Returns the number of invoices created.
+    """
+    created = 0
+    with transaction.atomic():
+        pending = list(payments.filter(invoice__isnull=True).order_by('id').values_list('id', 'status'))
+        if not pending:
+            return 0
+        numbers = allocate_invoice_numbers(len(pending))
+        rows = [
+            Invoice(payment_id=payment_id, invoice_number=number, due_date=due_date,
+                is_paid=status == 'SUCCESS')
+            for (payment_id, status), number in zip(pending, numbers)
+        ]
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            Invoice.objects.bulk_create(chunk, ignore_conflicts=True)
+            created += Invoice.objects.filter(invoice_number__in=[row.invoice_number for row in chunk]).count()
+    return created
+
+
+def payments_for_period(date_from, date_to, statuses=None):
+    payments = Payment.objects.filter(payment_date__date__range=(date_from, date_to))
+    if statuses:
+        payments = payments.filter(status__in=statuses)
+    return payments
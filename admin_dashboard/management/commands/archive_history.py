@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard.archiving import ARCHIVE_POLICIES, DEFAULT_BATCH_SIZE, archive_cutoff, archive_rows
+
+
+class Command(BaseCommand):
+    help = 'Move old deliveries, read notifications and settled payments (with their invoices) into their archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tables', nargs='*',
+            help=f'Tables to archive: {", ".join(ARCHIVE_POLICIES)} (default: all)')
+        parser.add_argument('--older-than', type=int, metavar='DAYS',
+            help='Override ARCHIVE_AFTER_DAYS for the selected tables')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would move')
+
+    def handle(self, *args, **options):
+        unknown = set(options['tables']) - set(ARCHIVE_POLICIES)
+        if unknown:
+            raise CommandError(f'Unknown tables: {", ".join(sorted(unknown))}')
+        for name in options['tables'] or ARCHIVE_POLICIES:
+            moved = archive_rows(name, days=options['older_than'], batch_size=max(1, options['batch_size']),
+                dry_run=options['dry_run'])
+            verb = 'Would archive' if options['dry_run'] else 'Archived'
+            self.stdout.write(self.style.SUCCESS(
+                f'{verb} {moved} {name} older than {archive_cutoff(name, options["older_than"]):%Y-%m-%d}'))
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+from admin_dashboard.models import ArchivedPayment, Payment, Subscription
+from admin_dashboard.rollups import refresh_rollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailyRollup rows from the raw (and archived) payment and subscription tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Last day to rebuild (YYYY-MM-DD)')
+
+    def parse_date(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date {value!r}, expected YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        subscriptions = Subscription.objects.aggregate(first=Min('end_date'), last=Max('end_date'))
+        bounds = [subscriptions['first'], subscriptions['last']]
+        for model in (Payment, ArchivedPayment):
+            payments = model.objects.aggregate(first=Min('payment_date'), last=Max('payment_date'))
+            bounds += [timezone.localtime(value).date() for value in payments.values() if value]
+        bounds = [value for value in bounds if value]
+
+        date_from = self.parse_date(options['date_from']) if options['date_from'] else min(bounds, default=None)
+        date_to = self.parse_date(options['date_to']) if options['date_to'] else max(bounds, default=None)
+        if date_from is None or date_to is None:
+            self.stdout.write('Nothing to backfill')
+            return
+
+        day, built = date_from, 0
+        while day <= date_to:
+            refresh_rollup(day)
+            built += 1
+            day += timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {built} daily rollups ({date_from} to {date_to})'))
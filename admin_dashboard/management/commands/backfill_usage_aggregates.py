@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from admin_dashboard.models import DailyIngredientUsage, IngredientUsage
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailyIngredientUsage from the raw IngredientUsage rows'
+
+    def handle(self, *args, **options):
+        totals = IngredientUsage.objects.annotate(day=TruncDate('date_used')).order_by() \
+            .values_list('ingredient_id', 'day').annotate(total=Sum('quantity_used'))
+        rows = [DailyIngredientUsage(ingredient_id=ingredient_id, date=day, quantity=total)
+            for ingredient_id, day, total in totals]
+
+        with transaction.atomic():
+            DailyIngredientUsage.objects.all().delete()
+            DailyIngredientUsage.objects.bulk_create(rows, batch_size=2000)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(rows)} daily usage rows'))
@@ -0,0 +1,117 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+
+DEFAULT_PATHS = ['/', '/menu/', '/subscribe/', '/api/catalog/menus/', '/api/catalog/categories/']
+
+
+async def asgi_request(handler, path):
+    """Send one GET through the ASGI handler and return its status code."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '', 'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    body_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Django waits for a disconnect while the view runs; never send one.
+        await disconnected.wait()
+
+    result = {}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            result['status'] = message['status']
+
+    await handler(scope, receive, send)
+    return result['status']
+
+
+def wsgi_request(handler, path):
+    environ = {'PATH_INFO': path, 'REQUEST_METHOD': 'GET', 'wsgi.input': BytesIO()}
+    setup_testing_defaults(environ)
+    environ['HTTP_HOST'] = 'localhost'
+    status = {}
+
+    def start_response(value, headers):
+        status['code'] = int(value.split()[0])
+
+    response = handler(environ, start_response)
+    for _ in response:
+        pass
+    response.close()
+    return status['code']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark portal and catalog pages through the in-process ASGI and WSGI handlers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+        parser.add_argument('--requests', type=int, default=200, help='Requests per path')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--interface', choices=['asgi', 'wsgi', 'both'], default='both')
+
+    def handle(self, *args, **options):
+        interfaces = ['asgi', 'wsgi'] if options['interface'] == 'both' else [options['interface']]
+        for path in options['paths']:
+            for interface in interfaces:
+                run = self.run_asgi if interface == 'asgi' else self.run_wsgi
+                # One untimed request warms caches and URL resolution.
+                run(path, 1, 1)
+                elapsed, latencies, statuses = run(path, options['requests'], options['concurrency'])
+                self.report(interface, path, elapsed, latencies, statuses)
+
+    def run_asgi(self, path, total, concurrency):
+        handler = ASGIHandler()
+
+        async def timed(semaphore):
+            async with semaphore:
+                started = time.perf_counter()
+                status = await asgi_request(handler, path)
+                return time.perf_counter() - started, status
+
+        async def main():
+            semaphore = asyncio.Semaphore(concurrency)
+            started = time.perf_counter()
+            results = await asyncio.gather(*(timed(semaphore) for _ in range(total)))
+            return time.perf_counter() - started, results
+
+        elapsed, results = asyncio.run(main())
+        return elapsed, [latency for latency, _ in results], {status for _, status in results}
+
+    def run_wsgi(self, path, total, concurrency):
+        handler = WSGIHandler()
+
+        def timed(_):
+            started = time.perf_counter()
+            status = wsgi_request(handler, path)
+            return time.perf_counter() - started, status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, range(total)))
+        elapsed = time.perf_counter() - started
+        return elapsed, [latency for latency, _ in results], {status for _, status in results}
+
+    def report(self, interface, path, elapsed, latencies, statuses):
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        style = self.style.SUCCESS if statuses <= {200} else self.style.WARNING
+        self.stdout.write(style(
+            f'{interface:<5} {path:<28} {len(latencies) / elapsed:8.1f} req/s  '
+            f'p50 {cuts[49] * 1000:7.1f} ms  p95 {cuts[94] * 1000:7.1f} ms  '
+            f'status {",".join(map(str, sorted(statuses)))}'
+        ))
@@ -0,0 +1,61 @@
+import json
+import platform
+from datetime import datetime, timezone
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from admin_dashboard.benchmarks import run_benchmarks
+from admin_dashboard.models import CustomerProfile, DeliverySchedule, Notification, Payment, Subscription
+
+
+class Command(BaseCommand):
+    help = 'Drive every API GET route and portal page through the test client and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Timed requests per endpoint')
+        parser.add_argument('--include', help='Only paths matching this regular expression')
+        parser.add_argument('--exclude', help='Skip paths matching this regular expression')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='Earlier --output file to compare p95 latency against')
+
+    def handle(self, *args, **options):
+        from django_project.urls import router
+
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+        baseline = {}
+        if options['baseline']:
+            with open(options['baseline']) as handle:
+                baseline = {result['path']: result for result in json.load(handle)['results']}
+
+        with transaction.atomic():
+            # Writes made while benchmarking (the login user, lazily built
+            # rollups) are rolled back so runs stay comparable.
+            user = get_user_model().objects.create_superuser('endpoint-benchmark', password=None)
+            results = run_benchmarks(router, user, options['requests'], options['include'], options['exclude'])
+            transaction.set_rollback(True)
+
+        for result in results:
+            line = (f"{result['path']:<45} {result['status']}  p50 {result['p50_ms']:8.2f}  "
+                f"p95 {result['p95_ms']:8.2f}  p99 {result['p99_ms']:8.2f} ms  {result['queries']:5.1f} q  "
+                f"{result['peak_memory_kb']:9.1f} KiB")
+            previous = baseline.get(result['path'])
+            if previous:
+                line += f"  p95 {(result['p95_ms'] - previous['p95_ms']):+8.2f} ms"
+            self.stdout.write(line)
+
+        if options['output']:
+            report = {
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'requests_per_endpoint': options['requests'],
+                'rows': {model._meta.label: model.objects.count()
+                    for model in (CustomerProfile, Subscription, DeliverySchedule, Notification, Payment)},
+                'results': results,
+            }
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {options['output']}"))
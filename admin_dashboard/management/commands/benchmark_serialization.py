@@ -0,0 +1,105 @@
+import json
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from admin_dashboard.models import (
+    Category, CustomerProfile, DeliverySchedule, MenuList, Notification, Payment, Subscription, TimeSlot
+)
+from admin_dashboard.renderers import FastJSONRenderer, orjson
+from admin_dashboard.serializers import (
+    DeliveryScheduleSerializer, DeliveryScheduleValuesSerializer, NotificationSerializer,
+    NotificationValuesSerializer, PaymentSerializer, PaymentValuesSerializer
+)
+
+CASES = [
+    ('payments', Payment, PaymentSerializer, PaymentValuesSerializer, ('-payment_date', '-id')),
+    ('notifications', Notification, NotificationSerializer, NotificationValuesSerializer, ('-created_at', '-id')),
+    ('deliveries', DeliverySchedule, DeliveryScheduleSerializer, DeliveryScheduleValuesSerializer,
+        ('delivery_date', 'created_at', 'id')),
+]
+
+
+def seed(rows):
+    """Create ``rows`` payments, notifications and deliveries spread over a few subscriptions."""
+    category = Category.objects.create(name='Benchmark category')
+    menu = MenuList.objects.create(name='Benchmark menu', price=Decimal('120.00'))
+    menu.items.create(category=category, name='Benchmark item', price=Decimal('12.50'),
+        customization_options={'spice': ['mild', 'hot']})
+    slot = TimeSlot.objects.create(start_time='12:00', end_time='13:00')
+    customers = CustomerProfile.objects.bulk_create([
+        CustomerProfile(first_name='Bench', last_name=str(index), phone_number=f'+1555{index:07d}',
+            normalized_phone=f'+1555{index:07d}', address='1 Main St', location='Central')
+        for index in range(100)
+    ])
+    start = date.today()
+    subscriptions = Subscription.objects.bulk_create([
+        Subscription(customer=customer, menu_list=menu, time_slot=slot, start_date=start,
+            end_date=start + timedelta(days=30), selected_days=[0, 2, 4], payment_mode='CARD')
+        for customer in customers
+    ])
+    Payment.objects.bulk_create([
+        Payment(subscription=subscriptions[index % 100], amount=Decimal('120.00') + index % 7,
+            transaction_id=f'bench-{index}', status='SUCCESS', payment_method='CARD', notes='')
+        for index in range(rows)
+    ], batch_size=2000)
+    Notification.objects.bulk_create([
+        Notification(customer=customers[index % 100], type='MENU', title='New menu',
+            message='A new menu is available')
+        for index in range(rows)
+    ], batch_size=2000)
+    DeliverySchedule.objects.bulk_create([
+        DeliverySchedule(subscription=subscriptions[index % 100],
+            delivery_date=start + timedelta(days=index // 100), status='PENDING')
+        for index in range(rows)
+    ], batch_size=2000)
+
+
+class Command(BaseCommand):
+    help = 'Compare ModelSerializer + JSONRenderer against values() serializers + FastJSONRenderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Rows to seed per table')
+        parser.add_argument('--page-size', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--use-existing', action='store_true', help='Benchmark existing rows instead of seeding')
+
+    def handle(self, *args, **options):
+        if not orjson:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSONRenderer uses the stock encoder'))
+        with transaction.atomic():
+            if not options['use_existing']:
+                seed(options['rows'])
+            for label, model, serializer_class, values_serializer_class, ordering in CASES:
+                queryset = model.objects.order_by(*ordering)[:options['page_size']]
+                self.compare(label, queryset, serializer_class, values_serializer_class, options['repeat'])
+            transaction.set_rollback(True)
+
+    def compare(self, label, queryset, serializer_class, values_serializer_class, repeat):
+        def values_data():
+            serializer = values_serializer_class()
+            return serializer.to_representation(list(serializer.values(queryset.all())))
+
+        paths = {
+            'model+json': lambda: JSONRenderer().render(serializer_class(list(queryset.all()), many=True).data),
+            'model+fast': lambda: FastJSONRenderer().render(serializer_class(list(queryset.all()), many=True).data),
+            'values+fast': lambda: FastJSONRenderer().render(values_data()),
+        }
+        outputs, timings = {}, {}
+        for name, render in paths.items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                outputs[name] = render()
+            timings[name] = (time.perf_counter() - started) / repeat * 1000
+
+        baseline = json.loads(outputs['model+json'])
+        same = all(json.loads(output) == baseline for output in outputs.values())
+        summary = '  '.join(f'{name} {elapsed:7.2f} ms' for name, elapsed in timings.items())
+        speedup = timings['model+json'] / timings['values+fast']
+        style = self.style.SUCCESS if same else self.style.ERROR
+        self.stdout.write(style(
+            f'{label:<14} {len(baseline):>4} rows  {summary}  x{speedup:.1f}  '
+            f'{"identical output" if same else "OUTPUT DIFFERS"}'
+        ))
@@ -0,0 +1,40 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard.broadcasts import DEFAULT_CHUNK_SIZE, audience, send_broadcast
+
+
+class Command(BaseCommand):
+    help = 'Send a MENU or GENERAL notification to every customer in an audience'
+
+    def add_arguments(self, parser):
+        parser.add_argument('title')
+        parser.add_argument('message')
+        parser.add_argument('--type', default='GENERAL', choices=['MENU', 'GENERAL'])
+        parser.add_argument('--menu-list', type=int, help='Only subscribers of this menu')
+        parser.add_argument('--time-slot', type=int, help='Only subscribers of this time slot')
+        parser.add_argument('--location', help='Only customers in this location')
+        parser.add_argument('--active', action='store_true', help='Only customers with a subscription running today')
+        parser.add_argument('--active-on', help='Only customers with a subscription running on YYYY-MM-DD')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        active_on = None
+        if options['active_on']:
+            try:
+                active_on = datetime.strptime(options['active_on'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--active-on must be formatted as YYYY-MM-DD')
+
+        customer_ids = audience(
+            menu_list=options['menu_list'],
+            time_slot=options['time_slot'],
+            location=options['location'],
+            active_only=options['active'],
+            active_on=active_on,
+        )
+        sent = send_broadcast(
+            customer_ids, options['type'], options['title'], options['message'],
+            chunk_size=options['chunk_size'],
+            progress=lambda total: self.stdout.write(f'  {total} notifications sent'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Broadcast sent to {sent} customers'))
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from admin_dashboard.query_budget import QueryBudgetExceeded, check_list_budgets
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Fail if any API list endpoint exceeds its query budget or issues N+1 queries'
+
+    def handle(self, *args, **options):
+        from django_project.urls import router
+
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create_superuser('query-budget-check', password=None)
+                try:
+                    results = check_list_budgets(router, user)
+                except QueryBudgetExceeded as exc:
+                    raise CommandError(str(exc))
+                raise Rollback
+        except Rollback:
+            pass
+
+        for prefix, counts, budget in results:
+            self.stdout.write(f'{prefix:<20} {counts[-1]:>3} queries (budget {budget})')
+        self.stdout.write(self.style.SUCCESS('All list endpoints are within budget'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from admin_dashboard.query_plans import check_plans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot list and service queries and fail on full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan')
+
+    def handle(self, *args, **options):
+        from django_project.urls import router
+
+        with transaction.atomic():
+            results = check_plans(router)
+            transaction.set_rollback(True)
+
+        failures = []
+        for label, plan, scanned in results:
+            marker = self.style.ERROR('FULL SCAN') if scanned else self.style.SUCCESS('indexed')
+            self.stdout.write(f'{marker:<10} {label}')
+            if options['verbose_plans'] or scanned:
+                self.stdout.write('    ' + plan.replace('\n', '\n    '))
+            if scanned:
+                failures.append(label)
+
+        if failures:
+            raise CommandError(f'{len(failures)} queries fall back to a full table scan')
+        self.stdout.write(self.style.SUCCESS('All checked queries use an index'))
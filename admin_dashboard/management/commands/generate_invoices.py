@@ -0,0 +1,35 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from admin_dashboard.invoicing import DEFAULT_CHUNK_SIZE, create_invoices, payments_for_period
+
+
+class Command(BaseCommand):
+    help = 'Create invoices for every uninvoiced payment in a billing month'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Billing month as YYYY-MM (defaults to the previous month)')
+        parser.add_argument('--due-days', type=int, default=14,
+            help='Days after the end of the month that invoices fall due')
+        parser.add_argument('--status', action='append', dest='statuses',
+            help='Only invoice payments with this status (repeatable)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                year, month = (int(part) for part in options['month'].split('-'))
+                date_from = date(year, month, 1)
+            except ValueError:
+                raise CommandError('--month must be formatted as YYYY-MM')
+        else:
+            date_from = (timezone.localdate().replace(day=1) - timedelta(days=1)).replace(day=1)
+        date_to = date_from.replace(day=monthrange(date_from.year, date_from.month)[1])
+
+        created = create_invoices(
+            payments_for_period(date_from, date_to, options['statuses']),
+            due_date=date_to + timedelta(days=options['due_days']),
+            chunk_size=options['chunk_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Created {created} invoices for {date_from:%Y-%m}'))
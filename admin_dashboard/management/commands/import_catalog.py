@@ -0,0 +1,26 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard.catalog_import import CatalogImportError, import_catalog, parse_csv
+
+
+class Command(BaseCommand):
+    help = 'Upsert categories, items and menus from a JSON or CSV catalog file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Catalog file (.json or .csv)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate and report without saving')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8-sig') as catalog_file:
+                content = catalog_file.read()
+            payload = parse_csv(content) if options['path'].lower().endswith('.csv') else json.loads(content)
+            report = import_catalog(payload, dry_run=options['dry_run'])
+        except (OSError, ValueError, CatalogImportError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors']:
+            self.stderr.write(f"{error['section']}[{error['row']}] {error['name']}: {json.dumps(error['errors'])}")
+        counts = ', '.join(f'{count} {section}' for section, count in report['upserted'].items())
+        prefix = 'Dry run: would upsert' if report['dry_run'] else 'Upserted'
+        self.stdout.write(self.style.SUCCESS(f"{prefix} {counts}; {len(report['errors'])} rows rejected"))
@@ -0,0 +1,34 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard.scheduling import DEFAULT_CHUNK_SIZE, DEFAULT_HORIZON_DAYS, materialize_deliveries
+
+
+class Command(BaseCommand):
+    help = 'Expand active subscriptions into DeliverySchedule rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=DEFAULT_HORIZON_DAYS,
+            help='Number of days ahead to materialize')
+        parser.add_argument('--until', help='Materialize through this date (YYYY-MM-DD)')
+        parser.add_argument('--full', action='store_true',
+            help='Ignore the high-water mark and rebuild the whole window')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        window_end = None
+        if options['until']:
+            try:
+                window_end = datetime.strptime(options['until'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--until must be formatted as YYYY-MM-DD')
+
+        stats = materialize_deliveries(
+            window_end=window_end,
+            horizon_days=options['days'],
+            full=options['full'],
+            chunk_size=options['chunk_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Materialized {stats['window_start']} to {stats['window_end']}: "
+            f"{stats['candidates']} candidate rows, {stats['pruned']} stale rows removed"
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from admin_dashboard.customers import merge_duplicate_customers
+
+
+class Command(BaseCommand):
+    help = 'Merge customers sharing a phone number and repoint their subscriptions and notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change and roll back')
+
+    def handle(self, *args, **options):
+        summary = merge_duplicate_customers(dry_run=options['dry_run'])
+        prefix = 'Would merge' if options['dry_run'] else 'Merged'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {summary['merged']} duplicate customers into {summary['groups']} "
+            f"({summary['subscriptions']} subscriptions, {summary['notifications'] + summary['archived_notifications']} notifications repointed)"
+        ))
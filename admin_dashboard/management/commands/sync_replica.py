@@ -0,0 +1,28 @@
+import sqlite3
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from admin_dashboard.db_router import replica_alias
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database into the replica file (stands in for replication locally)'
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('No replica database is configured; set DATABASE_REPLICA_PATH')
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('sync_replica only copies SQLite files; use database replication otherwise')
+
+        replica.close()
+        source = sqlite3.connect(primary.settings_dict['NAME'])
+        target = sqlite3.connect(replica.settings_dict['NAME'])
+        try:
+            # Online backup: consistent snapshot even while the primary is being written
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(self.style.SUCCESS(f'Copied {primary.settings_dict["NAME"]} to '
+            f'{replica.settings_dict["NAME"]}'))
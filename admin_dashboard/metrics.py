@@ -0,0 +1,175 @@
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_STATEMENTS = 200
+
+current_request = ContextVar('current_request_metrics', default=None)
+
+
+class RequestStats:
+    """Counters for the request being served, reached through ``current_request``."""
+    __slots__ = ('queries', 'query_seconds', 'serialize_seconds', 'statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.statements = []
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper installed on every connection.
+
+    Costs one ContextVar lookup outside requests. Inside a request it times
+    the statement and keeps its SQL (without parameters) for the slow-request
+    sampler. The context variable follows sync_to_async, so queries from
+    async views are attributed to their request too.
+    """
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.queries += 1
+        stats.query_seconds += elapsed
+        if len(stats.statements) < MAX_STATEMENTS:
+            stats.statements.append((elapsed, sql))
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Add the enclosed block to the current request's serialization time.
+
+    Queries run inside the block (lazy relations) are already counted as
+    database time, so they are subtracted.
+    """
+    stats = current_request.get()
+    if stats is None:
+        yield
+        return
+    started, query_seconds = time.perf_counter(), stats.query_seconds
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started - (stats.query_seconds - query_seconds)
+        stats.serialize_seconds += max(elapsed, 0.0)
+
+
+class RouteMetrics:
+    __slots__ = ('count', 'seconds', 'buckets', 'queries', 'query_seconds', 'serialize_seconds', 'response_bytes')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics keyed by (method, route name, status).
+
+    Each worker process keeps its own registry; Prometheus scrapes every
+    worker and sums them. The slowest ``slow_sample_size`` requests are kept
+    with their SQL so the worst offenders can be inspected after the fact.
+    """
+
+    def __init__(self, slow_sample_size=20):
+        self.lock = Lock()
+        self.routes = {}
+        self.slow_sample_size = slow_sample_size
+        self.slow = []
+        self.sequence = itertools.count()
+
+    def observe(self, method, route, status, seconds, stats, response_bytes, path):
+        with self.lock:
+            metrics = self.routes.get((method, route, status))
+            if metrics is None:
+                metrics = self.routes[(method, route, status)] = RouteMetrics()
+            metrics.count += 1
+            metrics.seconds += seconds
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    metrics.buckets[index] += 1
+                    break
+            metrics.queries += stats.queries
+            metrics.query_seconds += stats.query_seconds
+            metrics.serialize_seconds += stats.serialize_seconds
+            metrics.response_bytes += response_bytes
+
+            if len(self.slow) < self.slow_sample_size or seconds > self.slow[0][0]:
+                sample = {
+                    'method': method, 'route': route, 'path': path, 'status': status,
+                    'seconds': round(seconds, 6), 'queries': stats.queries,
+                    'query_seconds': round(stats.query_seconds, 6),
+                    'serialize_seconds': round(stats.serialize_seconds, 6),
+                    'statements': [{'seconds': round(elapsed, 6), 'sql': sql}
+                        for elapsed, sql in sorted(stats.statements, reverse=True)[:10]],
+                }
+                entry = (seconds, next(self.sequence), sample)
+                if len(self.slow) < self.slow_sample_size:
+                    heapq.heappush(self.slow, entry)
+                else:
+                    heapq.heapreplace(self.slow, entry)
+
+    def slow_samples(self):
+        with self.lock:
+            return [sample for _, _, sample in sorted(self.slow, key=lambda entry: entry[0], reverse=True)]
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+            self.slow.clear()
+
+    def render_prometheus(self):
+        with self.lock:
+            routes = sorted(self.routes.items())
+            lines = [
+                '# HELP http_request_duration_seconds Request latency by route.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (method, route, status), metrics in routes:
+                labels = f'method="{method}",route="{route}",status="{status}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, metrics.buckets):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.count}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {metrics.seconds:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {metrics.count}')
+            for name, attribute, description in COUNTERS:
+                lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+                for (method, route, status), metrics in routes:
+                    value = getattr(metrics, attribute)
+                    value = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{{method="{method}",route="{route}",status="{status}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+COUNTERS = [
+    ('http_request_db_queries_total', 'queries', 'Database queries issued while serving requests.'),
+    ('http_request_db_seconds_total', 'query_seconds', 'Time spent in database queries.'),
+    ('http_request_serialization_seconds_total', 'serialize_seconds', 'Time spent serializing and rendering.'),
+    ('http_response_bytes_total', 'response_bytes', 'Response body bytes, excluding streamed responses.'),
+]
+
+registry = MetricsRegistry(getattr(settings, 'METRICS_SLOW_SAMPLE_SIZE', 20))
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+from .metrics import registry
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus text exposition for staff sessions and for scrapers sending
+    ``Authorization: Bearer <METRICS_TOKEN>``; ``METRICS_PUBLIC`` opens it to everyone.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    allowed = (getattr(settings, 'METRICS_PUBLIC', False)
+        or (request.user.is_active and request.user.is_staff)
+        or (token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')))
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@require_GET
+@staff_member_required
+def slow_requests(request):
+    """The slowest requests seen by this worker, with their slowest SQL statements."""
+    return JsonResponse({'results': registry.slow_samples()})
@@ -0,0 +1,111 @@
+import json
+import logging
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .db_router import pin_to_primary, reads_from_replica, replica_alias
+from .metrics import RequestStats, current_request, registry
+
+logger = logging.getLogger('admin_dashboard.requests')
+
+
+class MetricsMiddleware:
+    """
+    Record latency, query count/time, serialization time and response size
+    for every request, labelled by URL name rather than path so the number
+    of series stays bounded.
+
+    Works in both sync and async stacks. With ``METRICS_LOG_REQUESTS`` set,
+    each request is also logged as one JSON line on ``admin_dashboard.requests``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.log_requests = getattr(settings, 'METRICS_LOG_REQUESTS', False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.observe(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.observe(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def observe(self, request, response, stats, seconds):
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(request.method, route, response.status_code, seconds, stats, size, request.path)
+        if self.log_requests:
+            logger.info(json.dumps({
+                'method': request.method, 'route': route, 'path': request.path,
+                'status': response.status_code, 'ms': round(seconds * 1000, 2),
+                'queries': stats.queries, 'query_ms': round(stats.query_seconds * 1000, 2),
+                'serialize_ms': round(stats.serialize_seconds * 1000, 2), 'bytes': size,
+            }))
+
+
+class ReplicaMiddleware:
+    """
+    Serve GET/HEAD/OPTIONS requests under REPLICA_READ_PATHS (the API by
+    default) from the read replica.
+
+    The admin and the customer portal always read from the primary, since
+    their next page shows what was just saved. After a successful write the
+    client gets a short-lived cookie that keeps its reads on the primary
+    (REPLICA_PIN_SECONDS), so it always sees what it just saved even if the
+    replica lags behind. Does nothing unless a replica database is
+    configured.
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.read_paths = tuple(getattr(settings, 'REPLICA_READ_PATHS', ('/api/',)))
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.method not in self.safe_methods:
+            return self.pin(self.get_response(request))
+        if request.path.startswith(self.read_paths):
+            with reads_from_replica(request):
+                return self.get_response(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.method not in self.safe_methods:
+            return self.pin(await self.get_response(request))
+        if request.path.startswith(self.read_paths):
+            with reads_from_replica(request):
+                return await self.get_response(request)
+        return await self.get_response(request)
+
+    def pin(self, response):
+        if response.status_code < 400 and replica_alias():
+            pin_to_primary(response)
+        return response
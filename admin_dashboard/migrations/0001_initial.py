@@ -0,0 +1,203 @@
+# Generated by Django 5.0.14 on 2026-10-18 09:43
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('image', models.URLField(blank=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=50)),
+                ('last_name', models.CharField(max_length=50)),
+                ('phone_number', models.CharField(max_length=17, validators=[django.core.validators.RegexValidator(regex='^\\+?1?\\d{9,15}$')])),
+                ('address', models.TextField()),
+                ('location', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('unit', models.CharField(max_length=20)),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('minimum_stock', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('cost_per_unit', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('supplier', models.CharField(blank=True, max_length=100)),
+                ('last_restocked', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('transaction_id', models.CharField(max_length=100, unique=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SUCCESS', 'Success'), ('FAILED', 'Failed'), ('REFUNDED', 'Refunded')], default='PENDING', max_length=10)),
+                ('payment_date', models.DateTimeField(auto_now_add=True)),
+                ('payment_method', models.CharField(max_length=50)),
+                ('notes', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['-payment_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Report',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('DAILY', 'Daily Report'), ('WEEKLY', 'Weekly Report'), ('MONTHLY', 'Monthly Report')], max_length=10)),
+                ('date_from', models.DateField()),
+                ('date_to', models.DateField()),
+                ('total_revenue', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('total_subscriptions', models.IntegerField()),
+                ('active_customers', models.IntegerField()),
+                ('generated_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField(help_text='Detailed report data in JSON format')),
+            ],
+            options={
+                'ordering': ['-generated_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TimeSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Item',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('is_active', models.BooleanField(default=True)),
+                ('image', models.URLField(blank=True)),
+                ('preparation_time', models.IntegerField(default=30, help_text='Preparation time in minutes')),
+                ('customization_options', models.JSONField(blank=True, default=dict, help_text='Store customization options as JSON')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.category')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IngredientUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity_used', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('date_used', models.DateTimeField(auto_now_add=True)),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.ingredient')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.item')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MenuList',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('price', models.DecimalField(blank=True, decimal_places=2, help_text='Optional package price', max_digits=10, null=True)),
+                ('max_items', models.PositiveIntegerField(default=10)),
+                ('nutritional_info', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('items', models.ManyToManyField(to='admin_dashboard.item')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('DELIVERY', 'Delivery Update'), ('SUBSCRIPTION', 'Subscription Update'), ('MENU', 'Menu Update'), ('GENERAL', 'General Message')], max_length=12)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('is_read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.customerprofile')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('invoice_number', models.CharField(max_length=20, unique=True)),
+                ('generated_date', models.DateTimeField(auto_now_add=True)),
+                ('due_date', models.DateField()),
+                ('is_paid', models.BooleanField(default=False)),
+                ('payment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.payment')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Subscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('selected_days', models.JSONField()),
+                ('payment_mode', models.CharField(choices=[('CASH', 'Cash'), ('BANK', 'Bank Transfer'), ('CARD', 'Credit Card')], max_length=4)),
+                ('delivery_notification', models.BooleanField(default=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.customerprofile')),
+                ('menu_list', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.menulist')),
+                ('time_slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.timeslot')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='subscription',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.subscription'),
+        ),
+        migrations.CreateModel(
+            name='DeliverySchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delivery_date', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PREPARING', 'Preparing'), ('OUT', 'Out for Delivery'), ('DELIVERED', 'Delivered'), ('CANCELLED', 'Cancelled')], default='PENDING', max_length=10)),
+                ('delivery_notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.subscription')),
+            ],
+            options={
+                'ordering': ['delivery_date', 'created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,312 @@
+# Generated by Django 5.0.14 on 2026-10-18 09:43
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedDeliverySchedule',
+            fields=[
+                ('delivery_date', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PREPARING', 'Preparing'), ('OUT', 'Out for Delivery'), ('DELIVERED', 'Delivered'), ('CANCELLED', 'Cancelled')], default='PENDING', max_length=10)),
+                ('delivery_notes', models.TextField(blank=True)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['delivery_date', 'created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('type', models.CharField(choices=[('DELIVERY', 'Delivery Update'), ('SUBSCRIPTION', 'Subscription Update'), ('MENU', 'Menu Update'), ('GENERAL', 'General Message')], max_length=12)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('is_read', models.BooleanField(default=False)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('transaction_id', models.CharField(max_length=100, unique=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SUCCESS', 'Success'), ('FAILED', 'Failed'), ('REFUNDED', 'Refunded')], default='PENDING', max_length=10)),
+                ('payment_method', models.CharField(max_length=50)),
+                ('notes', models.TextField(blank=True)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('payment_date', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-payment_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyIngredientUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('payment_methods', models.JSONField(blank=True, default=dict, help_text='Successful payment counts keyed by payment method')),
+                ('subscriptions_by_start', models.JSONField(blank=True, default=dict, help_text='Counts of subscriptions ending on this date, keyed by start date')),
+                ('customers_by_start', models.JSONField(blank=True, default=dict, help_text='Customer ids with subscriptions ending on this date, keyed by start date; ids rather than counts because distinct customers do not add up across days')),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=30)),
+                ('key', models.CharField(max_length=64)),
+                ('response_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('response_body', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecipeIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=3, help_text="Ingredient quantity per portion, in the ingredient's unit", max_digits=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Watermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('materialized_through', models.DateField(blank=True, null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='customerprofile',
+            name='normalized_phone',
+            field=models.CharField(blank=True, editable=False, help_text='Digits-only phone number used to identify returning customers', max_length=17, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='timeslot',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='deliveryschedule',
+            name='subscription',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.subscription'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='customer',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.customerprofile'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='subscription',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.subscription'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name'], name='category_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['name'], name='category_inactive_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerprofile',
+            index=models.Index(fields=['last_name', 'first_name'], name='customer_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerprofile',
+            index=models.Index(fields=['last_name', 'first_name'], name='customer_name_pattern_idx', opclasses=['varchar_pattern_ops', 'varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='deliveryschedule',
+            index=models.Index(fields=['delivery_date', 'status'], name='delivery_date_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deliveryschedule',
+            index=models.Index(fields=['status', 'delivery_date', 'created_at', 'id'], name='delivery_status_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deliveryschedule',
+            index=models.Index(fields=['delivery_date', 'created_at', 'id'], name='delivery_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(condition=models.Q(('is_paid', False)), fields=['due_date'], name='invoice_unpaid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(condition=models.Q(('is_paid', True)), fields=['due_date'], name='invoice_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['customer', '-created_at', '-id'], name='notification_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['customer', '-created_at', '-id'], name='notification_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['-created_at', '-id'], name='notification_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['-created_at', '-id'], name='notification_unread_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', True)), fields=['-created_at', '-id'], name='notification_read_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'payment_date'], name='payment_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['subscription', '-payment_date', '-id'], name='payment_subscription_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['-payment_date', '-id'], name='payment_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['start_date', 'end_date'], name='subscription_start_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['end_date', 'start_date'], name='subscription_end_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='deliveryschedule',
+            constraint=models.UniqueConstraint(fields=('subscription', 'delivery_date'), name='unique_delivery_per_subscription_day'),
+        ),
+        migrations.AddField(
+            model_name='archiveddeliveryschedule',
+            name='subscription',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='admin_dashboard.subscription'),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='customer',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='admin_dashboard.customerprofile'),
+        ),
+        migrations.AddField(
+            model_name='archivedpayment',
+            name='subscription',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='admin_dashboard.subscription'),
+        ),
+        migrations.AddField(
+            model_name='dailyingredientusage',
+            name='ingredient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.ingredient'),
+        ),
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='subscription',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='admin_dashboard.subscription'),
+        ),
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='ingredient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_dashboard.ingredient'),
+        ),
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_ingredients', to='admin_dashboard.item'),
+        ),
+        migrations.AddIndex(
+            model_name='archiveddeliveryschedule',
+            index=models.Index(fields=['delivery_date', 'created_at', 'id'], name='archive_delivery_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archiveddeliveryschedule',
+            index=models.Index(fields=['subscription', 'delivery_date'], name='archive_delivery_sub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivednotification',
+            index=models.Index(fields=['customer', '-created_at', '-id'], name='archive_notif_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivednotification',
+            index=models.Index(fields=['-created_at', '-id'], name='archive_notif_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedpayment',
+            index=models.Index(fields=['status', 'payment_date'], name='archive_payment_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedpayment',
+            index=models.Index(fields=['subscription', '-payment_date', '-id'], name='archive_payment_sub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedpayment',
+            index=models.Index(fields=['-payment_date', '-id'], name='archive_payment_keyset_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyingredientusage',
+            constraint=models.UniqueConstraint(fields=('ingredient', 'date'), name='unique_ingredient_usage_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('scope', 'key'), name='unique_idempotency_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipeingredient',
+            constraint=models.UniqueConstraint(fields=('item', 'ingredient'), name='unique_recipe_ingredient'),
+        ),
+    ]
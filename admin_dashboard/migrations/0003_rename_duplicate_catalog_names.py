@@ -0,0 +1,60 @@
+from django.db import migrations
+
+
+def unique_name(name, taken, max_length):
+    """First of 'name (2)', 'name (3)', ... that is not taken, trimmed to fit the column."""
+    suffix = 2
+    while True:
+        label = f' ({suffix})'
+        candidate = name[:max_length - len(label)] + label
+        if candidate not in taken:
+            return candidate
+        suffix += 1
+
+
+def rename_duplicates(rows, max_length):
+    """Keep the oldest row of each name and rename the rest so the unique constraints can be added."""
+    renamed = []
+    taken = {name for _, name in rows}
+    seen = set()
+    for pk, name in rows:
+        if name in seen:
+            name = unique_name(name, taken, max_length)
+            taken.add(name)
+            renamed.append((pk, name))
+        seen.add(name)
+    return renamed
+
+
+def rename_duplicate_catalog_names(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    for model_name in ('Category', 'MenuList'):
+        model = apps.get_model('admin_dashboard', model_name)
+        rows = list(model.objects.using(db_alias).order_by('id').values_list('id', 'name'))
+        for pk, name in rename_duplicates(rows, model._meta.get_field('name').max_length):
+            model.objects.using(db_alias).filter(pk=pk).update(name=name)
+
+    Item = apps.get_model('admin_dashboard', 'Item')
+    max_length = Item._meta.get_field('name').max_length
+    by_category = {}
+    for pk, category_id, name in Item.objects.using(db_alias).order_by('id').values_list('id', 'category_id', 'name'):
+        by_category.setdefault(category_id, []).append((pk, name))
+    for rows in by_category.values():
+        for pk, name in rename_duplicates(rows, max_length):
+            Item.objects.using(db_alias).filter(pk=pk).update(name=name)
+
+
+class Migration(migrations.Migration):
+    """
+    Databases created before the catalog names were unique may hold
+    duplicates; rename all but the oldest to 'Name (2)', 'Name (3)', ... so
+    0004 can add the constraints. Review the renamed rows in the admin.
+    """
+
+    dependencies = [
+        ('admin_dashboard', '0002_archives_rollups_and_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_catalog_names, migrations.RunPython.noop),
+    ]
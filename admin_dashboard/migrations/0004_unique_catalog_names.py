@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0003_rename_duplicate_catalog_names'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(fields=('name',), name='unique_category_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='item',
+            constraint=models.UniqueConstraint(fields=('category', 'name'), name='unique_item_name_per_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='menulist',
+            constraint=models.UniqueConstraint(fields=('name',), name='unique_menu_list_name'),
+        ),
+    ]
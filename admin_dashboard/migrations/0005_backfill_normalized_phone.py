@@ -0,0 +1,44 @@
+from django.core.management import CommandError
+from django.db import migrations
+
+
+def normalize_phone(phone_number):
+    # Frozen copy of models.normalize_phone
+    phone_number = (phone_number or '').strip()
+    digits = ''.join(character for character in phone_number if character.isdigit())
+    return f'+{digits}' if phone_number.startswith('+') and digits else digits
+
+
+def backfill_normalized_phone(apps, schema_editor):
+    CustomerProfile = apps.get_model('admin_dashboard', 'CustomerProfile')
+    customers = list(CustomerProfile.objects.using(schema_editor.connection.alias)
+        .filter(normalized_phone__isnull=True).only('id', 'phone_number'))
+    owners = dict(CustomerProfile.objects.using(schema_editor.connection.alias)
+        .filter(normalized_phone__isnull=False).values_list('normalized_phone', 'id'))
+    duplicates = 0
+    for customer in customers:
+        customer.normalized_phone = normalize_phone(customer.phone_number) or None
+        if customer.normalized_phone in owners:
+            duplicates += 1
+        elif customer.normalized_phone:
+            owners[customer.normalized_phone] = customer.id
+    if duplicates:
+        # Merging repoints subscriptions, notifications (possibly in the
+        # archive database) and the rollups, which is the command's job
+        raise CommandError(
+            f'Found {duplicates} duplicate customers sharing a phone number. Run '
+            '`manage.py merge_duplicate_customers` and then `manage.py migrate` again.'
+        )
+    CustomerProfile.objects.using(schema_editor.connection.alias).bulk_update(
+        customers, ['normalized_phone'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0004_unique_catalog_names'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_normalized_phone, migrations.RunPython.noop),
+    ]
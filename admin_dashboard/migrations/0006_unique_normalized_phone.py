@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0005_backfill_normalized_phone'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customerprofile',
+            name='normalized_phone',
+            field=models.CharField(blank=True, editable=False, help_text='Digits-only phone number used to identify returning customers', max_length=17, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-18 09:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0006_unique_normalized_phone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedInvoice',
+            fields=[
+                ('invoice_number', models.CharField(max_length=20, unique=True)),
+                ('due_date', models.DateField()),
+                ('is_paid', models.BooleanField(default=False)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('generated_date', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payment', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='invoice', to='admin_dashboard.archivedpayment')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -1,6 +1,9 @@
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MaxValueValidator, RegexValidator
+from django.utils import timezone
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -16,6 +19,15 @@ class Category(models.Model):
     class Meta:
         verbose_name_plural = "Categories"
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['name'], name='unique_category_name'),
+        ]
+        # Django renders boolean filters as bare "WHERE is_active" / "WHERE NOT
+        # is_active", which only a partial index with the same condition serves
+        indexes = [
+            models.Index(fields=['name'], condition=Q(is_active=True), name='category_active_idx'),
+            models.Index(fields=['name'], condition=Q(is_active=False), name='category_inactive_idx'),
+        ]
 
 class Item(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
@@ -38,6 +50,22 @@ class Item(models.Model):
         if not self.is_active and self.menulist_set.filter(is_active=True).exists():
             raise ValidationError('Cannot deactivate item while it is part of an active menu')
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'name'], name='unique_item_name_per_category'),
+        ]
+
+def menu_rule_errors(is_active, max_items, item_count, inactive_count):
+    """Validation messages for a menu given its item counts."""
+    errors = []
+    if item_count > max_items:
+        errors.append(f'Menu cannot have more than {max_items} items')
+    if not item_count and is_active:
+        errors.append('Cannot activate menu list without items')
+    if inactive_count:
+        errors.append('Cannot include inactive items in menu list')
+    return errors
+
 class MenuList(models.Model):
     name = models.CharField(max_length=100)
     items = models.ManyToManyField(Item)
@@ -52,42 +80,61 @@ class MenuList(models.Model):
     
     def clean(self):
         from django.core.exceptions import ValidationError
-        if self.items.count() > self.max_items:
-            raise ValidationError(f'Menu cannot have more than {self.max_items} items')
-        if not self.items.exists() and self.is_active:
-            raise ValidationError('Cannot activate menu without items')
-        if self.items.filter(is_active=False).exists():
-            raise ValidationError('Cannot include inactive items in menu')
+        counts = self.items.aggregate(total=Count('id'), inactive=Count('id', filter=Q(is_active=False)))
+        errors = menu_rule_errors(self.is_active, self.max_items, counts['total'], counts['inactive'])
+        if errors:
+            raise ValidationError(errors)
 
     def __str__(self):
         return self.name
 
-    def clean(self):
-        from django.core.exceptions import ValidationError
-        if not self.items.exists() and self.is_active:
-            raise ValidationError('Cannot activate menu list without items')
-        if self.items.filter(is_active=False).exists():
-            raise ValidationError('Cannot include inactive items in menu list')
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name'], name='unique_menu_list_name'),
+        ]
 
 class TimeSlot(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.start_time} - {self.end_time}"
 
+def normalize_phone(phone_number):
+    """Strip formatting so '+1 (555) 010-0000' and '+15550100000' compare equal."""
+    phone_number = (phone_number or '').strip()
+    digits = ''.join(character for character in phone_number if character.isdigit())
+    return f'+{digits}' if phone_number.startswith('+') and digits else digits
+
 class CustomerProfile(models.Model):
     first_name = models.CharField(max_length=50)
     last_name = models.CharField(max_length=50)
     phone_regex = RegexValidator(regex=r'^\+?1?\d{9,15}$')
     phone_number = models.CharField(validators=[phone_regex], max_length=17)
+    normalized_phone = models.CharField(max_length=17, unique=True, null=True, blank=True, editable=False,
+        help_text="Digits-only phone number used to identify returning customers")
     address = models.TextField()
     location = models.CharField(max_length=100)
     
+    def save(self, *args, **kwargs):
+        self.normalized_phone = normalize_phone(self.phone_number) or None
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    class Meta:
+        indexes = [
+            # Admin changelist ordering
+            models.Index(fields=['last_name', 'first_name'], name='customer_name_idx'),
+            # Admin search by the start of a customer's name: LIKE 'prefix%' only
+            # uses a PostgreSQL index built with the pattern operator class
+            models.Index(fields=['last_name', 'first_name'], name='customer_name_pattern_idx',
+                opclasses=['varchar_pattern_ops', 'varchar_pattern_ops']),
+        ]
+
 class Subscription(models.Model):
     PAYMENT_CHOICES = [
         ('CASH', 'Cash'),
@@ -103,6 +150,16 @@ class Subscription(models.Model):
     selected_days = models.JSONField()  # Store weekdays as JSON array
     payment_mode = models.CharField(max_length=4, choices=PAYMENT_CHOICES)
     delivery_notification = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Subscription #{self.pk}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_date', 'end_date'], name='subscription_start_end_idx'),
+            models.Index(fields=['end_date', 'start_date'], name='subscription_end_start_idx'),
+        ]
     
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -111,7 +168,7 @@ class Subscription(models.Model):
         if delta.days > 30:
             raise ValidationError('Subscription duration cannot exceed 30 days')
 
-class DeliverySchedule(models.Model):
+class DeliveryScheduleBase(models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('PREPARING', 'Preparing'),
@@ -119,44 +176,112 @@ class DeliverySchedule(models.Model):
         ('DELIVERED', 'Delivered'),
         ('CANCELLED', 'Cancelled'),
     ]
-    
-    subscription = models.ForeignKey(Subscription, on_delete=models.CASCADE)
+    ALLOWED_TRANSITIONS = {
+        'PENDING': ['PREPARING', 'CANCELLED'],
+        'PREPARING': ['OUT', 'CANCELLED'],
+        'OUT': ['DELIVERED'],
+        'DELIVERED': [],
+        'CANCELLED': [],
+    }
+
     delivery_date = models.DateField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
     delivery_notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        abstract = True
+
+class DeliverySchedule(DeliveryScheduleBase):
+    # Indexed through unique_delivery_per_subscription_day
+    subscription = models.ForeignKey(Subscription, on_delete=models.CASCADE, db_index=False)
+
     class Meta:
         ordering = ['delivery_date', 'created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['subscription', 'delivery_date'],
+                name='unique_delivery_per_subscription_day'),
+        ]
+        indexes = [
+            models.Index(fields=['delivery_date', 'status'], name='delivery_date_status_idx'),
+            models.Index(fields=['status', 'delivery_date', 'created_at', 'id'], name='delivery_status_keyset_idx'),
+            models.Index(fields=['delivery_date', 'created_at', 'id'], name='delivery_keyset_idx'),
+        ]
 
-class Notification(models.Model):
+class IdempotencyKey(models.Model):
+    scope = models.CharField(max_length=30)
+    key = models.CharField(max_length=64)
+    subscription = models.ForeignKey(Subscription, on_delete=models.SET_NULL, null=True, blank=True)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='unique_idempotency_key'),
+        ]
+
+class Watermark(models.Model):
+    key = models.CharField(max_length=50, unique=True)
+    materialized_through = models.DateField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.key} @ {self.materialized_through}"
+
+class NumberSequence(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    last_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+class NotificationBase(models.Model):
     NOTIFICATION_TYPES = [
         ('DELIVERY', 'Delivery Update'),
         ('SUBSCRIPTION', 'Subscription Update'),
         ('MENU', 'Menu Update'),
         ('GENERAL', 'General Message')
     ]
-    
-    customer = models.ForeignKey(CustomerProfile, on_delete=models.CASCADE)
+
     type = models.CharField(max_length=12, choices=NOTIFICATION_TYPES)
     title = models.CharField(max_length=200)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        abstract = True
+
+class Notification(NotificationBase):
+    # Indexed through notification_inbox_idx
+    customer = models.ForeignKey(CustomerProfile, on_delete=models.CASCADE, db_index=False)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', '-created_at', '-id'], name='notification_inbox_idx'),
+            models.Index(fields=['customer', '-created_at', '-id'], condition=models.Q(is_read=False),
+                name='notification_unread_idx'),
+            models.Index(fields=['-created_at', '-id'], name='notification_keyset_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_read=False),
+                name='notification_unread_keyset_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_read=True),
+                name='notification_read_keyset_idx'),
+        ]
 
-class Payment(models.Model):
+class PaymentBase(models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('SUCCESS', 'Success'),
         ('FAILED', 'Failed'),
         ('REFUNDED', 'Refunded')
     ]
-    
-    subscription = models.ForeignKey(Subscription, on_delete=models.CASCADE)
+
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     transaction_id = models.CharField(max_length=100, unique=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
@@ -164,26 +289,48 @@ class Payment(models.Model):
     payment_method = models.CharField(max_length=50)
     notes = models.TextField(blank=True)
 
+    class Meta:
+        abstract = True
+
+class Payment(PaymentBase):
+    # Indexed through payment_subscription_idx
+    subscription = models.ForeignKey(Subscription, on_delete=models.CASCADE, db_index=False)
+
+    def __str__(self):
+        return self.transaction_id
+
     class Meta:
         ordering = ['-payment_date']
+        indexes = [
+            models.Index(fields=['status', 'payment_date'], name='payment_status_date_idx'),
+            models.Index(fields=['subscription', '-payment_date', '-id'], name='payment_subscription_idx'),
+            models.Index(fields=['-payment_date', '-id'], name='payment_keyset_idx'),
+        ]
 
-class Invoice(models.Model):
-    payment = models.OneToOneField(Payment, on_delete=models.CASCADE)
+class InvoiceBase(models.Model):
     invoice_number = models.CharField(max_length=20, unique=True)
     generated_date = models.DateTimeField(auto_now_add=True)
     due_date = models.DateField()
     is_paid = models.BooleanField(default=False)
-    
+
+    class Meta:
+        abstract = True
+
+class Invoice(InvoiceBase):
+    payment = models.OneToOneField(Payment, on_delete=models.CASCADE)
+
     def save(self, *args, **kwargs):
         if not self.invoice_number:
-            last_invoice = Invoice.objects.order_by('-invoice_number').first()
-            if last_invoice:
-                last_number = int(last_invoice.invoice_number[3:])
-                self.invoice_number = f'INV{str(last_number + 1).zfill(6)}'
-            else:
-                self.invoice_number = 'INV000001'
+            from .invoicing import next_invoice_number
+            self.invoice_number = next_invoice_number()
         super().save(*args, **kwargs)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['due_date'], condition=Q(is_paid=False), name='invoice_unpaid_idx'),
+            models.Index(fields=['due_date'], condition=Q(is_paid=True), name='invoice_paid_idx'),
+        ]
+
 
 class Report(models.Model):
     REPORT_TYPES = [
@@ -199,12 +346,101 @@ class Report(models.Model):
     total_subscriptions = models.IntegerField()
     active_customers = models.IntegerField()
     generated_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     data = models.JSONField(help_text="Detailed report data in JSON format")
 
     class Meta:
         ordering = ['-generated_at']
 
 
+class DailyRollup(models.Model):
+    date = models.DateField(unique=True)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    payment_methods = models.JSONField(default=dict, blank=True,
+        help_text="Successful payment counts keyed by payment method")
+    subscriptions_by_start = models.JSONField(default=dict, blank=True,
+        help_text="Counts of subscriptions ending on this date, keyed by start date")
+    customers_by_start = models.JSONField(default=dict, blank=True,
+        help_text="Customer ids with subscriptions ending on this date, keyed by start date; "
+        "ids rather than counts because distinct customers do not add up across days")
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Rollup {self.date}"
+
+    class Meta:
+        ordering = ['date']
+
+
+# Cold copies of old rows, moved by admin_dashboard.archiving. Rows keep their
+# primary key; timestamps are copied rather than regenerated, and foreign keys
+# carry no database constraint so the tables can live in a separate archive
+# database. Only the indexes the keyset pagination and history lookups use.
+
+class ArchivedDeliverySchedule(DeliveryScheduleBase):
+    archive_of = DeliverySchedule
+
+    id = models.BigIntegerField(primary_key=True)
+    subscription = models.ForeignKey(Subscription, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name='+', db_index=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['delivery_date', 'created_at']
+        indexes = [
+            models.Index(fields=['delivery_date', 'created_at', 'id'], name='archive_delivery_keyset_idx'),
+            models.Index(fields=['subscription', 'delivery_date'], name='archive_delivery_sub_idx'),
+        ]
+
+
+class ArchivedNotification(NotificationBase):
+    archive_of = Notification
+
+    id = models.BigIntegerField(primary_key=True)
+    customer = models.ForeignKey(CustomerProfile, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name='+', db_index=False)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', '-created_at', '-id'], name='archive_notif_inbox_idx'),
+            models.Index(fields=['-created_at', '-id'], name='archive_notif_keyset_idx'),
+        ]
+
+
+class ArchivedPayment(PaymentBase):
+    archive_of = Payment
+
+    id = models.BigIntegerField(primary_key=True)
+    subscription = models.ForeignKey(Subscription, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name='+', db_index=False)
+    payment_date = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-payment_date']
+        indexes = [
+            models.Index(fields=['status', 'payment_date'], name='archive_payment_status_idx'),
+            models.Index(fields=['subscription', '-payment_date', '-id'], name='archive_payment_sub_idx'),
+            models.Index(fields=['-payment_date', '-id'], name='archive_payment_keyset_idx'),
+        ]
+
+
+class ArchivedInvoice(InvoiceBase):
+    archive_of = Invoice
+
+    id = models.BigIntegerField(primary_key=True)
+    # Moved together with its payment (admin_dashboard.archiving.move_batch)
+    payment = models.OneToOneField(ArchivedPayment, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name='invoice')
+    generated_date = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+
 class Ingredient(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
@@ -223,6 +459,36 @@ class Ingredient(models.Model):
         ordering = ['name']
 
 
+class DailyIngredientUsage(models.Model):
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE)
+    date = models.DateField()
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.ingredient_id} on {self.date}: {self.quantity}"
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['ingredient', 'date'], name='unique_ingredient_usage_day'),
+        ]
+
+
+class RecipeIngredient(models.Model):
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='recipe_ingredients')
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE)
+    quantity = models.DecimalField(max_digits=10, decimal_places=3,
+        help_text="Ingredient quantity per portion, in the ingredient's unit")
+
+    def __str__(self):
+        return f"{self.item} - {self.quantity} {self.ingredient.unit} {self.ingredient.name}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'ingredient'], name='unique_recipe_ingredient'),
+        ]
+
+
 class IngredientUsage(models.Model):
     ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE)
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
@@ -230,7 +496,14 @@ class IngredientUsage(models.Model):
     date_used = models.DateTimeField(auto_now_add=True)
     
     def save(self, *args, **kwargs):
-        # Update ingredient quantity when used
-        self.ingredient.quantity -= self.quantity_used
-        self.ingredient.save()
-        super().save(*args, **kwargs)
+        # Adjust stock with F() expressions so concurrent usages can't lose updates
+        from .stock import apply_stock_deltas
+        deltas = {self.ingredient_id: self.quantity_used}
+        with transaction.atomic():
+            if not self._state.adding:
+                previous = IngredientUsage.objects.filter(pk=self.pk) \
+                    .values_list('ingredient_id', 'quantity_used').first()
+                if previous:
+                    deltas[previous[0]] = deltas.get(previous[0], 0) - previous[1]
+            super().save(*args, **kwargs)
+            apply_stock_deltas(deltas, timezone.localdate(self.date_used))
@@ -0,0 +1,204 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite ordering.
+
+    Unlike DRF's CursorPagination, which positions on the first ordering
+    field and falls back to an offset for ties, the cursor stores the value
+    of every ordering field, so each page is a single indexed range query
+    no matter how deep the client has scrolled. No total count is computed.
+    """
+    ordering = ('-id',)
+    page_size = getattr(settings, 'KEYSET_PAGE_SIZE', 20)
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def get_fields(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    @staticmethod
+    def get_value(obj, name):
+        return obj[name] if isinstance(obj, dict) else getattr(obj, name)
+
+    def encode_cursor(self, obj, reverse):
+        values = []
+        for name, _ in self.get_fields():
+            value = self.get_value(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        payload = json.dumps({'v': values, 'r': reverse}, separators=(',', ':')).encode()
+        token = urlsafe_b64encode(payload).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(token.encode()))
+            fields = self.get_fields()
+            if len(payload['v']) != len(fields):
+                raise ValueError
+            values = [model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(fields, payload['v'])]
+            return values, bool(payload['r'])
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def position_filter(self, values, reverse):
+        condition, equal = Q(), {}
+        for (name, descending), value in zip(self.get_fields(), values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def sort_rows(self, rows, reverse):
+        # Stable sorts from the last ordering field to the first
+        for name, descending in reversed(self.get_fields()):
+            rows.sort(key=lambda row: self.get_value(row, name), reverse=descending != reverse)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        ``queryset`` may also be a list of querysets sharing the ordering
+        fields (live and archived rows). Each is read with the same cursor
+        and the pages are merged, so every page is still one indexed range
+        query per table.
+        """
+        querysets = queryset if isinstance(queryset, (list, tuple)) else [queryset]
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        values, reverse = self.decode_cursor(request, querysets[0].model)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+        results = []
+        for queryset in querysets:
+            queryset = queryset.order_by(*ordering)
+            if values is not None:
+                queryset = queryset.filter(self.position_filter(values, reverse))
+            results += queryset[:page_size + 1]
+        if len(querysets) > 1:
+            self.sort_rows(results, reverse)
+            del results[page_size + 1:]
+
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.page = results
+        return results
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class NotificationPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class DeliverySchedulePagination(KeysetPagination):
+    ordering = ('delivery_date', 'created_at', 'id')
+
+
+class PaymentPagination(KeysetPagination):
+    ordering = ('-payment_date', '-id')
+
+
+def estimated_row_count(model, using):
+    """
+    The planner's row estimate for ``model``'s table, or None when the
+    database has none (SQLite before ANALYZE, PostgreSQL before its first
+    autovacuum analyze, other vendors).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute('SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s', [table])
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # The first number of every stat row is the table's row count
+            cursor.execute("SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin changelist paginator that never runs an unbounded COUNT(*).
+
+    An unfiltered changelist over a table past ``estimate_threshold`` rows
+    uses the planner's estimate. Anything else counts at most
+    ``count_limit`` rows, so a broad filter or search stops at the limit
+    instead of scanning the table; pages past it are not linked.
+    """
+    estimate_threshold = 100000
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.has_filters():
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return queryset.order_by()[:self.count_limit].count()
@@ -0,0 +1,136 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db.models import Count
+from .models import DeliverySchedule, Ingredient, Item, MenuList, RecipeIngredient, Subscription
+from .scheduling import parse_selected_days
+
+MAX_PLAN_DAYS = 62
+
+
+def schedule_groups(date_from, date_to):
+    """
+    Count active subscriptions per distinct schedule in one grouped query.
+
+    Subscriptions sharing menu, time slot, dates and weekday pattern
+    collapse into a single row, so the Python work below scales with the
+    number of distinct schedules rather than the number of subscriptions.
+    """
+    return Subscription.objects.filter(start_date__lte=date_to, end_date__gte=date_from) \
+        .order_by().values('menu_list_id', 'time_slot_id', 'start_date', 'end_date', 'selected_days') \
+        .annotate(subscriptions=Count('id'))
+
+
+def cancelled_meals(date_from, date_to):
+    """Count cancelled deliveries per (date, time_slot_id, menu_list_id) in one grouped query."""
+    return DeliverySchedule.objects.filter(delivery_date__range=(date_from, date_to), status='CANCELLED') \
+        .order_by().values_list('delivery_date', 'subscription__time_slot_id', 'subscription__menu_list_id') \
+        .annotate(meals=Count('id'))
+
+
+def menu_portions(date_from, date_to):
+    """
+    Map (date, time_slot_id, menu_list_id) to the number of meals due.
+
+    Meals come from the subscriptions' schedules, so days that have not been
+    materialized yet are planned too; deliveries already cancelled on a
+    materialized day are taken off.
+    """
+    portions = defaultdict(int)
+    for group in schedule_groups(date_from, date_to):
+        weekdays = parse_selected_days(group['selected_days'])
+        day = max(group['start_date'], date_from)
+        last = min(group['end_date'], date_to)
+        while day <= last:
+            if day.weekday() in weekdays:
+                portions[(day, group['time_slot_id'], group['menu_list_id'])] += group['subscriptions']
+            day += timedelta(days=1)
+    for day, slot_id, menu_id, meals in cancelled_meals(date_from, date_to):
+        key = (day, slot_id, menu_id)
+        if key in portions:
+            portions[key] -= meals
+            if portions[key] <= 0:
+                del portions[key]
+    return portions
+
+
+def production_plan(date_from, date_to):
+    """
+    Build the production sheet for ``date_from``..``date_to``.
+
+    Portions per item come from active subscriptions and their menus: a
+    meal is one portion of every item on its menu, as the models hold no
+    per-menu serving sizes. Ingredient needs multiply those portions by
+    RecipeIngredient quantities. Runs a fixed number of queries whatever
+    the number of subscriptions.
+    """
+    portions = menu_portions(date_from, date_to)
+    menu_ids = {menu_id for _, _, menu_id in portions}
+    menu_items = defaultdict(list)
+    for menu_id, item_id in MenuList.items.through.objects.filter(menulist_id__in=menu_ids) \
+            .values_list('menulist_id', 'item_id'):
+        menu_items[menu_id].append(item_id)
+
+    item_portions = defaultdict(int)
+    for (day, slot_id, menu_id), count in portions.items():
+        for item_id in menu_items[menu_id]:
+            item_portions[(day, slot_id, item_id)] += count
+
+    item_ids = {item_id for _, _, item_id in item_portions}
+    recipes = defaultdict(list)
+    for item_id, ingredient_id, quantity in RecipeIngredient.objects.filter(item_id__in=item_ids) \
+            .values_list('item_id', 'ingredient_id', 'quantity'):
+        recipes[item_id].append((ingredient_id, quantity))
+
+    ingredient_needs = defaultdict(Decimal)
+    for (day, _, item_id), count in item_portions.items():
+        for ingredient_id, quantity in recipes[item_id]:
+            ingredient_needs[(day, ingredient_id)] += quantity * count
+
+    items = {item['id']: item for item in Item.objects.filter(id__in=item_ids).values('id', 'name')}
+    ingredients = {ingredient['id']: ingredient for ingredient in Ingredient.objects.filter(
+        id__in={ingredient_id for _, ingredient_id in ingredient_needs}).values('id', 'name', 'unit', 'quantity')}
+    return _production_sheet(date_from, date_to, item_portions, ingredient_needs, items, ingredients)
+
+
+def _production_sheet(date_from, date_to, item_portions, ingredient_needs, items, ingredients):
+    days = {}
+    day = date_from
+    while day <= date_to:
+        days[day] = {'date': day, 'time_slots': defaultdict(list), 'ingredients': []}
+        day += timedelta(days=1)
+
+    item_totals = defaultdict(int)
+    for (day, slot_id, item_id), count in sorted(item_portions.items(), key=lambda entry: entry[0][:2]):
+        days[day]['time_slots'][slot_id].append(
+            {'item': item_id, 'name': items[item_id]['name'], 'portions': count})
+        item_totals[item_id] += count
+
+    ingredient_totals = defaultdict(Decimal)
+    for (day, ingredient_id), quantity in sorted(ingredient_needs.items()):
+        ingredient = ingredients[ingredient_id]
+        days[day]['ingredients'].append({'ingredient': ingredient_id, 'name': ingredient['name'],
+            'unit': ingredient['unit'], 'quantity': quantity})
+        ingredient_totals[ingredient_id] += quantity
+
+    return {
+        'date_from': date_from,
+        'date_to': date_to,
+        'days': [
+            dict(day, time_slots=[{'time_slot': slot_id, 'items': slot_items}
+                for slot_id, slot_items in sorted(day['time_slots'].items())])
+            for day in days.values()
+        ],
+        'totals': {
+            'items': [{'item': item_id, 'name': items[item_id]['name'], 'portions': count}
+                for item_id, count in sorted(item_totals.items())],
+            'ingredients': [{
+                'ingredient': ingredient_id,
+                'name': ingredients[ingredient_id]['name'],
+                'unit': ingredients[ingredient_id]['unit'],
+                'quantity': quantity,
+                'in_stock': ingredients[ingredient_id]['quantity'],
+                'shortfall': max(quantity - ingredients[ingredient_id]['quantity'], Decimal('0')),
+            } for ingredient_id, quantity in sorted(ingredient_totals.items())],
+        },
+    }
@@ -0,0 +1,49 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def sized_list_view(viewset, page_size):
+    """The viewset's list view with its paginator fixed to ``page_size`` rows per page."""
+    pagination_class = type(f'{viewset.pagination_class.__name__}Sized', (viewset.pagination_class,),
+        {'page_size': page_size})
+    return viewset.as_view({'get': 'list'}, pagination_class=pagination_class)
+
+
+def check_list_budgets(router, user, page_sizes=(1, 10)):
+    """
+    Request every registered list endpoint with each page size and compare
+    the query count against the viewset's ``list_query_budget``.
+
+    Returns ``(prefix, queries_per_page_size, budget)`` tuples. A count that
+    grows with the page size means an N+1 slipped in, so it is reported even
+    when it stays under budget.
+    """
+    factory = APIRequestFactory()
+    results, failures = [], []
+    for prefix, viewset, _ in router.registry:
+        budget = getattr(viewset, 'list_query_budget', None)
+        if budget is None:
+            continue
+        warm_up = factory.get(f'/api/{prefix}/')
+        force_authenticate(warm_up, user)
+        viewset.as_view({'get': 'list'})(warm_up).render()
+        counts = []
+        for page_size in page_sizes:
+            view = sized_list_view(viewset, page_size)
+            request = factory.get(f'/api/{prefix}/')
+            force_authenticate(request, user)
+            with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as context:
+                response = view(request)
+                response.render()
+            counts.append(len(context))
+        results.append((prefix, counts, budget))
+        if max(counts) > budget or len(set(counts)) > 1:
+            failures.append(f'{prefix}: {counts} queries for page sizes {list(page_sizes)}, budget {budget}')
+    if failures:
+        raise QueryBudgetExceeded('\n'.join(failures))
+    return results
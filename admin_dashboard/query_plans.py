@@ -0,0 +1,139 @@
+import re
+from datetime import date
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections, router as db_router
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from .models import Notification, Subscription
+from .pagination import KeysetPagination
+
+# Filter combinations served by each list endpoint, keyed by router prefix.
+# Every query parameter a viewset filters on appears here; unfiltered lists
+# of the small catalog tables are left out. Values only need to be
+# well-formed; plans do not depend on them.
+VIEWSET_PLAN_CHECKS = {
+    'categories': [
+        {'is_active': 'true'},
+    ],
+    'items': [
+        {'category': '1'},
+    ],
+    'subscriptions': [
+        {'customer_id': '1'},
+    ],
+    'deliveries': [
+        {},
+        {'date': '2024-01-01'},
+        {'status': 'PENDING'},
+        {'date': '2024-01-01', 'status': 'PENDING'},
+    ],
+    'notifications': [
+        {},
+        {'customer_id': '1'},
+        {'is_read': 'false'},
+        {'customer_id': '1', 'is_read': 'false'},
+    ],
+    'payments': [
+        {},
+        {'subscription_id': '1'},
+        {'status': 'SUCCESS'},
+        {'subscription_id': '1', 'status': 'SUCCESS'},
+    ],
+    'invoices': [
+        {'is_paid': 'false'},
+    ],
+    'ingredient-usage': [
+        {'ingredient': '1'},
+    ],
+    'recipe-ingredients': [
+        {'item': '1'},
+    ],
+}
+
+
+def service_plan_checks():
+    """Hot querysets issued outside the viewsets."""
+    today = date(2024, 1, 1)
+    return {
+        'subscriptions ending on a day': Subscription.objects.filter(end_date=today),
+        'subscriptions active in a window': Subscription.objects.filter(
+            start_date__lte=today, end_date__gte=today),
+        'unread notifications': Notification.objects.filter(customer_id=1, is_read=False)[:20],
+    }
+
+
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN (\w+)$')
+SQLITE_INDEX_WALK = re.compile(r'\bSCAN (\w+) USING (?:COVERING )?INDEX (\w+)$')
+POSTGRES_FULL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def full_scans(plan, vendor, filtered=False, partial_indexes=()):
+    """
+    Return the tables a textual EXPLAIN plan reads without an index.
+
+    For a ``filtered`` query, walking a whole index in order (SQLite's
+    ``SCAN t USING INDEX``) counts too: the filter is then checked row by
+    row, which reads the entire table when few rows match. Walking one of
+    ``partial_indexes`` is fine, as it only holds the rows that match.
+    """
+    if vendor == 'sqlite':
+        tables = []
+        for line in plan.splitlines():
+            if match := SQLITE_FULL_SCAN.search(line.strip()):
+                tables.append(match.group(1))
+            elif filtered and (match := SQLITE_INDEX_WALK.search(line.strip())) \
+                    and match.group(2) not in partial_indexes:
+                tables.append(match.group(1))
+        return tables
+    if vendor == 'postgresql':
+        return POSTGRES_FULL_SCAN.findall(plan)
+    return []
+
+
+def list_queryset(viewset, params):
+    """Build the queryset a list request with ``params`` would evaluate."""
+    view = viewset()
+    request = Request(APIRequestFactory().get('/', params))
+    request.user = AnonymousUser()
+    view.request, view.args, view.kwargs = request, (), {}
+    view.action, view.format_kwarg = 'list', None
+    queryset = view.filter_queryset(view.get_queryset())
+
+    paginator = view.paginator
+    if isinstance(paginator, KeysetPagination):
+        return queryset.order_by(*paginator.ordering)[:paginator.page_size + 1]
+    return queryset[:10]
+
+
+def explain(queryset):
+    connection = connections[db_router.db_for_read(queryset.model)]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # Only meaningful inside a transaction; forces the planner to use
+            # an index whenever one applies, regardless of table statistics.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return connection.vendor, queryset.explain()
+
+
+def check_plans(api_router):
+    """
+    EXPLAIN every registered access path and collect full table scans.
+
+    Returns ``(label, plan, scanned_tables)`` tuples.
+    """
+    viewsets = {prefix: viewset for prefix, viewset, _ in api_router.registry}
+    checks = []
+    for prefix, param_sets in VIEWSET_PLAN_CHECKS.items():
+        for params in param_sets:
+            label = f"/api/{prefix}/?{'&'.join(f'{key}={value}' for key, value in params.items())}"
+            checks.append((label, list_queryset(viewsets[prefix], params), bool(params)))
+    checks += [(label, queryset, True) for label, queryset in service_plan_checks().items()]
+
+    results = []
+    for label, queryset, filtered in checks:
+        vendor, plan = explain(queryset)
+        meta = queryset.model._meta
+        partial_indexes = {index.name for index in meta.indexes if index.condition is not None}
+        scanned = full_scans(plan, vendor, filtered, partial_indexes)
+        results.append((label, plan, [name for name in scanned if name == meta.db_table]))
+    return results
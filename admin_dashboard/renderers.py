@@ -0,0 +1,40 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from .metrics import timed_serialization
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Datetimes, dates and times are passed to DRF's encoder, whose formatting
+# (microseconds, 'Z' for UTC) differs between DRF releases
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+fallback_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson when it is installed.
+
+    orjson encodes dicts, lists, strings and numbers in C; anything else
+    (temporal values, Decimal, lazy strings, querysets...) goes through DRF's
+    own encoder, and U+2028/U+2029 are escaped the same way, so the output
+    matches JSONRenderer byte for byte. Integers beyond 64 bits fall back to
+    the stock renderer, as do indented, non-compact or ASCII-only output and
+    installs without orjson.
+
+    One difference remains: NaN and infinite floats render as null, where
+    JSONRenderer refuses them with a ValueError.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed_serialization():
+            if (orjson is None or data is None or not self.compact or self.ensure_ascii
+                    or self.get_indent(accepted_media_type, renderer_context or {})):
+                return super().render(data, accepted_media_type, renderer_context)
+            try:
+                ret = orjson.dumps(data, default=fallback_encoder.default, option=ORJSON_OPTIONS)
+            except orjson.JSONEncodeError:
+                return super().render(data, accepted_media_type, renderer_context)
+            return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
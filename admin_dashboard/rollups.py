@@ -0,0 +1,164 @@
+from collections import Counter
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from .models import ArchivedPayment, DailyRollup, Payment, Subscription
+
+
+@transaction.atomic
+def refresh_rollup(day):
+    """
+    Recompute the rollup row for a single day from the raw tables.
+
+    Runs in a transaction so the raw tables are read from the primary even
+    when the caller reads from a replica; a lagging copy must never be
+    written back as the day's totals.
+    """
+    revenue, methods = Decimal('0'), Counter()
+    # Archived payments still belong to their day's totals
+    for model in (Payment, ArchivedPayment):
+        payments = model.objects.filter(payment_date__date=day, status='SUCCESS')
+        revenue += payments.aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
+        methods.update(dict(payments.order_by().values_list('payment_method').annotate(count=Count('id'))))
+
+    subscriptions_by_start = Counter()
+    customers_by_start = {}
+    for start_date, customer_id in Subscription.objects.filter(end_date=day).values_list(
+            'start_date', 'customer_id'):
+        key = start_date.isoformat()
+        subscriptions_by_start[key] += 1
+        customers_by_start.setdefault(key, set()).add(customer_id)
+
+    rollup, _ = DailyRollup.objects.update_or_create(date=day, defaults={
+        'revenue': revenue,
+        'payment_methods': dict(sorted(methods.items())),
+        'subscriptions_by_start': dict(subscriptions_by_start),
+        'customers_by_start': {key: sorted(ids) for key, ids in customers_by_start.items()},
+    })
+    return rollup
+
+
+def payment_day(payment_date):
+    return timezone.localtime(payment_date).date() if payment_date else None
+
+
+def refresh_rollups(days):
+    """
+    Recompute every day in ``days``.
+
+    The model signals only see single-row saves and deletes; code that
+    writes payments or subscriptions with QuerySet.update, bulk_create or a
+    raw delete calls this with the days it touched.
+    """
+    for day in sorted({day for day in days if day is not None}):
+        refresh_rollup(day)
+
+
+def payment_share(payment_date, status, amount, payment_method):
+    """The ``(day, amount, method)`` a payment adds to the rollups, or None when it adds nothing."""
+    if status != 'SUCCESS' or payment_date is None:
+        return None
+    return payment_day(payment_date), Decimal(str(amount)), payment_method
+
+
+def subscription_share(start_date, end_date, customer_id):
+    """The ``(day, start key, customer id)`` a subscription adds to the rollups."""
+    return end_date, start_date.isoformat(), customer_id
+
+
+@transaction.atomic
+def adjust_rollup(day, revenue=Decimal('0'), methods=None, starts=None, customers=None):
+    """
+    Apply one row's change to ``day``'s rollup without rescanning the day.
+
+    ``methods`` and ``starts`` map keys to count deltas; ``customers`` maps
+    start keys to ``(customer_id, present)`` pairs. A day that was never
+    built is computed from the raw tables instead, which already hold the
+    change. The revenue UPDATE runs first so the row (and SQLite's write
+    lock) is held before the JSON counters are read and rewritten.
+    """
+    if not DailyRollup.objects.filter(date=day).update(revenue=F('revenue') + revenue):
+        refresh_rollup(day)
+        return
+    rollup = DailyRollup.objects.select_for_update().get(date=day)
+    for field, deltas in (('payment_methods', methods), ('subscriptions_by_start', starts)):
+        counts = Counter(getattr(rollup, field))
+        for key, delta in (deltas or {}).items():
+            counts[key] += delta
+        # Keys that drop to zero disappear, as they would from a rebuild
+        setattr(rollup, field, {key: count for key, count in sorted(counts.items()) if count})
+    for key, (customer_id, present) in (customers or {}).items():
+        ids = set(rollup.customers_by_start.pop(key, ())) - {customer_id}
+        if present:
+            ids.add(customer_id)
+        if ids:
+            rollup.customers_by_start[key] = sorted(ids)
+    rollup.save(update_fields=['payment_methods', 'subscriptions_by_start', 'customers_by_start',
+        'refreshed_at'])
+
+
+def apply_payment_change(old, new):
+    """Move a payment's contribution from share ``old`` to share ``new`` (see payment_share)."""
+    if old == new:
+        return
+    if old is not None:
+        day, amount, method = old
+        adjust_rollup(day, revenue=-amount, methods={method: -1})
+    if new is not None:
+        day, amount, method = new
+        adjust_rollup(day, revenue=amount, methods={method: 1})
+
+
+def apply_subscription_change(old, new):
+    """Move a subscription's contribution from share ``old`` to share ``new`` (see subscription_share)."""
+    if old == new:
+        return
+    if old is not None:
+        day, key, customer_id = old
+        # The customer stays listed while another of their subscriptions matches
+        present = Subscription.objects.filter(end_date=day, start_date=key, customer_id=customer_id).exists()
+        adjust_rollup(day, starts={key: -1}, customers={key: (customer_id, present)})
+    if new is not None:
+        day, key, customer_id = new
+        adjust_rollup(day, starts={key: 1}, customers={key: (customer_id, True)})
+
+
+def summarize(start_date, end_date):
+    """
+    Build the report_data dict for a date range from rollup rows.
+
+    Matches the raw-table definitions: revenue and payment methods of
+    successful payments in the range, subscriptions that start and end
+    inside the range, and the distinct customers holding them.
+
+    Distinct customers do not add up across days, so each rollup keeps the
+    customer ids themselves: a day's row grows with the number of customers
+    whose subscriptions end on it, not with the size of the table.
+
+    Only stored rows are read; a day without a row had no payments or
+    subscription ends. The signals create rows as data is written, so an
+    existing database needs one ``manage.py backfill_rollups`` run first.
+    """
+    first_start = start_date.isoformat()
+    revenue = Decimal('0')
+    methods = Counter()
+    subscription_count = 0
+    customers = set()
+
+    for rollup in DailyRollup.objects.filter(date__range=(start_date, end_date)):
+        revenue += rollup.revenue
+        methods.update(rollup.payment_methods)
+        for key, count in rollup.subscriptions_by_start.items():
+            if key >= first_start:
+                subscription_count += count
+        for key, ids in rollup.customers_by_start.items():
+            if key >= first_start:
+                customers.update(ids)
+
+    return {
+        'subscription_count': subscription_count,
+        'revenue': float(revenue),
+        'payment_methods': dict(sorted(methods.items())),
+        'active_customers': len(customers),
+    }
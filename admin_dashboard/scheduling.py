@@ -0,0 +1,138 @@
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from .models import DeliverySchedule, Subscription, Watermark
+
+WATERMARK_KEY = 'delivery_schedule'
+DEFAULT_HORIZON_DAYS = 14
+DEFAULT_CHUNK_SIZE = 2000
+WEEKDAY_NAMES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+ONE_DAY = timedelta(days=1)
+
+
+def parse_selected_days(selected_days):
+    """Normalize Subscription.selected_days to a set of weekday numbers (Monday=0)."""
+    days = set()
+    for day in selected_days or []:
+        if isinstance(day, str) and not day.strip().isdigit():
+            prefix = day.strip().lower()[:3]
+            if prefix in WEEKDAY_NAMES:
+                days.add(WEEKDAY_NAMES.index(prefix))
+            continue
+        try:
+            day = int(day)
+        except (TypeError, ValueError):
+            continue
+        if 0 <= day <= 6:
+            days.add(day)
+    return days
+
+
+def delivery_dates(start_date, end_date, selected_days, window_start, window_end):
+    days = parse_selected_days(selected_days)
+    current = max(start_date, window_start)
+    last = min(end_date, window_end)
+    if not days:
+        return
+    while current <= last:
+        if current.weekday() in days:
+            yield current
+        current += ONE_DAY
+
+
+def _overlapping(queryset, window_start, window_end):
+    return queryset.filter(start_date__lte=window_end, end_date__gte=window_start)
+
+
+def _flush(rows, chunk_size):
+    if rows:
+        with transaction.atomic():
+            DeliverySchedule.objects.bulk_create(rows, batch_size=chunk_size, ignore_conflicts=True)
+    return len(rows)
+
+
+def _expand(subscriptions, window_start, window_end, chunk_size):
+    candidates = 0
+    rows = []
+    fields = ('id', 'start_date', 'end_date', 'selected_days')
+    for sub_id, start, end, selected in subscriptions.values_list(*fields).iterator(chunk_size=chunk_size):
+        for day in delivery_dates(start, end, selected, window_start, window_end):
+            rows.append(DeliverySchedule(subscription_id=sub_id, delivery_date=day))
+        if len(rows) >= chunk_size:
+            candidates += _flush(rows, chunk_size)
+            rows = []
+    return candidates + _flush(rows, chunk_size)
+
+
+def _prune_stale(subscriptions, window_start, window_end, chunk_size):
+    """Drop PENDING rows of changed subscriptions that no longer match their schedule."""
+    pruned = 0
+    fields = ('id', 'start_date', 'end_date', 'selected_days')
+    batch = {}
+
+    def prune(batch):
+        existing = DeliverySchedule.objects.filter(
+            subscription_id__in=batch.keys(),
+            status='PENDING',
+            delivery_date__range=(window_start, window_end),
+        ).values_list('id', 'subscription_id', 'delivery_date')
+        stale = [pk for pk, sub_id, day in existing if day not in batch[sub_id]]
+        if stale:
+            DeliverySchedule.objects.filter(id__in=stale).delete()
+        return len(stale)
+
+    for sub_id, start, end, selected in subscriptions.values_list(*fields).iterator(chunk_size=chunk_size):
+        batch[sub_id] = set(delivery_dates(start, end, selected, window_start, window_end))
+        if len(batch) >= chunk_size:
+            pruned += prune(batch)
+            batch = {}
+    if batch:
+        pruned += prune(batch)
+    return pruned
+
+
+def materialize_deliveries(window_end=None, horizon_days=DEFAULT_HORIZON_DAYS, today=None,
+                           full=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Expand subscriptions into DeliverySchedule rows up to ``window_end``.
+
+    Incremental runs only expand dates past the stored high-water mark, plus
+    the whole window for subscriptions edited since the previous run. Pass
+    ``full=True`` to rebuild the window for every subscription; it also drops
+    PENDING rows that fall outside their subscription's current range, up to
+    the furthest date materialized so far.
+    """
+    today = today or timezone.localdate()
+    window_end = window_end or today + timedelta(days=horizon_days)
+    started_at = timezone.now()
+    mark, _ = Watermark.objects.get_or_create(key=WATERMARK_KEY)
+
+    prune_through = window_end
+    if full or mark.materialized_through is None or mark.last_run_at is None:
+        new_from = today
+        changed = Subscription.objects.none()
+        if full and mark.materialized_through is not None:
+            prune_through = max(window_end, mark.materialized_through)
+        # A shortened or cancelled subscription may no longer overlap the
+        # window, so it is found through its pending rows instead
+        stale = Subscription.objects.filter(id__in=DeliverySchedule.objects.filter(
+            status='PENDING', delivery_date__range=(today, prune_through)).values('subscription_id'))
+    else:
+        new_from = max(today, mark.materialized_through + ONE_DAY)
+        stale = Subscription.objects.filter(updated_at__gte=mark.last_run_at)
+        changed = _overlapping(stale, today, window_end)
+
+    stats = {'window_start': today, 'window_end': window_end, 'candidates': 0, 'pruned': 0}
+    if stale.exists():
+        stats['pruned'] = _prune_stale(stale, today, prune_through, chunk_size)
+    if new_from <= window_end:
+        subscriptions = _overlapping(Subscription.objects.all(), new_from, window_end)
+        stats['candidates'] += _expand(subscriptions, new_from, window_end, chunk_size)
+    if changed.exists():
+        stats['candidates'] += _expand(changed, today, window_end, chunk_size)
+
+    if mark.materialized_through is None or window_end > mark.materialized_through:
+        mark.materialized_through = window_end
+    mark.last_run_at = started_at
+    mark.save()
+    return stats
@@ -0,0 +1,292 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+from .catalog import bump_catalog_version
+from .invoicing import allocate_invoice_numbers
+from .models import (
+    Category, CustomerProfile, DeliverySchedule, Ingredient, IngredientUsage, Invoice, Item, MenuList,
+    Notification, Payment, RecipeIngredient, Report, Subscription, TimeSlot
+)
+from .rollups import summarize
+from .scheduling import delivery_dates
+
+# Row counts at --scale 1
+VOLUMES = {
+    'categories': 12,
+    'items_per_category': 20,
+    'menus': 30,
+    'time_slots': 6,
+    'ingredients': 150,
+    'customers': 50_000,
+    'subscriptions': 200_000,
+    'notifications': 1_000_000,
+    'ingredient_usages': 100_000,
+}
+HISTORY_DAYS = 365
+PAYMENT_METHODS = ['CARD', 'BANK', 'CASH', 'WALLET']
+LOCATIONS = ['Central', 'North', 'South', 'East', 'West', 'Harbour', 'Airport', 'University']
+UNITS = ['kg', 'liters', 'pieces', 'grams']
+LAST_NAMES = ['Smith', 'Khan', 'Garcia', 'Okafor', 'Chen', 'Novak', 'Silva', 'Haddad']
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep the timestamps we set instead of stamping now()."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def timestamp_field(model, name):
+    return model._meta.get_field(name)
+
+
+class Seeder:
+    """
+    Fill an empty database with realistic volumes for every admin_dashboard model.
+
+    Everything is drawn from one ``random.Random(seed)`` relative to
+    ``anchor``, so the same seed, scale and anchor always produce the same
+    rows. Large tables are generated and written in batches to keep memory
+    flat; derived tables (rollups, daily usage) are rebuilt by the existing
+    backfill commands.
+    """
+
+    def __init__(self, seed=0, scale=1.0, anchor=None, batch_size=5000, stdout=None):
+        self.random = random.Random(seed)
+        self.scale = scale
+        self.anchor = anchor or timezone.localdate()
+        self.batch_size = batch_size
+        self.stdout = stdout
+        self.counts = {}
+
+    def volume(self, name):
+        return max(1, int(VOLUMES[name] * self.scale))
+
+    def moment(self, day):
+        """A deterministic instant during ``day``."""
+        seconds = self.random.randrange(7 * 3600, 21 * 3600)
+        return timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(seconds=seconds))
+
+    def log(self, label, count, started):
+        self.counts[label] = count
+        if self.stdout:
+            self.stdout.write(f'{label:<22} {count:>10,} rows  {time.perf_counter() - started:6.1f}s')
+
+    def write(self, model, rows):
+        with transaction.atomic():
+            model.objects.bulk_create(rows, batch_size=self.batch_size)
+        return len(rows)
+
+    def stream(self, model, rows):
+        """bulk_create rows from a generator in batches; returns the number written."""
+        batch, written = [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                written += self.write(model, batch)
+                batch = []
+        return written + self.write(model, batch)
+
+    def ids(self, model):
+        # The database starts empty, so ids come back in insertion order
+        return list(model.objects.order_by('id').values_list('id', flat=True))
+
+    def seed_catalog(self):
+        started = time.perf_counter()
+        rand = self.random
+        self.write(Category, [Category(name=f'Category {index:02d}', description=f'Seeded category {index}')
+            for index in range(VOLUMES['categories'])])
+        category_ids = self.ids(Category)
+        self.write(Item, [
+            Item(category_id=category_id, name=f'Item {category_index:02d}-{index:02d}',
+                description='Seeded item', price=Decimal(rand.randrange(300, 2500)) / 100,
+                preparation_time=rand.choice([10, 15, 20, 30, 45]),
+                customization_options={'spice': ['mild', 'medium', 'hot']} if rand.random() < 0.3 else {})
+            for category_index, category_id in enumerate(category_ids)
+            for index in range(VOLUMES['items_per_category'])
+        ])
+        self.item_ids = self.ids(Item)
+        self.write(MenuList, [
+            MenuList(name=f'Menu {index:02d}', description='Seeded menu', price=Decimal(rand.randrange(80, 300)),
+                max_items=10, nutritional_info={'calories': rand.randrange(1500, 2600)})
+            for index in range(VOLUMES['menus'])
+        ])
+        self.menu_ids = self.ids(MenuList)
+        through = MenuList.items.through
+        self.write(through, [through(menulist_id=menu_id, item_id=item_id)
+            for menu_id in self.menu_ids for item_id in rand.sample(self.item_ids, rand.randrange(5, 11))])
+        self.write(TimeSlot, [TimeSlot(start_time=f'{hour:02d}:00', end_time=f'{hour + 1:02d}:00')
+            for hour in range(7, 7 + 2 * VOLUMES['time_slots'], 2)])
+        self.slot_ids = self.ids(TimeSlot)
+
+        self.write(Ingredient, [
+            Ingredient(name=f'Ingredient {index:03d}', unit=rand.choice(UNITS),
+                quantity=Decimal(rand.randrange(50, 5000)), minimum_stock=Decimal(rand.randrange(10, 200)),
+                cost_per_unit=Decimal(rand.randrange(50, 3000)) / 100, supplier=f'Supplier {index % 12}')
+            for index in range(VOLUMES['ingredients'])
+        ])
+        self.ingredient_ids = self.ids(Ingredient)
+        self.write(RecipeIngredient, [
+            RecipeIngredient(item_id=item_id, ingredient_id=ingredient_id,
+                quantity=Decimal(rand.randrange(5, 400)) / 1000)
+            for item_id in self.item_ids for ingredient_id in rand.sample(self.ingredient_ids, rand.randrange(3, 7))
+        ])
+        self.log('catalog', len(self.item_ids) + len(self.menu_ids), started)
+
+    def seed_customers(self):
+        started = time.perf_counter()
+        rand = self.random
+        count = self.volume('customers')
+
+        def rows():
+            for index in range(count):
+                phone = f'+1{5550000000 + index}'
+                yield CustomerProfile(first_name=f'Customer{index}', last_name=rand.choice(LAST_NAMES),
+                    phone_number=phone, normalized_phone=phone, address=f'{rand.randrange(1, 999)} Seed Street',
+                    location=rand.choice(LOCATIONS))
+        self.stream(CustomerProfile, rows())
+        self.customer_ids = self.ids(CustomerProfile)
+        self.log('customers', count, started)
+
+    def seed_subscriptions(self):
+        started = time.perf_counter()
+        rand = self.random
+        self.subscriptions = []
+        for _ in range(self.volume('subscriptions')):
+            start = self.anchor - timedelta(days=rand.randrange(-14, HISTORY_DAYS))
+            end = start + timedelta(days=rand.randrange(6, 31))
+            days = sorted(rand.sample(range(7), rand.randrange(2, 7)))
+            self.subscriptions.append((rand.choice(self.customer_ids), start, end, days))
+
+        with explicit_timestamps(timestamp_field(Subscription, 'updated_at')):
+            self.stream(Subscription, (
+                Subscription(customer_id=customer_id, menu_list_id=rand.choice(self.menu_ids),
+                    time_slot_id=rand.choice(self.slot_ids), start_date=start, end_date=end, selected_days=days,
+                    payment_mode=rand.choice(['CASH', 'BANK', 'CARD']), delivery_notification=rand.random() < 0.8,
+                    updated_at=self.moment(start - timedelta(days=1)))
+                for customer_id, start, end, days in self.subscriptions
+            ))
+        self.subscription_ids = self.ids(Subscription)
+        self.log('subscriptions', len(self.subscription_ids), started)
+
+    def delivery_status(self, day):
+        if day > self.anchor:
+            return 'PENDING'
+        if day == self.anchor:
+            return self.random.choice(['PENDING', 'PREPARING', 'OUT'])
+        return 'CANCELLED' if self.random.random() < 0.03 else 'DELIVERED'
+
+    def seed_deliveries(self):
+        started = time.perf_counter()
+
+        def rows():
+            for subscription_id, (_, start, end, days) in zip(self.subscription_ids, self.subscriptions):
+                for day in delivery_dates(start, end, days, start, end):
+                    stamp = self.moment(start - timedelta(days=1))
+                    yield DeliverySchedule(subscription_id=subscription_id, delivery_date=day,
+                        status=self.delivery_status(day), created_at=stamp, updated_at=stamp)
+        with explicit_timestamps(timestamp_field(DeliverySchedule, 'created_at'),
+                timestamp_field(DeliverySchedule, 'updated_at')):
+            count = self.stream(DeliverySchedule, rows())
+        self.log('deliveries', count, started)
+
+    def seed_payments(self):
+        started = time.perf_counter()
+        rand = self.random
+
+        def rows():
+            number = 0
+            for subscription_id, (_, start, _, _) in zip(self.subscription_ids, self.subscriptions):
+                attempts = ['FAILED', 'SUCCESS'] if rand.random() < 0.08 else [
+                    rand.choices(['SUCCESS', 'REFUNDED', 'PENDING'], [0.95, 0.03, 0.02])[0]]
+                for status in attempts:
+                    number += 1
+                    yield Payment(subscription_id=subscription_id, amount=Decimal(rand.randrange(8000, 30000)) / 100,
+                        transaction_id=f'SEED{number:09d}', status=status, payment_method=rand.choice(PAYMENT_METHODS),
+                        payment_date=self.moment(start - timedelta(days=rand.randrange(0, 3))))
+        with explicit_timestamps(timestamp_field(Payment, 'payment_date')):
+            count = self.stream(Payment, rows())
+        self.log('payments', count, started)
+
+        started = time.perf_counter()
+        invoiced = Payment.objects.filter(status__in=['SUCCESS', 'REFUNDED']).order_by('id') \
+            .values_list('id', 'payment_date', 'status')
+        numbers = iter(allocate_invoice_numbers(invoiced.count()))
+        with explicit_timestamps(timestamp_field(Invoice, 'generated_date')):
+            count = self.stream(Invoice, (
+                Invoice(payment_id=payment_id, invoice_number=next(numbers), generated_date=paid_at,
+                    due_date=paid_at.date() + timedelta(days=7), is_paid=status == 'SUCCESS')
+                for payment_id, paid_at, status in invoiced.iterator(chunk_size=self.batch_size)
+            ))
+        self.log('invoices', count, started)
+
+    def seed_notifications(self):
+        started = time.perf_counter()
+        rand = self.random
+        types = [choice for choice, _ in Notification.NOTIFICATION_TYPES]
+
+        def rows():
+            for _ in range(self.volume('notifications')):
+                age = rand.randrange(0, HISTORY_DAYS)
+                kind = rand.choice(types)
+                yield Notification(customer_id=rand.choice(self.customer_ids), type=kind,
+                    title=f'{kind.title()} update', message='Seeded notification',
+                    is_read=age > 7 and rand.random() < 0.85, created_at=self.moment(self.anchor - timedelta(days=age)))
+        with explicit_timestamps(timestamp_field(Notification, 'created_at')):
+            count = self.stream(Notification, rows())
+        self.log('notifications', count, started)
+
+    def seed_usage(self):
+        started = time.perf_counter()
+        rand = self.random
+        recipes = list(RecipeIngredient.objects.values_list('item_id', 'ingredient_id'))
+
+        def rows():
+            for _ in range(self.volume('ingredient_usages')):
+                item_id, ingredient_id = rand.choice(recipes)
+                yield IngredientUsage(ingredient_id=ingredient_id, item_id=item_id,
+                    quantity_used=Decimal(rand.randrange(10, 500)) / 100,
+                    date_used=self.moment(self.anchor - timedelta(days=rand.randrange(0, HISTORY_DAYS))))
+        # bulk_create skips IngredientUsage.save, so stock levels stay as seeded
+        with explicit_timestamps(timestamp_field(IngredientUsage, 'date_used')):
+            count = self.stream(IngredientUsage, rows())
+        self.log('ingredient usages', count, started)
+
+    def seed_derived(self):
+        started = time.perf_counter()
+        call_command('backfill_usage_aggregates', stdout=self.stdout)
+        call_command('backfill_rollups', stdout=self.stdout)
+        month_start = self.anchor.replace(day=1)
+        reports = []
+        for _ in range(12):
+            previous = (month_start - timedelta(days=1)).replace(day=1)
+            data = summarize(previous, month_start - timedelta(days=1))
+            reports.append(Report(type='MONTHLY', date_from=previous, date_to=month_start - timedelta(days=1),
+                total_revenue=data['revenue'], total_subscriptions=data['subscription_count'],
+                active_customers=data['active_customers'], data=data))
+            month_start = previous
+        self.write(Report, reports)
+        bump_catalog_version()
+        self.log('derived tables', len(reports), started)
+
+    def run(self):
+        self.seed_catalog()
+        self.seed_customers()
+        self.seed_subscriptions()
+        self.seed_deliveries()
+        self.seed_payments()
+        self.seed_notifications()
+        self.seed_usage()
+        self.seed_derived()
+        return self.counts
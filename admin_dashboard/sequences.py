@@ -0,0 +1,31 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import NumberSequence
+
+
+def _ensure_sequence(name, initial):
+    if NumberSequence.objects.filter(name=name).exists():
+        return
+    try:
+        with transaction.atomic():
+            NumberSequence.objects.create(name=name, last_value=initial() if callable(initial) else initial)
+    except IntegrityError:
+        # Another process created it first; its value wins.
+        pass
+
+
+def allocate(name, count=1, initial=0):
+    """
+    Reserve ``count`` consecutive values from the named sequence.
+
+    The increment is a single UPDATE, so concurrent callers are serialized
+    by the row lock and never receive overlapping blocks. ``initial`` (a
+    value or a callable) seeds the sequence the first time it is used.
+    """
+    if count < 1:
+        return range(0)
+    _ensure_sequence(name, initial)
+    with transaction.atomic():
+        NumberSequence.objects.filter(name=name).update(last_value=F('last_value') + count)
+        last = NumberSequence.objects.filter(name=name).values_list('last_value', flat=True).get()
+    return range(last - count + 1, last + 1)
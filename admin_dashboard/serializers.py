@@ -1,22 +1,31 @@
 
+from decimal import Decimal
 from rest_framework import serializers
-from .models import Category, Item, MenuList, TimeSlot, CustomerProfile, Subscription
-
-class CategorySerializer(serializers.ModelSerializer):
+from .broadcasts import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE
+from .fieldsets import SparseModelSerializer
+from .values import ValuesSerializer
+from .models import (
+    Category, Item, MenuList, TimeSlot, CustomerProfile, Subscription,
+    DeliverySchedule, Notification, Payment, Invoice, Report, Ingredient,
+    IngredientUsage, RecipeIngredient, normalize_phone
+)
+
+class CategorySerializer(SparseModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'description', 'image', 'is_active']
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(SparseModelSerializer):
     category = CategorySerializer(read_only=True)
-    category_id = serializers.IntegerField(write_only=True)
+    category_id = serializers.PrimaryKeyRelatedField(source='category',
+        queryset=Category.objects.all(), write_only=True)
 
     class Meta:
         model = Item
         fields = ['id', 'name', 'description', 'price', 'is_active', 'image', 
                  'preparation_time', 'customization_options', 'category', 'category_id']
 
-class MenuListSerializer(serializers.ModelSerializer):
+class MenuListSerializer(SparseModelSerializer):
     items = ItemSerializer(many=True, read_only=True)
     item_ids = serializers.ListField(child=serializers.IntegerField(), write_only=True)
 
@@ -30,17 +39,25 @@ class MenuListSerializer(serializers.ModelSerializer):
         menu_list.items.set(item_ids)
         return menu_list
 
-class TimeSlotSerializer(serializers.ModelSerializer):
+class TimeSlotSerializer(SparseModelSerializer):
     class Meta:
         model = TimeSlot
         fields = ['id', 'start_time', 'end_time', 'is_active']
 
-class CustomerProfileSerializer(serializers.ModelSerializer):
+class CustomerProfileSerializer(SparseModelSerializer):
     class Meta:
         model = CustomerProfile
         fields = ['id', 'first_name', 'last_name', 'phone_number', 'address', 'location']
 
-class ReportSerializer(serializers.ModelSerializer):
+    def validate_phone_number(self, value):
+        duplicates = CustomerProfile.objects.filter(normalized_phone=normalize_phone(value))
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError("A customer with this phone number already exists")
+        return value
+
+class ReportSerializer(SparseModelSerializer):
     class Meta:
         model = Report
         fields = ['id', 'type', 'date_from', 'date_to', 'total_revenue', 
@@ -48,42 +65,82 @@ class ReportSerializer(serializers.ModelSerializer):
         read_only_fields = ['generated_at']
 
 
-class SubscriptionSerializer(serializers.ModelSerializer):
+class SubscriptionSerializer(SparseModelSerializer):
     customer = CustomerProfileSerializer(read_only=True)
     menu_list = MenuListSerializer(read_only=True)
     time_slot = TimeSlotSerializer(read_only=True)
+    customer_id = serializers.PrimaryKeyRelatedField(source='customer',
+        queryset=CustomerProfile.objects.all(), write_only=True)
+    menu_list_id = serializers.PrimaryKeyRelatedField(source='menu_list',
+        queryset=MenuList.objects.all(), write_only=True)
+    time_slot_id = serializers.PrimaryKeyRelatedField(source='time_slot',
+        queryset=TimeSlot.objects.all(), write_only=True)
     
     class Meta:
         model = Subscription
         fields = ['id', 'customer', 'menu_list', 'time_slot', 'start_date', 
-                 'end_date', 'selected_days', 'payment_mode', 'delivery_notification']
+                 'end_date', 'selected_days', 'payment_mode', 'delivery_notification',
+                 'customer_id', 'menu_list_id', 'time_slot_id']
         
     def validate(self, data):
         if (data['end_date'] - data['start_date']).days > 30:
             raise serializers.ValidationError("Subscription duration cannot exceed 30 days")
         return data
 
-class DeliveryScheduleSerializer(serializers.ModelSerializer):
+class DeliveryScheduleSerializer(SparseModelSerializer):
     class Meta:
         model = DeliverySchedule
         fields = ['id', 'subscription', 'delivery_date', 'status', 
                  'delivery_notes', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
-class NotificationSerializer(serializers.ModelSerializer):
+class DeliveryScheduleValuesSerializer(ValuesSerializer):
+    serializer_class = DeliveryScheduleSerializer
+
+class DeliveryBulkTransitionSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False,
+        max_length=5000)
+    date = serializers.DateField(required=False)
+    time_slot = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=DeliverySchedule.STATUS_CHOICES, required=False)
+    target_status = serializers.ChoiceField(choices=DeliverySchedule.STATUS_CHOICES)
+
+    def validate(self, data):
+        if not any(key in data for key in ('ids', 'date', 'time_slot', 'status')):
+            raise serializers.ValidationError('Provide ids or at least one of date, time_slot, status')
+        return data
+
+class NotificationSerializer(SparseModelSerializer):
     class Meta:
         model = Notification
         fields = ['id', 'customer', 'type', 'title', 'message', 'is_read', 'created_at']
         read_only_fields = ['created_at']
 
-class PaymentSerializer(serializers.ModelSerializer):
+class NotificationValuesSerializer(ValuesSerializer):
+    serializer_class = NotificationSerializer
+
+class BroadcastSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=['MENU', 'GENERAL'], default='GENERAL')
+    title = serializers.CharField(max_length=200)
+    message = serializers.CharField()
+    menu_list = serializers.IntegerField(required=False)
+    time_slot = serializers.IntegerField(required=False)
+    location = serializers.CharField(required=False)
+    active_only = serializers.BooleanField(default=False)
+    active_on = serializers.DateField(required=False)
+    chunk_size = serializers.IntegerField(default=DEFAULT_CHUNK_SIZE, min_value=1, max_value=MAX_CHUNK_SIZE)
+
+class PaymentSerializer(SparseModelSerializer):
     class Meta:
         model = Payment
         fields = ['id', 'subscription', 'amount', 'transaction_id', 'status', 
                  'payment_date', 'payment_method', 'notes']
         read_only_fields = ['payment_date']
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class PaymentValuesSerializer(ValuesSerializer):
+    serializer_class = PaymentSerializer
+
+class InvoiceSerializer(SparseModelSerializer):
     payment = PaymentSerializer(read_only=True)
     
     class Meta:
@@ -91,3 +148,91 @@ class InvoiceSerializer(serializers.ModelSerializer):
         fields = ['id', 'payment', 'invoice_number', 'generated_date', 
                  'due_date', 'is_paid']
         read_only_fields = ['invoice_number', 'generated_date']
+
+class InvoiceBulkGenerateSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    due_date = serializers.DateField()
+    statuses = serializers.ListField(child=serializers.ChoiceField(choices=Payment.STATUS_CHOICES),
+        required=False, allow_empty=False)
+
+    def validate(self, data):
+        if data['date_from'] > data['date_to']:
+            raise serializers.ValidationError('date_from must not be after date_to')
+        return data
+
+class ProductionPlanQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+class ManifestQuerySerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+    time_slot = serializers.IntegerField(required=False)
+    batch_size = serializers.IntegerField(required=False)
+
+class IngredientSerializer(SparseModelSerializer):
+    class Meta:
+        model = Ingredient
+        fields = ['id', 'name', 'description', 'unit', 'quantity', 'minimum_stock',
+                 'cost_per_unit', 'supplier', 'last_restocked', 'created_at']
+        read_only_fields = ['last_restocked', 'created_at']
+
+class IngredientUsageSerializer(SparseModelSerializer):
+    class Meta:
+        model = IngredientUsage
+        fields = ['id', 'ingredient', 'item', 'quantity_used', 'date_used']
+        read_only_fields = ['date_used']
+
+class RecipeIngredientSerializer(SparseModelSerializer):
+    class Meta:
+        model = RecipeIngredient
+        fields = ['id', 'item', 'ingredient', 'quantity']
+
+class IngredientUsageEntrySerializer(serializers.Serializer):
+    ingredient = serializers.IntegerField()
+    item = serializers.IntegerField()
+    quantity_used = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+
+class IngredientUsageBatchSerializer(serializers.Serializer):
+    usages = IngredientUsageEntrySerializer(many=True, allow_empty=False)
+
+    def validate_usages(self, usages):
+        # One query per referenced table instead of one per row
+        ingredient_ids = {usage['ingredient'] for usage in usages}
+        item_ids = {usage['item'] for usage in usages}
+        missing_ingredients = ingredient_ids - set(
+            Ingredient.objects.filter(id__in=ingredient_ids).values_list('id', flat=True))
+        missing_items = item_ids - set(Item.objects.filter(id__in=item_ids).values_list('id', flat=True))
+        errors = {}
+        if missing_ingredients:
+            errors['ingredient'] = f'Unknown ingredient ids: {sorted(missing_ingredients)}'
+        if missing_items:
+            errors['item'] = f'Unknown item ids: {sorted(missing_items)}'
+        if errors:
+            raise serializers.ValidationError(errors)
+        return usages
+
+class CategoryImportSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    description = serializers.CharField(allow_blank=True, default='')
+    image = serializers.URLField(allow_blank=True, default='')
+    is_active = serializers.BooleanField(default=True)
+
+class ItemImportSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    category = serializers.CharField(max_length=100)
+    description = serializers.CharField(allow_blank=True, default='')
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    is_active = serializers.BooleanField(default=True)
+    image = serializers.URLField(allow_blank=True, default='')
+    preparation_time = serializers.IntegerField(default=30)
+    customization_options = serializers.JSONField(default=dict)
+
+class MenuImportSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    description = serializers.CharField(allow_blank=True, default='')
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True, default=None)
+    is_active = serializers.BooleanField(default=True)
+    max_items = serializers.IntegerField(min_value=0, default=10)
+    nutritional_info = serializers.JSONField(default=dict)
+    items = serializers.ListField(child=serializers.CharField(max_length=100), default=list)
@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .catalog import bump_catalog_version
+from .db_router import configure_sqlite
+from .metrics import install_query_recorder
+from .models import Category, Item, MenuList, Payment, Subscription
+from .rollups import apply_payment_change, apply_subscription_change, payment_share, subscription_share
+
+
+# Rollups follow each row in the same transaction, so a rolled back write
+# leaves them untouched. Bulk writes bypass these and call refresh_rollups.
+PAYMENT_SHARE_FIELDS = ('payment_date', 'status', 'amount', 'payment_method')
+
+
+@receiver(pre_save, sender=Payment)
+def remember_payment_share(sender, instance, **kwargs):
+    previous = sender.objects.filter(pk=instance.pk).values_list(*PAYMENT_SHARE_FIELDS).first() \
+        if instance.pk else None
+    instance._rollup_previous = payment_share(*previous) if previous else None
+
+
+@receiver(pre_save, sender=Subscription)
+def remember_subscription_share(sender, instance, **kwargs):
+    previous = sender.objects.filter(pk=instance.pk).values_list('start_date', 'end_date', 'customer_id') \
+        .first() if instance.pk else None
+    instance._rollup_previous = subscription_share(*previous) if previous else None
+
+
+@receiver(post_save, sender=Payment)
+def update_payment_rollup(sender, instance, **kwargs):
+    apply_payment_change(getattr(instance, '_rollup_previous', None), payment_share(
+        *[getattr(instance, field) for field in PAYMENT_SHARE_FIELDS]))
+
+
+@receiver(post_delete, sender=Payment)
+def remove_payment_rollup(sender, instance, **kwargs):
+    apply_payment_change(payment_share(*[getattr(instance, field) for field in PAYMENT_SHARE_FIELDS]), None)
+
+
+@receiver(post_save, sender=Subscription)
+def update_subscription_rollup(sender, instance, **kwargs):
+    apply_subscription_change(getattr(instance, '_rollup_previous', None),
+        subscription_share(instance.start_date, instance.end_date, instance.customer_id))
+
+
+@receiver(post_delete, sender=Subscription)
+def remove_subscription_rollup(sender, instance, **kwargs):
+    apply_subscription_change(
+        subscription_share(instance.start_date, instance.end_date, instance.customer_id), None)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+@receiver(post_save, sender=MenuList)
+@receiver(post_delete, sender=MenuList)
+@receiver(m2m_changed, sender=MenuList.items.through)
+def invalidate_catalog(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        transaction.on_commit(bump_catalog_version)
+
+
+@receiver(connection_created)
+def record_request_queries(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    configure_sqlite(connection)
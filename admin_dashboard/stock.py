@@ -0,0 +1,55 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import DailyIngredientUsage, Ingredient, IngredientUsage
+
+
+def record_daily_usage(deltas, day):
+    """Add per-ingredient consumption to the DailyIngredientUsage aggregate."""
+    for ingredient_id, consumed in deltas.items():
+        if not consumed:
+            continue
+        daily = DailyIngredientUsage.objects.filter(ingredient_id=ingredient_id, date=day)
+        if daily.update(quantity=F('quantity') + consumed):
+            continue
+        try:
+            with transaction.atomic():
+                DailyIngredientUsage.objects.create(ingredient_id=ingredient_id, date=day, quantity=consumed)
+        except IntegrityError:
+            # Created concurrently since the UPDATE above
+            daily.update(quantity=F('quantity') + consumed)
+
+
+def apply_stock_deltas(deltas, day=None):
+    """
+    Subtract per-ingredient totals with one UPDATE per distinct ingredient
+    and add them to the usage aggregate for ``day`` (today by default).
+    """
+    for ingredient_id, consumed in deltas.items():
+        if consumed:
+            Ingredient.objects.filter(pk=ingredient_id).update(quantity=F('quantity') - consumed)
+    record_daily_usage(deltas, day or timezone.localdate())
+
+
+def record_usages(usages):
+    """
+    Record a batch of ingredient consumption in one transaction.
+
+    ``usages`` is an iterable of dicts with ``ingredient``, ``item`` and
+    ``quantity_used`` (ids, not instances). Usage rows are bulk inserted and
+    stock is decremented with F() expressions, so concurrent terminals never
+    overwrite each other's updates.
+    """
+    deltas = defaultdict(Decimal)
+    rows = []
+    for usage in usages:
+        deltas[usage['ingredient']] += usage['quantity_used']
+        rows.append(IngredientUsage(ingredient_id=usage['ingredient'], item_id=usage['item'],
+            quantity_used=usage['quantity_used']))
+
+    with transaction.atomic():
+        created = IngredientUsage.objects.bulk_create(rows)
+        apply_stock_deltas(deltas)
+    return created
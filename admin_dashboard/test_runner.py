@@ -0,0 +1,21 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Every alias, the catalog's included, lives in process memory during tests
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'catalog': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'catalog'},
+}
+
+
+class LocMemCacheTestRunner(DiscoverRunner):
+    """Run the suite with locmem caches so tests never read or write the on-disk catalog cache."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_settings = override_settings(CACHES=TEST_CACHES)
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,1116 @@
+import importlib
+import io
+import json
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.messages import get_messages
+from django.core.management.color import no_style
+from django.contrib.auth.models import User
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import run_checks
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError
+from django.db import connection
+from django.db.models import Count, Sum
+from django.db.migrations.state import ProjectState
+from django.db.models.sql.compiler import SQLCompiler
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.test import AsyncClient, Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from .archiving import archive_rows, move_batch
+from .broadcasts import audience, send_broadcast
+from .catalog_import import CatalogImportError, import_catalog, parse_csv
+from .catalog import bump_catalog_version, get_catalog_cache, get_menus, lookups
+from .customers import merge_duplicate_customers
+from .db_router import PIN_COOKIE, ReplicaRouter
+from .deliveries import lock_statuses
+from .invoicing import allocate_invoice_numbers, create_invoices
+from .middleware import ReplicaMiddleware
+from .forecasting import forecast_stock
+from .planning import production_plan
+from .query_budget import sized_list_view
+from .query_plans import check_plans
+from .renderers import FastJSONRenderer
+from .models import (
+    ArchivedInvoice, ArchivedPayment, Category, CustomerProfile, DailyIngredientUsage, DailyRollup, DeliverySchedule,
+    Ingredient, IngredientUsage, Invoice, Item, MenuList, Notification, Payment, RecipeIngredient, Report,
+    Subscription, TimeSlot
+)
+from .rollups import refresh_rollup, summarize
+from .scheduling import materialize_deliveries
+from .seeding import Seeder
+from .serializers import (
+    DeliveryScheduleValuesSerializer, NotificationValuesSerializer, PaymentValuesSerializer
+)
+
+MONDAY = date(2026, 10, 19)
+
+
+def create_catalog():
+    category = Category.objects.create(name='Mains')
+    item = Item.objects.create(category=category, name='Dal', description='Lentils', price=120)
+    menu = MenuList.objects.create(name='Weekday', price=900)
+    menu.items.add(item)
+    slot = TimeSlot.objects.create(start_time=time(12), end_time=time(13))
+    return menu, slot
+
+
+def create_subscription(menu, slot, phone='+15550100', start=MONDAY, days=20, **kwargs):
+    customer = CustomerProfile.objects.filter(phone_number=phone).first() or CustomerProfile.objects.create(
+        first_name='Asha', last_name='Rao', phone_number=phone, address='1 Main St', location='North')
+    kwargs.setdefault('selected_days', ['0', '2', '4'])
+    return Subscription.objects.create(customer=customer, menu_list=menu, time_slot=slot, start_date=start,
+        end_date=start + timedelta(days=days), payment_mode='CASH', **kwargs)
+
+
+def create_payment(subscription, transaction_id, status='SUCCESS', amount=900):
+    return Payment.objects.create(subscription=subscription, amount=amount, transaction_id=transaction_id,
+        status=status, payment_method='CARD')
+
+
+class ApiTestCase(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', password='secret', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+
+class MaterializeDeliveriesTests(TestCase):
+    def setUp(self):
+        self.menu, self.slot = create_catalog()
+
+    def delivery_dates(self, subscription):
+        return sorted(DeliverySchedule.objects.filter(subscription=subscription)
+            .values_list('delivery_date', flat=True))
+
+    def test_full_run_prunes_pending_rows_of_shortened_subscriptions(self):
+        kept = create_subscription(self.menu, self.slot)
+        shortened = create_subscription(self.menu, self.slot, phone='+15550101')
+        materialize_deliveries(today=MONDAY, horizon_days=14)
+        DeliverySchedule.objects.filter(subscription=shortened, delivery_date=MONDAY).update(status='DELIVERED')
+
+        # Ends before the window now, so it no longer overlaps it at all
+        Subscription.objects.filter(pk=shortened.pk).update(end_date=MONDAY)
+        stats = materialize_deliveries(today=MONDAY + timedelta(days=1), horizon_days=14, full=True)
+
+        self.assertEqual(self.delivery_dates(shortened), [MONDAY])
+        self.assertEqual(stats['pruned'], 6)
+        self.assertEqual(len(self.delivery_dates(kept)), 7)
+
+    def test_incremental_run_prunes_edited_subscriptions(self):
+        subscription = create_subscription(self.menu, self.slot)
+        materialize_deliveries(today=MONDAY, horizon_days=14)
+        subscription.selected_days = ['4']
+        subscription.save()
+
+        materialize_deliveries(today=MONDAY, horizon_days=14)
+
+        self.assertEqual(self.delivery_dates(subscription),
+            [MONDAY + timedelta(days=4), MONDAY + timedelta(days=11)])
+
+
+class RollupWritePathTests(TestCase):
+    def test_merging_customers_refreshes_the_rollups_of_moved_subscriptions(self):
+        menu, slot = create_catalog()
+        survivor = create_subscription(menu, slot, phone='+15550100')
+        duplicate = create_subscription(menu, slot, phone='+15550199')
+        # A row from before phone numbers were normalized
+        CustomerProfile.objects.filter(pk=duplicate.customer_id).update(
+            phone_number='+15550100', normalized_phone=None)
+        day = survivor.end_date
+        refresh_rollup(day)
+
+        merge_duplicate_customers()
+
+        rollup = DailyRollup.objects.get(date=day)
+        self.assertEqual(rollup.customers_by_start, {MONDAY.isoformat(): [survivor.customer_id]})
+        self.assertEqual(rollup.subscriptions_by_start, {MONDAY.isoformat(): 2})
+
+
+def legacy_report_data(start_date, end_date):
+    """report_data as ReportViewSet built it from the raw tables before the rollups."""
+    subscriptions = Subscription.objects.filter(start_date__gte=start_date, end_date__lte=end_date)
+    payments = Payment.objects.filter(payment_date__date__gte=start_date, payment_date__date__lte=end_date,
+        status='SUCCESS')
+    return {
+        'subscription_count': subscriptions.count(),
+        'revenue': float(payments.aggregate(Sum('amount'))['amount__sum'] or 0),
+        'payment_methods': dict(payments.values_list('payment_method').annotate(count=Count('id'))),
+        'active_customers': CustomerProfile.objects.filter(subscription__in=subscriptions).distinct().count()
+    }
+
+
+class RollupParityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Seeder(seed=0, scale=0.001, anchor=MONDAY, stdout=io.StringIO()).run()
+
+    def test_summaries_match_the_legacy_report_data(self):
+        for days in (0, 7, 30, 90):
+            with self.subTest(days=days):
+                start_date = MONDAY - timedelta(days=days + 40)
+                end_date = start_date + timedelta(days=days)
+                self.assertEqual(summarize(start_date, end_date), legacy_report_data(start_date, end_date))
+
+    def test_single_row_writes_keep_the_summaries_in_step(self):
+        start_date, end_date = MONDAY - timedelta(days=30), MONDAY + timedelta(days=30)
+        payment = Payment.objects.filter(status='SUCCESS').order_by('id').first()
+        payment.payment_method, payment.amount = 'VOUCHER', payment.amount + 5
+        payment.save()
+        Payment.objects.filter(status='PENDING').order_by('id').first().delete()
+        failed = Payment.objects.filter(status='FAILED').order_by('id').first()
+        failed.status = 'SUCCESS'
+        failed.save()
+        subscription = Subscription.objects.filter(start_date__gte=start_date).order_by('id').first()
+        subscription.end_date -= timedelta(days=1)
+        subscription.save()
+        Subscription.objects.filter(start_date__gte=start_date).order_by('-id').first().delete()
+        create_subscription(MenuList.objects.first(), TimeSlot.objects.first(), phone='+15559999',
+            start=MONDAY - timedelta(days=10))
+        self.assertEqual(summarize(start_date, end_date), legacy_report_data(start_date, end_date))
+        for rollup in DailyRollup.objects.filter(date__range=(start_date, end_date)):
+            expected = refresh_rollup(rollup.date)
+            self.assertEqual(
+                (rollup.revenue, rollup.payment_methods, rollup.subscriptions_by_start, rollup.customers_by_start),
+                (expected.revenue, expected.payment_methods, expected.subscriptions_by_start,
+                 expected.customers_by_start))
+
+    def test_writes_adjust_the_rollup_without_rescanning_the_day(self):
+        payment = Payment.objects.filter(status='SUCCESS').order_by('id').first()
+        payment.notes = 'checked'
+        with self.assertNumQueries(2):
+            payment.save()
+        payment.amount += 1
+        # The previous values, the payment itself, then per share: savepoint,
+        # revenue UPDATE, locked read, counters UPDATE, release
+        with self.assertNumQueries(12):
+            payment.save()
+
+
+class SubscriptionTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.menu, self.slot = create_catalog()
+        self.customer = create_subscription(self.menu, self.slot).customer
+
+    def test_portal_submission_does_not_overwrite_an_existing_customer(self):
+        response = Client().post('/subscribe/', {
+            'idempotency_key': 'form-1', 'first_name': 'Mallory', 'last_name': 'Doe',
+            'phone_number': '+1 555 0100', 'address': '9 Elsewhere Rd', 'location': 'South',
+            'menu_list': self.menu.id, 'time_slot': self.slot.id, 'start_date': '2026-10-19',
+            'end_date': '2026-10-30', 'weekdays': ['0'], 'payment_mode': 'CASH',
+        })
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+        self.customer.refresh_from_db()
+        self.assertEqual((self.customer.first_name, self.customer.address), ('Asha', '1 Main St'))
+        self.assertEqual(self.customer.subscription_set.count(), 2)
+
+    def test_unknown_related_ids_are_rejected(self):
+        data = {'customer_id': self.customer.id, 'menu_list_id': self.menu.id, 'time_slot_id': self.slot.id,
+            'start_date': '2026-10-19', 'end_date': '2026-10-30', 'selected_days': ['0'], 'payment_mode': 'CASH'}
+        for field in ('customer_id', 'menu_list_id', 'time_slot_id'):
+            response = self.client.post('/api/subscriptions/', dict(data, **{field: 9999}), format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(field, response.data)
+        response = self.client.post('/api/subscriptions/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_phone_backfill_stops_on_duplicates_until_they_are_merged(self):
+        backfill = importlib.import_module('admin_dashboard.migrations.0005_backfill_normalized_phone')
+        schema_editor = mock.Mock(connection=connection)
+        # Rows written before the column existed: bulk_create skips the save() that fills it
+        CustomerProfile.objects.update(normalized_phone=None)
+        duplicate, = CustomerProfile.objects.bulk_create([CustomerProfile(first_name='Asha', last_name='Rao',
+            phone_number='+1 555 0100', address='1 Main St', location='North')])
+
+        with self.assertRaisesMessage(CommandError, 'merge_duplicate_customers'):
+            backfill.backfill_normalized_phone(apps, schema_editor)
+        duplicate.delete()
+        backfill.backfill_normalized_phone(apps, schema_editor)
+        self.assertEqual(CustomerProfile.objects.get().normalized_phone, '+15550100')
+
+    def test_portal_submission_without_idempotency_key_is_rejected(self):
+        response = Client().post('/subscribe/', {
+            'first_name': 'Asha', 'last_name': 'Rao', 'phone_number': '+15550100', 'address': '1 Main St',
+            'location': 'North', 'menu_list': self.menu.id, 'time_slot': self.slot.id, 'start_date': '2026-10-19',
+            'end_date': '2026-10-30', 'weekdays': ['0'], 'payment_mode': 'CASH',
+        })
+        self.assertRedirects(response, '/subscribe/', fetch_redirect_response=False)
+        self.assertEqual([str(message) for message in get_messages(response.wsgi_request)],
+            ['This form has expired, please fill it in again'])
+        self.assertEqual(Subscription.objects.count(), 1)
+
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.menu, self.slot = create_catalog()
+        TimeSlot.objects.create(start_time=time(19), end_time=time(20), is_active=False)
+        # The version bump waits for a commit that never comes inside a TestCase
+        get_catalog_cache().clear()
+        self.client = AsyncClient()
+
+    async def test_portal_pages(self):
+        response = await self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        response = await self.client.get('/menu/')
+        self.assertContains(response, 'Weekday')
+        response = await self.client.get('/subscribe/')
+        self.assertContains(response, 'Weekday')
+        self.assertContains(response, 'name="idempotency_key"')
+        self.assertEqual([slot.id for slot in response.context['time_slots']], [self.slot.id])
+
+    async def test_catalog_views(self):
+        response = await self.client.get('/api/catalog/menus/')
+        self.assertEqual([menu['name'] for menu in response.json()['results']], ['Weekday'])
+        response = await self.client.get(f'/api/catalog/menus/{self.menu.id}/')
+        self.assertEqual(response.json()['items'][0]['name'], 'Dal')
+        response = await self.client.get('/api/catalog/menus/9999/')
+        self.assertEqual(response.status_code, 404)
+        response = await self.client.get('/api/catalog/categories/')
+        self.assertEqual([category['name'] for category in response.json()['results']], ['Mains'])
+        response = await self.client.get('/api/catalog/timeslots/')
+        self.assertEqual(response.json()['results'], [{'id': self.slot.id, 'start_time': '12:00:00',
+            'end_time': '13:00:00'}])
+        response = await self.client.post('/api/catalog/menus/')
+        self.assertEqual(response.status_code, 405)
+
+class InvoiceGenerationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        subscription = create_subscription(*create_catalog())
+        self.payments = [create_payment(subscription, f'txn-{index}') for index in range(3)]
+        self.today = self.payments[0].payment_date.date()
+
+    def generate(self, **data):
+        body = {'date_from': self.today.isoformat(), 'date_to': self.today.isoformat(),
+            'due_date': (self.today + timedelta(days=14)).isoformat(), **data}
+        return self.client.post('/api/invoices/bulk_generate/', body, format='json')
+
+    def test_bulk_generate_invoices_the_period(self):
+        response = self.generate(statuses=['SUCCESS'])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'created': 3})
+
+    def test_bulk_generate_rejects_impossible_dates(self):
+        response = self.generate(date_to='2024-02-30')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date_to', response.data)
+        self.assertFalse(Invoice.objects.exists())
+
+    def test_bulk_generate_rejects_statuses_given_as_a_string(self):
+        response = self.generate(statuses='SUCCESS')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('statuses', response.data)
+
+    def test_create_invoices_skips_payments_invoiced_concurrently(self):
+        def allocate_after_other_run(count):
+            # Another run invoices the first payment between the read and the insert
+            other, *numbers = allocate_invoice_numbers(count + 1)
+            Invoice.objects.create(payment=self.payments[0], invoice_number=other, due_date=self.today)
+            return numbers
+
+        with mock.patch('admin_dashboard.invoicing.allocate_invoice_numbers', allocate_after_other_run):
+            created = create_invoices(Payment.objects.all(), self.today)
+
+        self.assertEqual(created, 2)
+        self.assertEqual(Invoice.objects.count(), 3)
+
+
+class StockTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.item = Item.objects.create(category=Category.objects.create(name='Mains'), name='Dal', price=120)
+        self.rice, self.lentils = [Ingredient.objects.create(name=name, unit='kg', quantity=50, minimum_stock=5,
+            cost_per_unit=2) for name in ('Rice', 'Lentils')]
+
+    def stock(self):
+        return {ingredient.name: ingredient.quantity for ingredient in Ingredient.objects.all()}
+
+    def test_single_edits_apply_the_difference(self):
+        with CaptureQueriesContext(connection) as queries:
+            usage = IngredientUsage.objects.create(ingredient=self.rice, item=self.item, quantity_used=Decimal('4'))
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "admin_dashboard_ingredient"')]
+        self.assertEqual(len(updates), 1)
+        # Relative to the stored value, so concurrent usages cannot overwrite each other
+        self.assertIn('"admin_dashboard_ingredient"."quantity" - ', updates[0])
+        self.assertEqual(self.stock(), {'Rice': 46, 'Lentils': 50})
+
+        usage.quantity_used = Decimal('1.5')
+        usage.save()
+        self.assertEqual(self.stock(), {'Rice': Decimal('48.5'), 'Lentils': 50})
+        usage.ingredient = self.lentils
+        usage.save()
+        self.assertEqual(self.stock(), {'Rice': 50, 'Lentils': Decimal('48.5')})
+        self.assertEqual(DailyIngredientUsage.objects.get(ingredient=self.lentils).quantity, Decimal('1.5'))
+
+    def test_batch_edits_update_each_ingredient_once(self):
+        usages = [{'ingredient': self.rice.id, 'item': self.item.id, 'quantity_used': quantity}
+            for quantity in ('1.25', '2', '0.75')]
+        usages.append({'ingredient': self.lentils.id, 'item': self.item.id, 'quantity_used': '3'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/ingredient-usage/bulk/', {'usages': usages}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 4)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "admin_dashboard_ingredient"')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(self.stock(), {'Rice': 46, 'Lentils': 47})
+        self.assertEqual(DailyIngredientUsage.objects.get(ingredient=self.rice).quantity, 4)
+
+    def test_batch_with_unknown_ids_changes_nothing(self):
+        response = self.client.post('/api/ingredient-usage/bulk/', {'usages': [
+            {'ingredient': self.rice.id, 'item': self.item.id, 'quantity_used': '1'},
+            {'ingredient': 9999, 'item': self.item.id, 'quantity_used': '1'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stock(), {'Rice': 50, 'Lentils': 50})
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        self.menu, _ = create_catalog()
+        get_catalog_cache().clear()
+        lookups.clear()
+
+    def test_menus_are_served_from_the_cache_until_the_version_changes(self):
+        get_menus()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_menus()[0]['name'], 'Weekday')
+        self.assertEqual(lookups, {'misses': 1, 'hits': 1})
+
+        MenuList.objects.filter(pk=self.menu.pk).update(name='Weekend')
+        bump_catalog_version()
+        self.assertEqual(get_menus()[0]['name'], 'Weekend')
+
+    def test_suite_never_touches_the_on_disk_cache(self):
+        self.assertIsInstance(get_catalog_cache(), LocMemCache)
+
+    def test_locmem_catalog_cache_fails_the_checks_with_several_workers(self):
+        with mock.patch.dict('os.environ', {'WEB_CONCURRENCY': '4'}):
+            errors = [error.id for error in run_checks(tags=['caches'])]
+        self.assertIn('admin_dashboard.E001', errors)
+        self.assertNotIn('admin_dashboard.E001', [error.id for error in run_checks(tags=['caches'])])
+
+
+class ListQueryBudgetTests(TestCase):
+    """Every list endpoint runs ``list_query_budget`` queries whatever the page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # A few hundred related rows per table, so an N+1 shows up as extra queries
+        Seeder(seed=0, scale=0.001, anchor=MONDAY, stdout=io.StringIO()).run()
+        cls.staff = User.objects.create_user('staff', password='secret', is_staff=True)
+
+    def test_list_endpoints_stay_within_their_query_budget(self):
+        from django_project.urls import router
+
+        checked = 0
+        for prefix, viewset, _ in router.registry:
+            budget = getattr(viewset, 'list_query_budget', None)
+            if budget is None:
+                continue
+            for page_size in (1, 10):
+                request = APIRequestFactory().get(f'/api/{prefix}/')
+                force_authenticate(request, self.staff)
+                # Menus are counted as built from the database, not the catalog cache
+                get_catalog_cache().clear()
+                with self.subTest(prefix, page_size=page_size), self.assertNumQueries(budget):
+                    response = sized_list_view(viewset, page_size)(request)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertLessEqual(len(response.data['results']), page_size)
+            checked += 1
+        self.assertEqual(checked, 14)
+
+
+class ConditionalGetTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.menu, _ = create_catalog()
+
+    def test_unchanged_menu_answers_not_modified(self):
+        response = self.client.get(f'/api/menus/{self.menu.id}/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(f'/api/menus/{self.menu.id}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_malformed_ids_are_not_found(self):
+        for path in ('/api/categories/abc/', '/api/menus/abc/', '/api/items/abc/'):
+            self.assertEqual(self.client.get(path).status_code, 404)
+
+
+class DeliveryTransitionTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        subscription = create_subscription(*create_catalog())
+        materialize_deliveries(today=MONDAY, horizon_days=6)
+        self.ids = list(DeliverySchedule.objects.filter(subscription=subscription)
+            .order_by('id').values_list('id', flat=True))
+
+    def transition(self, target_status):
+        return self.client.post('/api/deliveries/bulk_transition/',
+            {'ids': self.ids, 'target_status': target_status}, format='json')
+
+    def test_bulk_transition_reports_invalid_transitions(self):
+        DeliverySchedule.objects.filter(id=self.ids[0]).update(status='DELIVERED')
+        response = self.transition('PREPARING')
+        self.assertEqual((response.data['updated'], response.data['skipped']), (2, 1))
+        self.assertEqual(response.data['results'][self.ids[0]],
+            {'result': 'invalid_transition', 'from': 'DELIVERED'})
+
+    def test_rows_moved_by_a_concurrent_request_are_not_overwritten(self):
+        def read_then_race(queryset):
+            statuses = lock_statuses(queryset)
+            # Committed by another request after this one read the statuses
+            DeliverySchedule.objects.filter(id=self.ids[0]).update(status='CANCELLED')
+            return statuses
+
+        with mock.patch('admin_dashboard.deliveries.lock_statuses', read_then_race):
+            response = self.transition('PREPARING')
+
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(response.data['results'][self.ids[0]],
+            {'result': 'invalid_transition', 'from': 'CANCELLED'})
+        self.assertEqual(DeliverySchedule.objects.get(id=self.ids[0]).status, 'CANCELLED')
+
+    def test_manifest_groups_the_day_into_batches(self):
+        response = self.client.get('/api/deliveries/manifest/', {'date': MONDAY.isoformat(), 'batch_size': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['deliveries'], 1)
+        response = self.client.get('/api/deliveries/manifest/', {'date': MONDAY.isoformat(), 'format': 'html'})
+        self.assertContains(response, '<p>1 deliveries</p>')
+
+    def test_manifest_rejects_invalid_parameters(self):
+        for params in ({'date': '2024-02-30'}, {'time_slot': 'noon'}, {'batch_size': 'ten'}):
+            response = self.client.get('/api/deliveries/manifest/', params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(next(iter(params)), response.data)
+        response = self.client.get('/api/deliveries/manifest/', {'time_slot': 'noon', 'format': 'html'})
+        self.assertContains(response, 'time_slot: A valid integer is required.', status_code=400)
+
+    def test_only_delivery_rows_are_locked(self):
+        features = type(connection.features)
+        statements = []
+
+        def compile_only(compiler, *args, **kwargs):
+            statements.append(compiler.as_sql()[0])
+            return []
+
+        # Compiled as on PostgreSQL, where a plain FOR UPDATE would also lock the joined subscriptions
+        with mock.patch.object(features, 'has_select_for_update', True), \
+                mock.patch.object(features, 'has_select_for_update_of', True), \
+                mock.patch.object(SQLCompiler, 'execute_sql', compile_only):
+            lock_statuses(DeliverySchedule.objects.filter(subscription__time_slot_id=1))
+        self.assertIn('JOIN "admin_dashboard_subscription"', statements[0])
+        self.assertTrue(statements[0].endswith('FOR UPDATE OF "admin_dashboard_deliveryschedule"'))
+
+
+class BroadcastTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.menu, self.slot = create_catalog()
+        other_menu = MenuList.objects.create(name='Weekend', price=700)
+        self.current = create_subscription(self.menu, self.slot, phone='+15550101').customer
+        # A second matching subscription must not select the customer twice
+        create_subscription(self.menu, self.slot, phone='+15550101', start=MONDAY + timedelta(days=1))
+        self.ended = create_subscription(self.menu, self.slot, phone='+15550102',
+            start=MONDAY - timedelta(days=40)).customer
+        self.other = create_subscription(other_menu, self.slot, phone='+15550103').customer
+        CustomerProfile.objects.filter(id=self.other.id).update(location='South')
+        self.idle = CustomerProfile.objects.create(first_name='Ravi', last_name='Iyer', phone_number='+15550104',
+            address='4 Side St', location='south')
+
+    def test_audience_filters(self):
+        everyone = [self.current.id, self.ended.id, self.other.id, self.idle.id]
+        self.assertEqual(list(audience()), everyone)
+        self.assertEqual(list(audience(menu_list=self.menu.id)), [self.current.id, self.ended.id])
+        self.assertEqual(list(audience(time_slot=self.slot.id)), everyone[:3])
+        self.assertEqual(list(audience(location='SOUTH')), [self.other.id, self.idle.id])
+        self.assertEqual(list(audience(menu_list=self.menu.id, active_on=MONDAY)), [self.current.id])
+        with mock.patch('django.utils.timezone.localdate', return_value=MONDAY):
+            self.assertEqual(list(audience(active_only=True)), [self.current.id, self.other.id])
+
+    def test_notifications_are_created_in_chunks(self):
+        totals = []
+        with CaptureQueriesContext(connection) as queries:
+            sent = send_broadcast(audience(), 'GENERAL', 'Closed', 'Closed on Monday', chunk_size=3,
+                progress=totals.append)
+        self.assertEqual((sent, totals), (4, [3, 4]))
+        inserts = [query['sql'] for query in queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(Notification.objects.filter(title='Closed').count(), 4)
+
+    def test_broadcast_endpoint_streams_progress(self):
+        response = self.client.post('/api/notifications/broadcast/', {'title': 'New menu', 'message': 'Try it',
+            'type': 'MENU', 'menu_list': self.menu.id, 'chunk_size': 1}, format='json')
+        self.assertEqual(response.status_code, 201)
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(lines, [{'sent': 1}, {'sent': 2}, {'sent': 2, 'done': True}])
+        self.assertEqual(set(Notification.objects.values_list('customer_id', flat=True)),
+            {self.current.id, self.ended.id})
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Seeder(seed=0, scale=0.001, anchor=MONDAY, stdout=io.StringIO()).run()
+
+    def test_filtered_lists_and_hot_queries_use_an_index(self):
+        from django_project.urls import router
+
+        results = check_plans(router)
+        scans = {label: plan for label, plan, scanned in results if scanned}
+        self.assertEqual(scans, {})
+        checked = {label for label, _, _ in results}
+        for label in ('/api/invoices/?is_paid=false', '/api/categories/?is_active=true',
+                '/api/items/?category=1', '/api/ingredient-usage/?ingredient=1'):
+            self.assertIn(label, checked)
+
+
+class ExportTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        subscription = create_subscription(*create_catalog())
+        for index in range(5):
+            create_payment(subscription, f'txn-{index}')
+
+    def test_export_streams_every_row(self):
+        response = self.client.get('/api/payments/export/', {'chunk_size': 2})
+        self.assertFalse(response.is_async)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,subscription_id,amount,transaction_id,status,payment_date,payment_method,notes')
+        self.assertEqual(len(lines), 6)
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get('/api/payments/export/',
+            {'chunk_size': 2, 'export_format': 'ndjson'})
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sum(chunk.count(b'\n') for chunk in chunks), 5)
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        for module in ('admin_dashboard.db_router', 'admin_dashboard.middleware'):
+            patcher = mock.patch(f'{module}.replica_alias', return_value='replica')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+
+    def handle(self, request, status=200):
+        """Run ``request`` through ReplicaMiddleware, recording where the view's reads go."""
+        router = ReplicaRouter()
+        routes = {}
+
+        def view(request):
+            routes.update(menus=router.db_for_read(MenuList), users=router.db_for_read(User))
+            return HttpResponse(status=status)
+
+        return ReplicaMiddleware(view)(request), routes
+
+    def test_reads_go_to_the_replica(self):
+        response, routes = self.handle(self.factory.get('/api/menus/'))
+        self.assertEqual(routes, {'menus': 'replica', 'users': 'default'})
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_admin_and_portal_reads_stay_on_the_primary(self):
+        for path in ('/admin/admin_dashboard/menulist/', '/menu/'):
+            with self.subTest(path=path):
+                response, routes = self.handle(self.factory.get(path))
+                self.assertEqual(routes['menus'], 'default')
+                self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        response, routes = self.handle(self.factory.post('/api/menus/'))
+        self.assertEqual(routes['menus'], 'default')
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        request = self.factory.get('/api/menus/')
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        _, routes = self.handle(request)
+        self.assertEqual(routes['menus'], 'default')
+
+    def test_archive_tables_are_migrated_only_on_the_archive(self):
+        router = ReplicaRouter()
+        historical = ProjectState.from_apps(apps).apps.get_model('admin_dashboard', 'ArchivedPayment')
+        with mock.patch('admin_dashboard.db_router.archive_alias', return_value='archive'):
+            for hints in ({'model_name': 'archivedpayment'}, {'model': historical}):
+                self.assertEqual([db for db in ('default', 'archive') if router.allow_migrate(db, 'admin_dashboard',
+                    **hints)], ['archive'])
+            self.assertFalse(router.allow_migrate('archive', 'admin_dashboard', model_name='payment'))
+
+    def test_failed_writes_do_not_pin(self):
+        response, _ = self.handle(self.factory.post('/api/menus/'), status=400)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class MetricsAccessTests(TestCase):
+    def test_metrics_require_staff_or_the_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(METRICS_TOKEN='scrape'):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape').status_code, 200)
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(METRICS_PUBLIC=True)
+    def test_public_metrics_are_an_explicit_opt_in(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+class ArchiveTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        subscription = create_subscription(*create_catalog())
+        for index in range(6):
+            payment = create_payment(subscription, f'txn-{index}')
+            # txn-3 to txn-5 are older than the 365 day payment cutoff
+            Payment.objects.filter(id=payment.id).update(
+                payment_date=timezone.now() - timedelta(days=200 + 60 * index))
+            if index in (1, 4):
+                Invoice.objects.create(payment=payment, due_date=MONDAY, is_paid=True)
+
+    def test_interrupted_run_is_finished_by_the_next_one(self):
+        moves = iter([move_batch, mock.Mock(side_effect=RuntimeError)])
+        with mock.patch('admin_dashboard.archiving.move_batch', lambda *args: next(moves)(*args)):
+            with self.assertRaises(RuntimeError):
+                archive_rows('payments', batch_size=2)
+        self.assertEqual((Payment.objects.count(), ArchivedPayment.objects.count()), (4, 2))
+        self.assertEqual(archive_rows('payments', batch_size=2), 1)
+        self.assertEqual((Payment.objects.count(), ArchivedPayment.objects.count()), (3, 3))
+
+    def test_archived_rows_are_served_only_when_requested(self):
+        archive_rows('payments')
+        archived = ArchivedPayment.objects.get(transaction_id='txn-4')
+        self.assertEqual(len(self.client.get('/api/payments/').data['results']), 3)
+        self.assertEqual(len(self.client.get('/api/payments/', {'include_archived': 'true'}).data['results']), 6)
+        self.assertEqual(self.client.get(f'/api/payments/{archived.id}/').status_code, 404)
+        response = self.client.get(f'/api/payments/{archived.id}/', {'include_archived': 'true'})
+        self.assertEqual(response.data['transaction_id'], 'txn-4')
+
+    def test_invoices_move_with_their_payments(self):
+        unpaid = Invoice.objects.create(payment=Payment.objects.get(transaction_id='txn-5'), due_date=MONDAY)
+        self.assertEqual(archive_rows('payments'), 2)
+        self.assertEqual(sorted(Payment.objects.values_list('transaction_id', flat=True)),
+            ['txn-0', 'txn-1', 'txn-2', 'txn-5'])
+        self.assertEqual(list(Invoice.objects.values_list('payment__transaction_id', flat=True).order_by('id')),
+            ['txn-1', 'txn-5'])
+        archived = ArchivedInvoice.objects.get()
+        self.assertEqual(archived.payment.transaction_id, 'txn-4')
+        self.assertTrue(archived.is_paid)
+
+        unpaid.is_paid = True
+        unpaid.save()
+        self.assertEqual(archive_rows('payments'), 1)
+        self.assertEqual(ArchivedInvoice.objects.count(), 2)
+
+    def test_export_merges_archived_rows(self):
+        archive_rows('payments')
+        response = self.client.get('/api/payments/export/', {'chunk_size': 2})
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 4)
+        response = self.client.get('/api/payments/export/', {'chunk_size': 2, 'include_archived': 'true'})
+        rows = b''.join(response.streaming_content).decode().splitlines()[1:]
+        self.assertEqual([row.split(',')[3] for row in rows], [f'txn-{index}' for index in range(6)])
+
+
+class AdminSearchTests(TestCase):
+    def test_payment_search_prefers_an_exact_transaction_id(self):
+        menu, slot = create_catalog()
+        subscription = create_subscription(menu, slot)
+        other = create_subscription(menu, slot, phone='5551234567')
+        by_id = create_payment(subscription, '5551234567')
+        by_phone = create_payment(other, 'txn-1')
+        payment_admin = admin.site._registry[Payment]
+
+        results, _ = payment_admin.get_search_results(None, Payment.objects.all(), '5551234567')
+        self.assertEqual(list(results), [by_id])
+        results, _ = payment_admin.get_search_results(None, Payment.objects.all(), '555 123 4567')
+        self.assertEqual(list(results), [by_phone])
+
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Changelists run a fixed number of queries (session, user, count, page, filters) however big the table."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Seeder(seed=0, scale=0.001, anchor=MONDAY, stdout=io.StringIO()).run()
+        cls.superuser = User.objects.create_superuser('root', password='secret')
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def test_changelists_run_a_fixed_number_of_queries(self):
+        # Item also loads the categories for its list_filter
+        for model, queries in ((Category, 5), (Item, 6), (MenuList, 5), (TimeSlot, 5), (CustomerProfile, 5),
+                (Subscription, 5), (DeliverySchedule, 5), (Notification, 5), (Payment, 5), (Invoice, 5),
+                (Report, 5)):
+            with self.subTest(model=model.__name__), self.assertNumQueries(queries):
+                response = self.client.get(f'/admin/admin_dashboard/{model._meta.model_name}/')
+                self.assertEqual(response.status_code, 200)
+
+    def test_empty_payment_search_skips_the_transaction_id_lookup(self):
+        with self.assertNumQueries(5):
+            self.client.get('/admin/admin_dashboard/payment/', {'q': ' '})
+
+class KeysetPaginationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        subscription = create_subscription(*create_catalog())
+        payments = [create_payment(subscription, f'txn-{index}') for index in range(7)]
+        # Ties on payment_date are broken by id
+        tied = timezone.now() - timedelta(days=1)
+        Payment.objects.filter(id__in=[payment.id for payment in payments[1:5]]).update(payment_date=tied)
+        self.expected = list(Payment.objects.order_by('-payment_date', '-id').values_list('id', flat=True))
+
+    def walk(self, url, link):
+        ids, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([row['id'] for row in response.data['results']])
+            ids += pages[-1]
+            url = response.data[link]
+        return ids, pages
+
+    def test_next_links_visit_every_row_once_in_order(self):
+        ids, pages = self.walk('/api/payments/?page_size=2', 'next')
+        self.assertEqual(ids, self.expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+
+    def test_previous_links_walk_back_to_the_first_page(self):
+        response = self.client.get('/api/payments/?page_size=2')
+        self.assertIsNone(response.data['previous'])
+        for _ in range(2):
+            response = self.client.get(response.data['next'])
+        _, pages = self.walk(response.data['previous'], 'previous')
+        self.assertEqual(pages, [self.expected[2:4], self.expected[:2]])
+
+    def test_invalid_cursors_are_rejected(self):
+        for cursor in ('not-a-cursor', 'eyJ2IjpbMV0sInIiOmZhbHNlfQ=='):
+            response = self.client.get('/api/payments/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.data['detail'], 'Invalid cursor')
+
+
+class ForecastTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        menu, slot = create_catalog()
+        self.oil, self.salt, self.lentils = [Ingredient.objects.create(name=name, unit='kg', quantity=quantity,
+            minimum_stock=minimum, cost_per_unit=1) for name, quantity, minimum in (
+                ('Oil', 10, 1), ('Salt', 5, 1), ('Lentils', 6, 6))]
+        RecipeIngredient.objects.create(item=menu.items.get(), ingredient=self.lentils, quantity=Decimal('0.5'))
+        # Four Monday/Wednesday/Friday subscribers need 2 kg of lentils on those days
+        for index in range(4):
+            create_subscription(menu, slot, phone=f'+1555010{index}')
+        for offset in range(14):
+            day = MONDAY - timedelta(days=offset)
+            DailyIngredientUsage.objects.create(ingredient=self.oil, date=day, quantity=2)
+            DailyIngredientUsage.objects.create(ingredient=self.lentils, date=day, quantity=Decimal('0.7'))
+        # Outside the 14 day history
+        DailyIngredientUsage.objects.create(ingredient=self.oil, date=MONDAY - timedelta(days=14), quantity=50)
+
+    def test_forecast_projects_history_and_planned_demand(self):
+        forecast = {entry['name']: entry for entry in forecast_stock(today=MONDAY)}
+        self.assertEqual(list(forecast), ['Lentils', 'Oil', 'Salt'])
+
+        # 2, 0.7, 2, 0.7, then 0.6 kg left against the 2 kg Friday need
+        self.assertEqual(forecast['Lentils']['daily_rate'], Decimal('0.70'))
+        self.assertEqual(forecast['Lentils']['horizon_demand'], Decimal('8.80'))
+        self.assertEqual(forecast['Lentils']['days_until_stockout'], Decimal('4.3'))
+        self.assertEqual(forecast['Lentils']['stockout_date'], MONDAY + timedelta(days=4))
+        self.assertTrue(forecast['Lentils']['below_minimum'])
+
+        self.assertEqual(forecast['Oil']['daily_rate'], Decimal('2.00'))
+        self.assertEqual(forecast['Oil']['horizon_demand'], Decimal('14.00'))
+        self.assertEqual(forecast['Oil']['days_until_stockout'], Decimal('5.0'))
+        self.assertFalse(forecast['Oil']['below_minimum'])
+
+        self.assertIsNone(forecast['Salt']['days_until_stockout'])
+        self.assertIsNone(forecast['Salt']['stockout_date'])
+
+    def test_forecast_endpoint_filters_by_horizon(self):
+        with mock.patch('django.utils.timezone.localdate', return_value=MONDAY):
+            response = self.client.get('/api/ingredients/forecast/', {'within_days': 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry['name'] for entry in response.data], ['Lentils'])
+        response = self.client.get('/api/ingredients/forecast/', {'horizon_days': 0})
+        self.assertEqual(response.status_code, 400)
+
+
+class ProductionPlanTests(ApiTestCase):
+    def test_plan_totals_follow_schedules_recipes_and_cancellations(self):
+        menu, slot = create_catalog()
+        dal = menu.items.get()
+        rice = Item.objects.create(category=dal.category, name='Rice', price=60)
+        menu.items.add(rice)
+        lentils, grain = [Ingredient.objects.create(name=name, unit='kg', quantity=1, minimum_stock=0,
+            cost_per_unit=1) for name in ('Lentils', 'Rice')]
+        RecipeIngredient.objects.create(item=dal, ingredient=lentils, quantity=Decimal('0.080'))
+        RecipeIngredient.objects.create(item=rice, ingredient=grain, quantity=Decimal('0.150'))
+        RecipeIngredient.objects.create(item=rice, ingredient=lentils, quantity=Decimal('0.010'))
+        # Three Monday/Wednesday/Friday subscribers, one Tuesday-only, one that ended
+        for index in range(3):
+            create_subscription(menu, slot, phone=f'+1555010{index}')
+        create_subscription(menu, slot, phone='+15550110', selected_days=['tue'])
+        create_subscription(menu, slot, phone='+15550111', start=MONDAY - timedelta(days=30))
+        materialize_deliveries(today=MONDAY, horizon_days=6)
+        cancelled = DeliverySchedule.objects.filter(delivery_date=MONDAY + timedelta(days=2)).order_by('id').first()
+        DeliverySchedule.objects.filter(id=cancelled.id).update(status='CANCELLED')
+
+        plan = production_plan(MONDAY, MONDAY + timedelta(days=6))
+
+        # 3 subscribers x 3 days + 1 Tuesday - 1 cancelled Wednesday delivery
+        self.assertEqual([(item['name'], item['portions']) for item in plan['totals']['items']],
+            [('Dal', 9), ('Rice', 9)])
+        portions_by_day = [sum(item['portions'] for slot_plan in day['time_slots'] for item in slot_plan['items'])
+            for day in plan['days']]
+        self.assertEqual(portions_by_day, [6, 2, 4, 0, 6, 0, 0])
+        needs = {ingredient['name']: (ingredient['quantity'], ingredient['shortfall'])
+            for ingredient in plan['totals']['ingredients']}
+        self.assertEqual(needs, {'Lentils': (Decimal('0.810'), 0), 'Rice': (Decimal('1.350'), Decimal('0.350'))})
+
+    def test_plan_defaults_to_the_coming_week(self):
+        response = self.client.get('/api/production-plan/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_dates_are_rejected(self):
+        response = self.client.get('/api/production-plan/', {'date_from': '2024-02-30'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date_from', response.data)
+        response = self.client.get('/api/production-plan/', {'date_from': '2024-03-01', 'date_to': '2024-02-01'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CatalogImportTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.menu, _ = create_catalog()
+
+    def menu_errors(self, report):
+        return {error['name']: error['errors'] for error in report['errors'] if error['section'] == 'menus'}
+
+    def test_json_import_upserts_by_name(self):
+        payload = {
+            'categories': [{'name': 'Mains', 'description': 'Hot food'}, {'name': 'Sides'}],
+            'items': [
+                {'name': 'Dal', 'category': 'Mains', 'price': '130.00'},
+                {'name': 'Raita', 'category': 'Sides', 'price': '40.00'},
+            ],
+            'menus': [{'name': 'Weekday', 'price': '950.00', 'items': ['Dal', 'Raita']}],
+        }
+        response = self.client.post('/api/menus/import_catalog/', payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['upserted'], {'categories': 2, 'items': 2, 'menus': 1})
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(Category.objects.get(name='Mains').description, 'Hot food')
+        self.assertEqual(Item.objects.get(name='Dal').price, Decimal('130.00'))
+        self.menu.refresh_from_db()
+        self.assertEqual(self.menu.price, Decimal('950.00'))
+        self.assertEqual(sorted(self.menu.items.values_list('name', flat=True)), ['Dal', 'Raita'])
+
+    def test_csv_upload(self):
+        content = (
+            'type,name,category,price,items,customization_options\n'
+            'category,Sides,,,,\n'
+            'item,Raita,Sides,40,,"{""spicy"": false}"\n'
+            'menu,Light,,500,Dal; Raita,\n'
+        )
+        upload = SimpleUploadedFile('catalog.csv', content.encode(), content_type='text/csv')
+        response = self.client.post('/api/menus/import_catalog/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(Item.objects.get(name='Raita').customization_options, {'spicy': False})
+        self.assertEqual(sorted(MenuList.objects.get(name='Light').items.values_list('name', flat=True)),
+            ['Dal', 'Raita'])
+
+    def test_dry_run_reports_without_writing(self):
+        payload = {'categories': [{'name': 'Sides'}], 'menus': [{'name': 'Empty'}]}
+        response = self.client.post('/api/menus/import_catalog/?dry_run=true', payload, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['dry_run'])
+        self.assertEqual(response.data['upserted'], {'categories': 1, 'items': 0, 'menus': 0})
+        self.assertEqual(self.menu_errors(response.data), {'Empty': ['Cannot activate menu list without items']})
+        self.assertFalse(Category.objects.filter(name='Sides').exists())
+
+    def test_malformed_payloads_are_rejected(self):
+        response = self.client.post('/api/menus/import_catalog/', [], format='json')
+        self.assertEqual(response.status_code, 400)
+        upload = SimpleUploadedFile('catalog.csv', b'type,name\ndish,Dal\n', content_type='text/csv')
+        response = self.client.post('/api/menus/import_catalog/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Line 2', response.data['error'])
+
+    def test_parse_csv(self):
+        payload = parse_csv(
+            'type,name,category,price,items,nutritional_info\n'
+            'Category,Mains,,,,\n'
+            'menu,Weekday,,900,Mains/Dal;;Rice ,"{""kcal"": 650}"\n'
+        )
+        self.assertEqual(payload, {
+            'categories': [{'name': 'Mains'}],
+            'items': [],
+            'menus': [{'name': 'Weekday', 'price': '900', 'items': ['Mains/Dal', 'Rice'],
+                'nutritional_info': {'kcal': 650}}],
+        })
+        with self.assertRaisesMessage(CatalogImportError, 'Line 2: nutritional_info is not valid JSON'):
+            parse_csv('type,name,nutritional_info\nmenu,Weekday,{kcal}\n')
+
+    def test_menu_rules(self):
+        sides = Category.objects.create(name='Sides')
+        Item.objects.create(category=sides, name='Dal', price=60)
+        Item.objects.create(category=sides, name='Papad', price=10, is_active=False)
+        payload = {
+            'items': [{'name': 'Naan', 'category': 'Breads', 'price': '30.00'}],
+            'menus': [
+                {'name': 'Ambiguous', 'items': ['Dal']},
+                {'name': 'Qualified', 'items': ['Sides/Dal']},
+                {'name': 'Unknown', 'items': ['Biryani']},
+                {'name': 'Crowded', 'max_items': 1, 'items': ['Mains/Dal', 'Sides/Dal']},
+                {'name': 'Stale', 'items': ['Papad']},
+                {'name': 'Draft', 'is_active': False},
+            ],
+        }
+        report = import_catalog(payload)
+
+        self.assertEqual(report['errors'][0]['errors'], {'category': ["Unknown category 'Breads'"]})
+        self.assertEqual(self.menu_errors(report), {
+            'Ambiguous': ["Item name 'Dal' is ambiguous, use 'Category/Dal'", 'Cannot activate menu list without items'],
+            'Unknown': ["Unknown item 'Biryani'", 'Cannot activate menu list without items'],
+            'Crowded': ['Menu cannot have more than 1 items'],
+            'Stale': ['Cannot include inactive items in menu list'],
+        })
+        self.assertEqual(report['upserted'], {'categories': 0, 'items': 0, 'menus': 2})
+        self.assertEqual(list(MenuList.objects.get(name='Qualified').items.values_list('category__name', flat=True)),
+            ['Sides'])
+
+    def test_items_in_active_menus_cannot_be_deactivated(self):
+        payload = {'items': [{'name': 'Dal', 'category': 'Mains', 'price': '120.00', 'is_active': False}]}
+        report = import_catalog(payload)
+        self.assertEqual(report['errors'][0]['errors'], ['Cannot deactivate item while it is part of an active menu'])
+        self.assertTrue(Item.objects.get(name='Dal').is_active)
+
+        # Allowed when the same import takes the item out of the menu
+        payload['items'].append({'name': 'Rice', 'category': 'Mains', 'price': '50.00'})
+        payload['menus'] = [{'name': 'Weekday', 'price': '900.00', 'items': ['Rice']}]
+        self.assertEqual(import_catalog(payload)['errors'], [])
+        self.assertFalse(Item.objects.get(name='Dal').is_active)
+
+    def test_duplicate_names_are_a_validation_error(self):
+        category = Category.objects.get(name='Mains')
+        response = self.client.post('/api/items/', {'name': 'Dal', 'description': 'Lentils',
+            'category_id': category.id, 'price': '99.00'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.data)
+        response = self.client.post('/api/categories/', {'name': 'Mains'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.data)
+
+
+class SparseFieldsetTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        menu, slot = create_catalog()
+        self.subscription = create_subscription(menu, slot)
+
+    def test_fields_select_nested_paths(self):
+        response = self.client.get('/api/subscriptions/', {'fields': 'id,menu_list.name,menu_list.items.name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [
+            {'id': self.subscription.id, 'menu_list': {'name': 'Weekday', 'items': [{'name': 'Dal'}]}},
+        ])
+
+    def test_expand_renders_other_nested_serializers_as_keys(self):
+        response = self.client.get('/api/subscriptions/', {'fields': 'id,customer,menu_list,time_slot',
+            'expand': 'time_slot'})
+        subscription = self.subscription
+        self.assertEqual(response.json()['results'], [{
+            'id': subscription.id, 'customer': subscription.customer_id, 'menu_list': subscription.menu_list_id,
+            'time_slot': {'id': subscription.time_slot_id, 'start_time': '12:00:00', 'end_time': '13:00:00',
+                'is_active': True},
+        }])
+
+    def test_unrequested_relations_are_not_loaded(self):
+        # Page count and the subscriptions, no joins or prefetches
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/subscriptions/', {'fields': 'id,start_date'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('JOIN', queries[1]['sql'])
+        with self.assertNumQueries(3):
+            # Only menu_list is joined, plus one prefetch of its items with their categories
+            self.client.get('/api/subscriptions/', {'fields': 'id,menu_list.items.category.name'})
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/subscriptions/', {'fields': 'id,nonexistent'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'fields': ["Unknown field 'nonexistent'"]})
+        response = self.client.get('/api/subscriptions/', {'fields': 'id,menu_list.bogus'})
+        self.assertEqual(response.status_code, 400)
+
+
+class RenderingParityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Seeder(seed=0, scale=0.001, anchor=MONDAY, stdout=io.StringIO()).run()
+
+    def test_fast_renderer_matches_drf(self):
+        data = {
+            'utc': datetime(2026, 10, 19, 12, 30, 5, 123456, tzinfo=dt_timezone.utc),
+            'offset': datetime(2026, 10, 19, 12, 30, tzinfo=dt_timezone(timedelta(hours=5, minutes=30))),
+            'naive': datetime(2026, 10, 19, 12, 30, 5, 7),
+            'date': MONDAY, 'time': time(12, 0, 0, 500),
+            'decimal': Decimal('12.50'), 'uuid': uuid.UUID(int=1), 'lazy': gettext_lazy('Weekday'),
+            'text': 'line\u2028separator\u2029 caf\u00e9', 'big': 2 ** 70,
+            'nested': [{1: None, 'float': 1.5, 'flag': True}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_nan_renders_as_null(self):
+        # The documented difference from JSONRenderer, which refuses it
+        self.assertEqual(FastJSONRenderer().render({'value': float('nan')}), b'{"value":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'value': float('nan')})
+
+    def test_values_serializers_match_their_model_serializers(self):
+        for values_serializer_class, queryset in (
+            (DeliveryScheduleValuesSerializer, DeliverySchedule.objects.order_by('id')[:200]),
+            (NotificationValuesSerializer, Notification.objects.order_by('id')[:200]),
+            (PaymentValuesSerializer, Payment.objects.order_by('id')[:200]),
+        ):
+            with self.subTest(values_serializer_class.__name__):
+                serializer = values_serializer_class()
+                expected = values_serializer_class.serializer_class(queryset, many=True).data
+                self.assertTrue(expected)
+                self.assertEqual(serializer.to_representation(serializer.values(queryset)), expected)
+
+
+class SeederTests(TestCase):
+    def seeded_rows(self, seed):
+        """Seed an emptied database and return every admin_dashboard row, ids included."""
+        tables = connection.introspection.django_table_names(only_existing=True, include_views=False)
+        connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables, reset_sequences=True))
+        # Fields stamped with now() are the only input besides the seed and anchor
+        with mock.patch('django.utils.timezone.now', return_value=datetime(2026, 10, 1, tzinfo=dt_timezone.utc)):
+            Seeder(seed=seed, scale=0.001, anchor=MONDAY, stdout=io.StringIO()).run()
+        return {model.__name__: list(model.objects.order_by('pk').values())
+            for model in apps.get_app_config('admin_dashboard').get_models()}
+
+    def test_same_seed_and_anchor_produce_the_same_rows(self):
+        rows = self.seeded_rows(seed=7)
+        self.assertTrue(rows['Payment'] and rows['DailyRollup'])
+        self.assertEqual(self.seeded_rows(seed=7), rows)
+        self.assertNotEqual(self.seeded_rows(seed=8)['Payment'], rows['Payment'])
@@ -0,0 +1,73 @@
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.response import Response
+from .fieldsets import sparse_fieldsets_requested
+from .metrics import timed_serialization
+
+# Field types whose values() output differs from what the serializer field
+# renders; everything else (ids, strings, booleans, JSON) passes through.
+CONVERTED_FIELDS = (serializers.DecimalField, serializers.DateTimeField, serializers.DateField,
+    serializers.TimeField)
+
+
+class ValuesSerializer:
+    """
+    Read-only counterpart of a flat ModelSerializer built on values().
+
+    Produces the same dicts as ``serializer_class`` but skips model
+    instantiation and the per-field serializer machinery: rows come straight
+    from ``queryset.values()`` and only decimal and temporal columns go
+    through their serializer field's ``to_representation``.
+    """
+    serializer_class = None
+
+    def __init__(self):
+        self.columns = []
+        self.converters = []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            assert not isinstance(field, serializers.BaseSerializer), (
+                f'{self.__class__.__name__} cannot render nested serializer {name!r}')
+            self.columns.append((name, field.source.replace('.', '__')))
+            if isinstance(field, CONVERTED_FIELDS):
+                self.converters.append((name, field.to_representation))
+
+    def values(self, queryset):
+        fields = [name for name, source in self.columns if name == source]
+        aliases = {name: F(source) for name, source in self.columns if name != source}
+        return queryset.values(*fields, **aliases)
+
+    def to_representation(self, rows):
+        converters = self.converters
+        data = []
+        with timed_serialization():
+            for row in rows:
+                # Copied so paginators can still read the raw values of the page
+                row = dict(row)
+                for name, convert in converters:
+                    value = row[name]
+                    if value is not None:
+                        row[name] = convert(value)
+                data.append(row)
+        return data
+
+
+class ValuesListMixin:
+    """
+    Viewset mixin serving list requests through ``values_serializer_class``.
+
+    Falls back to the regular serializer when ``?fields=``/``?expand=`` are
+    given, so sparse fieldsets behave the same on every endpoint.
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.values_serializer_class is None or sparse_fieldsets_requested(request):
+            return super().list(request, *args, **kwargs)
+        serializer = self.values_serializer_class()
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(queryset))
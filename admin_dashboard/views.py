@@ -1,13 +1,55 @@
 
-from rest_framework import viewsets
+import json
+from datetime import timedelta
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
-from .models import Category, Item, MenuList, TimeSlot
-from .serializers import CategorySerializer, ItemSerializer, MenuListSerializer, TimeSlotSerializer
+from rest_framework.renderers import TemplateHTMLRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .models import (
+    Category, Item, MenuList, TimeSlot, CustomerProfile, Subscription,
+    DeliverySchedule, Notification, Payment, Invoice, Report, Ingredient,
+    IngredientUsage, RecipeIngredient, ArchivedDeliverySchedule, ArchivedNotification, ArchivedPayment
+)
+from .archiving import ArchiveMixin
+from .broadcasts import audience, broadcast_progress, progress_lines
+from .catalog import catalog_stats, catalog_version, get_menus
+from .catalog_import import CatalogImportError, import_catalog, parse_csv
+from .conditional import ConditionalGetMixin
+from .customers import claim_idempotency_key
+from .db_router import reads_from_replica
+from .deliveries import DEFAULT_BATCH_SIZE, build_manifest, transition_deliveries
+from .eager_loading import EagerLoadingMixin
+from .exports import StreamingExportMixin, iterate_async
+from .fieldsets import sparse_fieldsets_requested
+from .forecasting import DEFAULT_HISTORY_DAYS, DEFAULT_HORIZON_DAYS, forecast_stock
+from .invoicing import create_invoices, payments_for_period
+from .pagination import DeliverySchedulePagination, NotificationPagination, PaymentPagination
+from .planning import MAX_PLAN_DAYS, production_plan
+from .rollups import summarize
+from .serializers import (
+    CategorySerializer, ItemSerializer, MenuListSerializer, TimeSlotSerializer,
+    CustomerProfileSerializer, SubscriptionSerializer, DeliveryScheduleSerializer,
+    DeliveryScheduleValuesSerializer, DeliveryBulkTransitionSerializer, NotificationSerializer,
+    NotificationValuesSerializer, BroadcastSerializer, PaymentSerializer, PaymentValuesSerializer,
+    InvoiceSerializer, InvoiceBulkGenerateSerializer, ReportSerializer, IngredientSerializer,
+    IngredientUsageSerializer, IngredientUsageBatchSerializer, RecipeIngredientSerializer,
+    ProductionPlanQuerySerializer, ManifestQuerySerializer
+)
+from .stock import record_usages
+from .values import ValuesListMixin
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminUser]
+    list_query_budget = 3
 
     def get_queryset(self):
         queryset = Category.objects.all()
@@ -16,10 +58,13 @@ class CategoryViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(is_active=is_active == 'true')
         return queryset
 
-class ItemViewSet(viewsets.ModelViewSet):
+class ItemViewSet(ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Item.objects.all()
     serializer_class = ItemSerializer
     permission_classes = [IsAdminUser]
+    list_query_budget = 3
+    # Items embed their category
+    conditional_fields = ('updated_at', 'category__updated_at')
 
     def get_queryset(self):
         queryset = Item.objects.all()
@@ -28,11 +73,50 @@ class ItemViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(category_id=category)
         return queryset
 
-class MenuListViewSet(viewsets.ModelViewSet):
+class MenuListViewSet(ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = MenuList.objects.all()
     serializer_class = MenuListSerializer
     permission_classes = [IsAuthenticated]
-    
+    list_query_budget = 2
+
+    def resource_state(self, queryset):
+        # Menus embed items and categories; the catalog version changes with
+        # any of them and costs a cache read rather than a query.
+        return str(catalog_version()), None
+
+    def list(self, request, *args, **kwargs):
+        if sparse_fieldsets_requested(request):
+            # The cache holds complete menus; trimmed ones come from the database
+            return super().list(request, *args, **kwargs)
+        return self.conditional(request, self.get_queryset(), self.list_cached)
+
+    def list_cached(self, request):
+        # Served from the versioned catalog cache; see admin_dashboard.catalog
+        menus = get_menus()
+        page = self.paginate_queryset(menus)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(menus)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        return Response(catalog_stats())
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def import_catalog(self, request):
+        dry_run = request.query_params.get('dry_run', 'false') == 'true'
+        try:
+            upload = request.FILES.get('file')
+            if upload is not None:
+                content = upload.read().decode('utf-8-sig')
+                payload = parse_csv(content) if upload.name.lower().endswith('.csv') else json.loads(content)
+            else:
+                payload = request.data
+            report = import_catalog(payload, dry_run=dry_run)
+        except (CatalogImportError, ValueError) as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
     def perform_create(self, serializer):
         instance = serializer.save()
         instance.full_clean()
@@ -41,20 +125,23 @@ class MenuListViewSet(viewsets.ModelViewSet):
         instance = serializer.save()
         instance.full_clean()
 
-class TimeSlotViewSet(viewsets.ModelViewSet):
+class TimeSlotViewSet(ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = TimeSlot.objects.all()
     serializer_class = TimeSlotSerializer
     permission_classes = [IsAdminUser]
+    list_query_budget = 3
 
-class CustomerProfileViewSet(viewsets.ModelViewSet):
+class CustomerProfileViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = CustomerProfile.objects.all()
     serializer_class = CustomerProfileSerializer
     permission_classes = [IsAuthenticated]
+    list_query_budget = 2
 
-class SubscriptionViewSet(viewsets.ModelViewSet):
+class SubscriptionViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Subscription.objects.all()
     serializer_class = SubscriptionSerializer
     permission_classes = [IsAuthenticated]
+    list_query_budget = 3
     
     def get_queryset(self):
         queryset = Subscription.objects.all()
@@ -64,13 +151,45 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(customer_id=customer_id)
         return queryset
 
-class DeliveryScheduleViewSet(viewsets.ModelViewSet):
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > 64:
+            return Response({'error': 'Idempotency-Key must be at most 64 characters'},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            record, created = claim_idempotency_key(f'api:{request.user.pk}', key)
+            if not created:
+                if record.response_status is None:
+                    return Response({'error': 'A request with this Idempotency-Key is still in progress'},
+                        status=status.HTTP_409_CONFLICT)
+                return Response(record.response_body, status=record.response_status,
+                    headers={'Idempotent-Replayed': 'true'})
+            response = super().create(request, *args, **kwargs)
+            record.subscription_id = response.data.get('id')
+            record.response_status = response.status_code
+            record.response_body = response.data
+            record.save()
+        return response
+
+class DeliveryScheduleViewSet(ArchiveMixin, ValuesListMixin, StreamingExportMixin, EagerLoadingMixin,
+        viewsets.ModelViewSet):
     queryset = DeliverySchedule.objects.all()
     serializer_class = DeliveryScheduleSerializer
+    archive_model = ArchivedDeliverySchedule
+    values_serializer_class = DeliveryScheduleValuesSerializer
     permission_classes = [IsAuthenticated]
+    list_query_budget = 1
+    pagination_class = DeliverySchedulePagination
+    export_fields = ['id', 'subscription_id', 'subscription__customer_id', 'subscription__time_slot_id',
+        'delivery_date', 'status', 'delivery_notes', 'created_at', 'updated_at']
+    export_ordering = DeliverySchedulePagination.ordering
+    export_filename = 'deliveries'
 
-    def get_queryset(self):
-        queryset = DeliverySchedule.objects.all()
+    def get_queryset(self, model=DeliverySchedule):
+        queryset = model.objects.all()
         status = self.request.query_params.get('status', None)
         date = self.request.query_params.get('date', None)
         
@@ -80,16 +199,62 @@ class DeliveryScheduleViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(delivery_date=date)
         return queryset
 
-class NotificationViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'],
+        renderer_classes=api_settings.DEFAULT_RENDERER_CLASSES + [TemplateHTMLRenderer])
+    def manifest(self, request):
+        serializer = ManifestQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            # Printed manifests are requested with format=html, so the errors need a page too
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST,
+                template_name='admin_dashboard/manifest_error.html')
+        params = serializer.validated_data
+        batch_size = params.get('batch_size', DEFAULT_BATCH_SIZE)
+        manifest = build_manifest(params.get('date') or timezone.localdate(), params.get('time_slot'),
+            batch_size=max(1, min(batch_size, 200)))
+        return Response(manifest, template_name='admin_dashboard/manifest.html')
+
+    @action(detail=False, methods=['post'])
+    def bulk_transition(self, request):
+        serializer = DeliveryBulkTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        queryset = DeliverySchedule.objects.all()
+        if 'ids' in data:
+            queryset = queryset.filter(id__in=data['ids'])
+        if 'date' in data:
+            queryset = queryset.filter(delivery_date=data['date'])
+        if 'time_slot' in data:
+            queryset = queryset.filter(subscription__time_slot_id=data['time_slot'])
+        if 'status' in data:
+            queryset = queryset.filter(status=data['status'])
+
+        outcomes = transition_deliveries(queryset, data['target_status'], data.get('ids'))
+        updated = sum(1 for outcome in outcomes.values() if outcome['result'] == 'updated')
+        return Response({
+            'target_status': data['target_status'],
+            'updated': updated,
+            'skipped': len(outcomes) - updated,
+            'results': outcomes,
+        })
+
+class NotificationViewSet(ArchiveMixin, ValuesListMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
+    archive_model = ArchivedNotification
+    values_serializer_class = NotificationValuesSerializer
     permission_classes = [IsAuthenticated]
+    list_query_budget = 1
+    pagination_class = NotificationPagination
     
-    def get_queryset(self):
-        queryset = Notification.objects.all()
+    def get_queryset(self, model=Notification):
+        queryset = model.objects.all()
         customer_id = self.request.query_params.get('customer_id', None)
+        is_read = self.request.query_params.get('is_read', None)
         if customer_id:
             queryset = queryset.filter(customer_id=customer_id)
+        if is_read is not None:
+            queryset = queryset.filter(is_read=is_read == 'true')
         return queryset
 
     @action(detail=True, methods=['post'])
@@ -99,22 +264,56 @@ class NotificationViewSet(viewsets.ModelViewSet):
         notification.save()
         return Response({'status': 'notification marked as read'})
 
-class PaymentViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def broadcast(self, request):
+        serializer = BroadcastSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        customer_ids = audience(
+            menu_list=data.get('menu_list'),
+            time_slot=data.get('time_slot'),
+            location=data.get('location'),
+            active_only=data['active_only'],
+            active_on=data.get('active_on'),
+        )
+        # Streamed: each chunk commits and reports its running total as the
+        # response is read, instead of the request blocking on the whole fan-out
+        totals = broadcast_progress(customer_ids, data['type'], data['title'], data['message'],
+            chunk_size=data['chunk_size'])
+        lines = progress_lines(totals)
+        if isinstance(request._request, ASGIRequest):
+            lines = iterate_async(lines)
+        return StreamingHttpResponse(lines, status=status.HTTP_201_CREATED, content_type='application/x-ndjson')
+
+class PaymentViewSet(ArchiveMixin, ValuesListMixin, StreamingExportMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
+    archive_model = ArchivedPayment
+    values_serializer_class = PaymentValuesSerializer
     permission_classes = [IsAuthenticated]
+    list_query_budget = 1
+    pagination_class = PaymentPagination
+    export_fields = ['id', 'subscription_id', 'amount', 'transaction_id', 'status', 'payment_date',
+        'payment_method', 'notes']
+    export_ordering = PaymentPagination.ordering
+    export_filename = 'payments'
     
-    def get_queryset(self):
-        queryset = Payment.objects.all()
+    def get_queryset(self, model=Payment):
+        queryset = model.objects.all()
         subscription_id = self.request.query_params.get('subscription_id', None)
+        status = self.request.query_params.get('status', None)
         if subscription_id:
             queryset = queryset.filter(subscription_id=subscription_id)
+        if status:
+            queryset = queryset.filter(status=status)
         return queryset
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Invoice.objects.all()
     serializer_class = InvoiceSerializer
     permission_classes = [IsAuthenticated]
+    list_query_budget = 2
 
     def get_queryset(self):
         queryset = Invoice.objects.all()
@@ -123,36 +322,33 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(is_paid=is_paid == 'true')
         return queryset
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk_generate(self, request):
+        serializer = InvoiceBulkGenerateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
 
-from django.db.models import Sum, Count
-from django.utils import timezone
-from datetime import timedelta
-import json
+        payments = payments_for_period(data['date_from'], data['date_to'], data.get('statuses'))
+        return Response({'created': create_invoices(payments, data['due_date'])}, status=status.HTTP_201_CREATED)
 
-class ReportViewSet(viewsets.ModelViewSet):
+
+class ReportViewSet(ConditionalGetMixin, StreamingExportMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Report.objects.all()
     serializer_class = ReportSerializer
     permission_classes = [IsAuthenticated]
+    list_query_budget = 3
+    export_fields = ['id', 'type', 'date_from', 'date_to', 'total_revenue', 'total_subscriptions',
+        'active_customers', 'generated_at', 'data']
+    export_ordering = ['-generated_at', '-id']
+    export_filename = 'reports'
 
     def generate_report(self, start_date, end_date, report_type):
-        subscriptions = Subscription.objects.filter(
-            start_date__gte=start_date,
-            end_date__lte=end_date
-        )
-        
-        payments = Payment.objects.filter(
-            payment_date__date__gte=start_date,
-            payment_date__date__lte=end_date,
-            status='SUCCESS'
-        )
-        
-        report_data = {
-            'subscription_count': subscriptions.count(),
-            'revenue': float(payments.aggregate(Sum('amount'))['amount__sum'] or 0),
-            'payment_methods': dict(payments.values_list('payment_method').annotate(count=Count('id'))),
-            'active_customers': CustomerProfile.objects.filter(subscription__in=subscriptions).distinct().count()
-        }
-        
+        # Sums at most one DailyRollup row per day instead of rescanning
+        # Subscription and Payment; see admin_dashboard.rollups. The
+        # aggregation reads the replica unless this client just wrote.
+        with reads_from_replica(self.request):
+            report_data = summarize(start_date, end_date)
+
         return Report.objects.create(
             type=report_type,
             date_from=start_date,
@@ -182,22 +378,44 @@ class ReportViewSet(viewsets.ModelViewSet):
         return Response(self.get_serializer(report).data)
 
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = [IsAdminUser]
+    list_query_budget = 2
 
     @action(detail=False, methods=['get'])
-    def low_stock(self):
+    def low_stock(self, request):
         low_stock = Ingredient.objects.filter(quantity__lte=F('minimum_stock'))
         serializer = self.get_serializer(low_stock, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def forecast(self, request):
+        try:
+            history_days = int(request.query_params.get('history_days', DEFAULT_HISTORY_DAYS))
+            horizon_days = int(request.query_params.get('horizon_days', DEFAULT_HORIZON_DAYS))
+            within_days = request.query_params.get('within_days', None)
+            within_days = int(within_days) if within_days is not None else None
+        except ValueError:
+            return Response({'error': 'history_days, horizon_days and within_days must be integers'},
+                status=status.HTTP_400_BAD_REQUEST)
+        if not (1 <= history_days <= 90 and 1 <= horizon_days <= MAX_PLAN_DAYS):
+            return Response({'error': f'history_days must be 1-90 and horizon_days 1-{MAX_PLAN_DAYS}'},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        forecast = forecast_stock(history_days, horizon_days)
+        if within_days is not None:
+            forecast = [entry for entry in forecast if entry['below_minimum'] or (
+                entry['days_until_stockout'] is not None and entry['days_until_stockout'] <= within_days)]
+        return Response(forecast)
 
-class IngredientUsageViewSet(viewsets.ModelViewSet):
+
+class IngredientUsageViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = IngredientUsage.objects.all()
     serializer_class = IngredientUsageSerializer
     permission_classes = [IsAdminUser]
+    list_query_budget = 2
 
     def get_queryset(self):
         queryset = IngredientUsage.objects.all()
@@ -205,3 +423,38 @@ class IngredientUsageViewSet(viewsets.ModelViewSet):
         if ingredient_id:
             queryset = queryset.filter(ingredient_id=ingredient_id)
         return queryset
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = IngredientUsageBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        usages = record_usages(serializer.validated_data['usages'])
+        return Response(self.get_serializer(usages, many=True).data, status=status.HTTP_201_CREATED)
+
+
+class RecipeIngredientViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
+    queryset = RecipeIngredient.objects.all()
+    serializer_class = RecipeIngredientSerializer
+    permission_classes = [IsAdminUser]
+    list_query_budget = 2
+
+    def get_queryset(self):
+        queryset = RecipeIngredient.objects.order_by('item_id', 'ingredient_id')
+        item_id = self.request.query_params.get('item', None)
+        if item_id:
+            queryset = queryset.filter(item_id=item_id)
+        return queryset
+
+
+class ProductionPlanViewSet(viewsets.ViewSet):
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        serializer = ProductionPlanQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        date_from = serializer.validated_data.get('date_from') or timezone.localdate()
+        date_to = serializer.validated_data.get('date_to') or date_from + timedelta(days=6)
+        if date_to < date_from or (date_to - date_from).days >= MAX_PLAN_DAYS:
+            return Response({'error': f'date_to must be within {MAX_PLAN_DAYS} days after date_from'},
+                status=status.HTTP_400_BAD_REQUEST)
+        return Response(production_plan(date_from, date_to))
@@ -1,20 +1,38 @@
 
+import uuid
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from admin_dashboard.models import MenuList, TimeSlot, CustomerProfile, Subscription
+from django.db import transaction
+from admin_dashboard.catalog import aget_menus
+from admin_dashboard.customers import claim_idempotency_key, resolve_customer
+from admin_dashboard.models import TimeSlot, Subscription
 from datetime import datetime, timedelta
 
-def home(request):
+async def home(request):
     return render(request, 'customer_portal/home.html')
 
-def menu_list(request):
-    menus = MenuList.objects.filter(is_active=True)
+async def menu_list(request):
+    menus = await aget_menus(active_only=True)
     return render(request, 'customer_portal/menu_list.html', {'menus': menus})
 
-def subscribe(request):
-    if request.method == 'POST':
-        try:
-            customer = CustomerProfile.objects.create(
+def _create_subscription(request):
+    """Handle the subscribe form; synchronous because it runs in one transaction."""
+    idempotency_key = request.POST.get('idempotency_key', '').strip()
+    if not idempotency_key:
+        messages.error(request, 'This form has expired, please fill it in again')
+        return redirect('subscribe')
+    try:
+        with transaction.atomic():
+            # A double-submitted form carries the same key as the first POST
+            record, created = claim_idempotency_key('portal', idempotency_key)
+            if not created:
+                if record.subscription_id:
+                    messages.success(request, 'Subscription created successfully!')
+                    return redirect('home')
+                raise ValueError('This subscription is already being processed')
+
+            customer = resolve_customer(
                 first_name=request.POST['first_name'],
                 last_name=request.POST['last_name'],
                 phone_number=request.POST['phone_number'],
@@ -26,6 +44,7 @@ def subscribe(request):
             end_date = datetime.strptime(request.POST['end_date'], '%Y-%m-%d').date()
             
             if (end_date - start_date).days > 30:
+                transaction.set_rollback(True)
                 messages.error(request, 'Subscription cannot exceed 30 days')
                 return redirect('subscribe')
             
@@ -37,17 +56,24 @@ def subscribe(request):
                 end_date=end_date,
                 selected_days=request.POST.getlist('weekdays'),
                 payment_mode=request.POST['payment_mode'],
-                delivery_notification=request.POST.get('delivery_notification', False)
+                delivery_notification='delivery_notification' in request.POST
             )
-            messages.success(request, 'Subscription created successfully!')
-            return redirect('home')
-        except Exception as e:
-            messages.error(request, str(e))
-            return redirect('subscribe')
-    
-    menus = MenuList.objects.filter(is_active=True)
-    time_slots = TimeSlot.objects.filter(is_active=True)
+            record.subscription = subscription
+            record.save(update_fields=['subscription'])
+        messages.success(request, 'Subscription created successfully!')
+        return redirect('home')
+    except Exception as e:
+        messages.error(request, str(e))
+        return redirect('subscribe')
+
+async def subscribe(request):
+    if request.method == 'POST':
+        return await sync_to_async(_create_subscription)(request)
+
+    menus = await aget_menus(active_only=True)
+    time_slots = [slot async for slot in TimeSlot.objects.filter(is_active=True)]
     return render(request, 'customer_portal/subscribe.html', {
         'menus': menus,
-        'time_slots': time_slots
+        'time_slots': time_slots,
+        'idempotency_key': uuid.uuid4().hex
     })
@@ -2,6 +2,12 @@
 ASGI config for django_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with any ASGI server, e.g.::
+
+    uvicorn django_project.asgi:application --workers 4
+
+The portal pages and /api/catalog/ are async views; everything else runs
+in Django's thread pool. ``manage.py benchmark_asgi`` compares both handlers.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -54,11 +54,26 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Both fall back to the stock JSON implementations when orjson is not installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'admin_dashboard.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'admin_dashboard.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
 }
 
+# Page size for the keyset-paginated notification, delivery and payment endpoints
+KEYSET_PAGE_SIZE = 20
+
 MIDDLEWARE = [
+    'admin_dashboard.middleware.MetricsMiddleware',
+    'admin_dashboard.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -67,6 +82,27 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
 ]
 
+# Per-route request metrics, served in Prometheus text format at /metrics.
+# Only staff sessions and scrapers sending METRICS_TOKEN as a bearer token may
+# read it; METRICS_PUBLIC=1 opts in to unauthenticated access. METRICS_LOG_REQUESTS=1
+# also logs one JSON line per request on the admin_dashboard.requests logger.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC') == '1'
+METRICS_LOG_REQUESTS = os.environ.get('METRICS_LOG_REQUESTS') == '1'
+# Number of slowest requests (with their SQL) kept for /metrics/slow/
+METRICS_SLOW_SAMPLE_SIZE = 20
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'admin_dashboard.requests': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # Only use clickjacking protection in deployments because the Development Web View uses 
 # iframes and needs to be a cross origin.
 if ("REPLIT_DEPLOYMENT" in os.environ):
@@ -96,13 +132,103 @@ WSGI_APPLICATION = 'django_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Connections are kept for CONN_MAX_AGE seconds and health-checked before reuse.
+# Setting DATABASE_REPLICA_PATH adds a read replica: GET requests under
+# REPLICA_READ_PATHS, report aggregation and exports read from it (see
+# admin_dashboard.db_router); the admin and the portal stay on the primary,
+# as do clients that just wrote, for REPLICA_PIN_SECONDS. For a local
+# two-file setup, `manage.py sync_replica` copies the primary into it.
+#
+# A database created with `migrate --run-syncdb` before admin_dashboard had
+# migrations already holds the 0001_initial tables: upgrade it once with
+# `manage.py migrate --fake-initial`. If 0005 stops on customers sharing a
+# phone number, run `manage.py merge_duplicate_customers` and migrate again.
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'timeout': 20},
     }
 }
 
+if os.environ.get('DATABASE_REPLICA_PATH'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['DATABASE_REPLICA_PATH'],
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'timeout': 20},
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Setting DATABASE_ARCHIVE_PATH keeps the archive tables filled by
+# `manage.py archive_history` in their own database instead of the primary.
+if os.environ.get('DATABASE_ARCHIVE_PATH'):
+    DATABASES['archive'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['DATABASE_ARCHIVE_PATH'],
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'timeout': 20},
+    }
+
+DATABASE_ROUTERS = ['admin_dashboard.db_router.ReplicaRouter']
+DATABASE_REPLICA_ALIAS = 'replica'
+REPLICA_PIN_SECONDS = 10
+REPLICA_READ_PATHS = ['/api/']
+DATABASE_ARCHIVE_ALIAS = 'archive'
+
+# Age in days after which archive_history moves settled rows out of the live
+# tables; the API serves them only with ?include_archived=true.
+ARCHIVE_AFTER_DAYS = {
+    'deliveries': 90,
+    'notifications': 90,
+    'payments': 365,
+}
+
+# Applied to every new SQLite connection (admin_dashboard.db_router.configure_sqlite)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+    'mmap_size': 134217728,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The catalog alias holds the versioned menu structure served by the portal and
+# /api/menus/. Every worker must see the same version key, so it defaults to a
+# file cache on local disk, shared by all workers on this host. Set
+# CATALOG_CACHE_URL to a redis:// URL when workers run on several hosts, or to
+# another directory for the file backend. A per-process locmem cache fails the
+# system checks when WEB_CONCURRENCY asks for more than one worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CATALOG_CACHE_URL') or BASE_DIR / '.cache' / 'catalog',
+    },
+}
+
+if os.environ.get('CATALOG_CACHE_URL', '').startswith(('redis://', 'rediss://')):
+    CACHES['catalog'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['CATALOG_CACHE_URL'],
+    }
+
+CATALOG_CACHE_ALIAS = 'catalog'
+
+# The test suite swaps every cache for locmem (see admin_dashboard.test_runner)
+TEST_RUNNER = 'admin_dashboard.test_runner.LocMemCacheTestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -2,7 +2,13 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from admin_dashboard.views import CategoryViewSet, ItemViewSet, MenuListViewSet, TimeSlotViewSet
+from admin_dashboard import catalog_views, metrics_views
+from admin_dashboard.views import (
+    CategoryViewSet, ItemViewSet, MenuListViewSet, TimeSlotViewSet,
+    CustomerProfileViewSet, SubscriptionViewSet, DeliveryScheduleViewSet,
+    NotificationViewSet, PaymentViewSet, InvoiceViewSet, ReportViewSet,
+    IngredientViewSet, IngredientUsageViewSet, RecipeIngredientViewSet, ProductionPlanViewSet
+)
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet)
@@ -18,9 +24,17 @@ router.register(r'invoices', InvoiceViewSet)
 router.register(r'reports', ReportViewSet)
 router.register(r'ingredients', IngredientViewSet)
 router.register(r'ingredient-usage', IngredientUsageViewSet)
+router.register(r'recipe-ingredients', RecipeIngredientViewSet)
+router.register(r'production-plan', ProductionPlanViewSet, basename='production-plan')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_views.metrics, name='metrics'),
+    path('metrics/slow/', metrics_views.slow_requests, name='metrics-slow'),
+    path('api/catalog/menus/', catalog_views.menus, name='catalog-menus'),
+    path('api/catalog/menus/<int:pk>/', catalog_views.menu_detail, name='catalog-menu-detail'),
+    path('api/catalog/categories/', catalog_views.categories, name='catalog-categories'),
+    path('api/catalog/timeslots/', catalog_views.time_slots, name='catalog-timeslots'),
     path('api/', include(router.urls)),
     path('', include('customer_portal.urls')),
 ]